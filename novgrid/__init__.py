@@ -1,5 +1,13 @@
-from novgrid.novelty_env import NoveltyEnv
-
 from novgrid.register_envs import register_novgrid_envs
 
 register_novgrid_envs()
+
+
+def __getattr__(name):
+    # NoveltyEnv is imported on first use, since it pulls in stable_baselines3 and torch, which the worker
+    # processes don't need
+    if name == "NoveltyEnv":
+        from novgrid.novelty_env import NoveltyEnv
+
+        return NoveltyEnv
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
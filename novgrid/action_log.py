@@ -0,0 +1,141 @@
+from typing import Any, Dict, List, Optional
+
+import os
+
+import json
+import numpy as np
+
+META_FILE = "meta.json"
+ACTIONS_FILE = "actions.u8"
+
+
+class ActionLogWriter:
+    """
+    Writes a compact log of the actions taken in a NoveltyEnv.
+
+    The log is a directory holding a raw uint8 action stream (one row of n_envs actions per vectorized step)
+    and a json file with the env configs, the seed of every worker, and the steps at which each worker had a
+    novelty injected. Together with a deterministic env this is enough to re-simulate any worker to any step.
+
+    Attributes:
+        directory (str): Directory that the log is written to.
+        n_envs (int): Number of envs per vectorized step.
+        n_steps (int): Number of vectorized steps logged so far.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        n_envs: int,
+        seeds: List[int],
+        env_configs: Optional[List[Dict[str, Any]]] = None,
+        start_index: int = 0,
+    ) -> None:
+        """
+        Initializes the ActionLogWriter.
+
+        Args:
+            directory (str): Directory that the log is written to.
+            n_envs (int): Number of envs per vectorized step.
+            seeds (List[int]): The reset seed of each worker.
+            env_configs (Optional[List[Dict[str, Any]]]): The json serializable env configs of the run.
+            start_index (int): Rank of the first worker.
+        """
+        self.directory = directory
+        self.n_envs = n_envs
+        self.n_steps = 0
+        self.seeds = [int(s) for s in seeds]
+        self.env_configs = env_configs
+        self.start_index = start_index
+        self.novelty_steps: List[List[int]] = [[] for _ in range(n_envs)]
+        self.closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(os.path.join(directory, ACTIONS_FILE), "wb")
+        self.flush()
+
+    def add(self, actions: np.ndarray) -> None:
+        """
+        Appends the actions of one vectorized step.
+
+        Args:
+            actions (np.ndarray): The action taken in each env.
+        """
+        actions = np.asarray(actions)
+        if np.any(actions < 0) or np.any(actions > 255):
+            raise ValueError("Only discrete actions in [0, 255] can be stored in an action log.")
+        self._file.write(actions.astype(np.uint8).tobytes())
+        self.n_steps += 1
+
+    def mark_novelty(self, injected: np.ndarray) -> None:
+        """
+        Records a novelty injection after the last logged step.
+
+        Args:
+            injected (np.ndarray): Whether the novelty was injected in each env.
+        """
+        for i in np.flatnonzero(injected).tolist():
+            self.novelty_steps[i].append(self.n_steps)
+
+    def flush(self) -> None:
+        """Flushes the action stream and rewrites the meta file."""
+        self._file.flush()
+        meta = {
+            "n_envs": self.n_envs,
+            "n_steps": self.n_steps,
+            "start_index": self.start_index,
+            "seeds": self.seeds,
+            "novelty_steps": self.novelty_steps,
+            "env_configs": self.env_configs,
+        }
+        with open(os.path.join(self.directory, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+    def close(self) -> None:
+        """Flushes and closes the log."""
+        if self.closed:
+            return
+        self.flush()
+        self._file.close()
+        self.closed = True
+
+
+class ActionLog:
+    """
+    Read-only view of a log written by an ActionLogWriter.
+
+    Attributes:
+        directory (str): Directory the log was written to.
+        n_envs (int): Number of envs per vectorized step.
+        n_steps (int): Number of logged vectorized steps.
+        start_index (int): Rank of the first worker.
+        seeds (List[int]): The reset seed of each worker.
+        novelty_steps (List[List[int]]): The steps after which each worker had a novelty injected.
+        env_configs (Optional[List[Dict[str, Any]]]): The env configs of the run.
+        actions (np.ndarray): Memory-mapped (n_steps, n_envs) uint8 action stream.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initializes the ActionLog.
+
+        Args:
+            directory (str): Directory the log was written to.
+        """
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), "r") as f:
+            meta = json.load(f)
+        self.n_envs = meta["n_envs"]
+        self.start_index = meta["start_index"]
+        self.seeds = meta["seeds"]
+        self.novelty_steps = meta["novelty_steps"]
+        self.env_configs = meta["env_configs"]
+
+        actions_path = os.path.join(directory, ACTIONS_FILE)
+        n_steps = os.path.getsize(actions_path) // self.n_envs
+        self.n_steps = n_steps
+        self.actions = (
+            np.memmap(actions_path, dtype=np.uint8, mode="r", shape=(n_steps, self.n_envs))
+            if n_steps > 0
+            else np.zeros((0, self.n_envs), dtype=np.uint8)
+        )
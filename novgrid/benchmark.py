@@ -0,0 +1,507 @@
+import argparse
+import time
+import tracemalloc
+import types
+from typing import Any, Dict, List, Optional
+
+import gymnasium as gym
+import numpy as np
+from minigrid.minigrid_env import MiniGridEnv
+
+import novgrid  # Registers the NovGrid envs
+from novgrid.dynamics import apply_dynamics, get_dynamics_novelties
+from novgrid.novelty_env import NoveltyEnv, make_list_env_fn
+
+BENCHMARK_ENV_ID = "NovGrid-ColoredDoorKeyEnv"
+BENCHMARK_STEPS = 5000
+BENCHMARK_REPEATS = 5
+BENCHMARK_RESETS = 1000
+BENCHMARK_BASELINE_ENV_ID = "MiniGrid-DoorKey-8x8-v0"
+BENCHMARK_ENVS = 4
+BENCHMARK_MEMORY_WORKERS = [64, 256]
+BENCHMARK_MEMORY_TASKS = 16
+
+
+def time_steps(env: gym.Env, n_steps: int, seed: int = 0) -> float:
+    """
+    Times an env stepped with seeded random actions. The env is reset whenever an episode ends, outside of the
+    timing and with a seed derived from the step index, so that envs timed with the same seed take the same
+    actions from the same initial states.
+
+    Args:
+        env (gymnasium.Env): The env to time.
+        n_steps (int): Number of steps to take.
+        seed (int): Seed of the env and of the actions.
+
+    Returns:
+        float: Mean time per step in seconds.
+    """
+    actions = np.random.default_rng(seed).integers(0, env.action_space.n, size=n_steps).tolist()
+    env.reset(seed=seed)
+    elapsed, step = 0.0, 0
+    while step < n_steps:
+        start = time.perf_counter()
+        while step < n_steps:
+            _, _, terminated, truncated, _ = env.step(actions[step])
+            step += 1
+            if terminated or truncated:
+                break
+        elapsed += time.perf_counter() - start
+        env.reset(seed=seed + step)
+    return elapsed / n_steps
+
+
+def benchmark_dynamics(
+    env_id: Optional[str] = None,
+    n_steps: int = BENCHMARK_STEPS,
+    repeats: int = BENCHMARK_REPEATS,
+    novelties: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Measures the per-step overhead of the dynamics novelties against the plain MiniGrid step.
+
+    Each repeat times the plain env and the novelty env back to back on the same actions and initial states,
+    and the overhead is the median over the repeats of the ratio of their step times, so that a slow repeat
+    doesn't skew it.
+
+    Args:
+        env_id (Optional[str]): The env to benchmark on, defaults to the benchmark_env_id of each novelty.
+        n_steps (int): Number of steps per timing.
+        repeats (int): Number of timings per env.
+        novelties (Optional[List[str]]): Names of the novelties to benchmark, defaults to all of them.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per novelty, the env it was measured on, the median plain and novelty step times, the median ratio, the budget and whether the budget is met.
+    """
+    available = get_dynamics_novelties()
+    names = list(available) if novelties is None else [n.lower() for n in novelties]
+
+    base_envs = {}
+    results = {}
+    for name in names:
+        novelty_env_id = env_id or available[name].benchmark_env_id
+        if novelty_env_id not in base_envs:
+            base_envs[novelty_env_id] = gym.make(novelty_env_id)
+        base_env = base_envs[novelty_env_id]
+        novelty_env = apply_dynamics(gym.make(novelty_env_id), name)
+        base_times, novelty_times = [], []
+        for i in range(repeats):
+            base_times.append(time_steps(base_env, n_steps, seed=i))
+            novelty_times.append(time_steps(novelty_env, n_steps, seed=i))
+        ratio = float(np.median(np.array(novelty_times) / np.array(base_times)))
+        budget = available[name].overhead_budget
+        results[name] = {
+            "env_id": novelty_env_id,
+            "base_step": float(np.median(base_times)),
+            "novelty_step": float(np.median(novelty_times)),
+            "ratio": ratio,
+            "budget": budget,
+            "within_budget": ratio <= budget,
+        }
+    return results
+
+
+def measure_resets(env: gym.Env, n_resets: int, seed: int = 0) -> Dict[str, float]:
+    """
+    Measures the memory allocated by resetting an env.
+
+    Args:
+        env (gymnasium.Env): The env to measure.
+        n_resets (int): Number of resets.
+        seed (int): Seed of the first reset.
+
+    Returns:
+        Dict[str, float]: The mean time per reset in seconds, the mean peak of bytes allocated while resetting and the bytes held by the generated grid.
+    """
+    env.reset(seed=seed)
+    start = time.perf_counter()
+    for _ in range(n_resets):
+        env.reset()
+    reset_time = (time.perf_counter() - start) / n_resets
+
+    tracemalloc.start()
+    try:
+        peak, held = 0, 0
+        for _ in range(n_resets):
+            # Drop the previous grid first, so the held bytes only count the new one
+            env.unwrapped.grid = None
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            env.reset()
+            current, reset_peak = tracemalloc.get_traced_memory()
+            peak += reset_peak - before
+            held += current - before
+    finally:
+        tracemalloc.stop()
+    return {
+        "reset": reset_time,
+        "peak_bytes": peak / n_resets,
+        "held_bytes": held / n_resets,
+    }
+
+
+def benchmark_allocations(
+    env_id: str = BENCHMARK_ENV_ID,
+    baseline_env_id: str = BENCHMARK_BASELINE_ENV_ID,
+    n_resets: int = BENCHMARK_RESETS,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Measures the memory allocated over resets of a NovGrid env and of a MiniGrid env with a similar layout.
+
+    Args:
+        env_id (str): The NovGrid env to measure.
+        baseline_env_id (str): The MiniGrid env to compare against.
+        n_resets (int): Number of resets per env.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per env id, the results of measure_resets.
+    """
+    return {
+        i: measure_resets(gym.make(i), n_resets) for i in (env_id, baseline_env_id)
+    }
+
+
+def benchmark_wrappers(
+    env_id: str = BENCHMARK_ENV_ID,
+    n_steps: int = BENCHMARK_STEPS,
+    repeats: int = BENCHMARK_REPEATS,
+) -> Dict[str, float]:
+    """
+    Measures the per-step time of the ListEnv of a worker with the wrappers of gym.make and a Monitor, and with
+    the env built from its entry point and one FusedTaskMonitor.
+
+    Args:
+        env_id (str): The env to benchmark on.
+        n_steps (int): Number of steps per timing.
+        repeats (int): Number of timings per env, the fastest one is kept.
+
+    Returns:
+        Dict[str, float]: The gym.make and fused step times, and the time saved per step.
+    """
+    envs = {
+        name: make_list_env_fn([{"env_id": env_id}], rank=0, fused_wrappers=fused)()
+        for name, fused in (("gym_make", False), ("fused", True))
+    }
+    times = {name: np.inf for name in envs}
+    for i in range(repeats):
+        for name, env in envs.items():
+            times[name] = min(times[name], time_steps(env, n_steps, seed=i))
+    times["saving"] = times["gym_make"] - times["fused"]
+    return times
+
+
+def benchmark_visibility(
+    env_id: str = BENCHMARK_ENV_ID,
+    n_steps: int = BENCHMARK_STEPS,
+    repeats: int = BENCHMARK_REPEATS,
+) -> Dict[str, float]:
+    """
+    Measures the per-step time of an env whose views are generated from the tables of novgrid.envs.visibility,
+    and of the same env generating them with MiniGridEnv.gen_obs_grid.
+
+    Args:
+        env_id (str): The env to benchmark on, a NovGrid env using TableVisibilityMixin.
+        n_steps (int): Number of steps per timing.
+        repeats (int): Number of timings per env, the fastest one is kept.
+
+    Returns:
+        Dict[str, float]: The MiniGrid and table step times, and their ratio.
+    """
+    envs = {"minigrid": gym.make(env_id), "tables": gym.make(env_id)}
+    unwrapped = envs["minigrid"].unwrapped
+    unwrapped.gen_obs_grid = types.MethodType(MiniGridEnv.gen_obs_grid, unwrapped)
+    times = {name: np.inf for name in envs}
+    for i in range(repeats):
+        for name, env in envs.items():
+            times[name] = min(times[name], time_steps(env, n_steps, seed=i))
+    times["speedup"] = times["minigrid"] / times["tables"]
+    return times
+
+
+def benchmark_rollout(
+    env_id: str = BENCHMARK_ENV_ID,
+    n_steps: int = BENCHMARK_STEPS,
+    n_envs: int = BENCHMARK_ENVS,
+) -> Dict[str, float]:
+    """
+    Measures the throughput of a NoveltyEnv stepped with random actions sampled in the parent, and with the
+    random actions generated by rollout_random inside the workers.
+
+    Args:
+        env_id (str): The env to benchmark on.
+        n_steps (int): Number of steps of each env.
+        n_envs (int): Number of envs.
+
+    Returns:
+        Dict[str, float]: The steps per second of both modes and their ratio.
+    """
+    env = NoveltyEnv([{"env_id": env_id}], novelty_step=None, n_envs=n_envs, seed=0)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        env.step(np.array([env.action_space.sample() for _ in range(n_envs)]))
+    step_fps = n_steps * n_envs / (time.perf_counter() - start)
+    rollout = env.rollout_random(n_steps, seed=0)
+    env.close()
+    rollout_fps = rollout["steps"] / rollout["seconds"]
+    return {"step": step_fps, "rollout": rollout_fps, "speedup": rollout_fps / step_fps}
+
+
+def private_memory(pid: int) -> int:
+    """
+    Reads the memory of a process that isn't shared with other processes, from /proc (Linux only).
+
+    Args:
+        pid (int): The process.
+
+    Returns:
+        int: The private memory in bytes.
+    """
+    private = 0
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                private += int(line.split()[1]) * 1024
+    return private
+
+
+def benchmark_memory(
+    env_id: str = BENCHMARK_ENV_ID,
+    n_workers_lst: List[int] = BENCHMARK_MEMORY_WORKERS,
+    n_tasks: int = BENCHMARK_MEMORY_TASKS,
+    n_steps: int = 100,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Measures the private memory of the forked workers of a NoveltyEnv, each worker building all its tasks up
+    front, and with lazy_tasks.
+
+    Args:
+        env_id (str): The env of every task.
+        n_workers_lst (List[int]): The numbers of workers to measure.
+        n_tasks (int): Number of tasks.
+        n_steps (int): Number of vectorized steps taken before measuring.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per number of workers and mode, the mean private memory per worker and the total over the workers, in bytes.
+    """
+    results = {}
+    for n_workers in n_workers_lst:
+        for name, lazy in (("eager", False), ("lazy", True)):
+            env = NoveltyEnv(
+                [{"env_id": env_id}] * n_tasks,
+                novelty_step=None,
+                n_envs=n_workers,
+                seed=0,
+                start_method="fork",
+                lazy_tasks=lazy,
+            )
+            env.reset()
+            for _ in range(n_steps):
+                env.step(np.zeros(n_workers, dtype=np.int64))
+            private = [private_memory(process.pid) for process in env.processes]
+            env.close()
+            results[f"{n_workers} {name}"] = {
+                "per_worker": float(np.mean(private)),
+                "total": float(np.sum(private)),
+            }
+    return results
+
+
+def benchmark_start(
+    env_id: str = BENCHMARK_ENV_ID,
+    n_envs: int = BENCHMARK_ENVS,
+    repeats: int = BENCHMARK_REPEATS,
+) -> Dict[str, float]:
+    """
+    Times the creation of a NoveltyEnv, from starting its workers to its first observations, with each start
+    method. The forkserver is started once before the timings, as it is kept for the rest of the process.
+
+    Args:
+        env_id (str): The env of the task.
+        n_envs (int): Number of workers.
+        repeats (int): Number of timings per start method, the fastest one is kept.
+
+    Returns:
+        Dict[str, float]: Per start method, the time to create the env and reset it in seconds.
+    """
+    results = {}
+    for start_method in ("fork", "forkserver", "spawn"):
+        times = []
+        for _ in range(repeats + (start_method == "forkserver")):
+            start = time.perf_counter()
+            env = NoveltyEnv(
+                [{"env_id": env_id}], novelty_step=None, n_envs=n_envs, seed=0, start_method=start_method
+            )
+            env.reset()
+            times.append(time.perf_counter() - start)
+            env.close()
+        results[start_method] = min(times[start_method == "forkserver":])
+    return results
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """
+    Creates the parser for the benchmark command line.
+
+    Returns:
+        argparse.ArgumentParser: The parser
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "benchmark",
+        choices=["dynamics", "allocations", "wrappers", "rollout", "visibility", "memory", "start"],
+        help="The benchmark to run.",
+    )
+    parser.add_argument(
+        "--env-id",
+        type=str,
+        default=None,
+        help=f"The env to benchmark on, defaults to {BENCHMARK_ENV_ID}, or to the env of each novelty for dynamics.",
+    )
+    parser.add_argument(
+        "--n-steps",
+        type=int,
+        default=BENCHMARK_STEPS,
+        help="The number of steps per timing.",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=BENCHMARK_REPEATS,
+        help="The number of timings per env, the fastest one is kept.",
+    )
+    parser.add_argument(
+        "--baseline-env-id",
+        type=str,
+        default=BENCHMARK_BASELINE_ENV_ID,
+        help="The env to compare allocations against.",
+    )
+    parser.add_argument(
+        "--n-resets",
+        type=int,
+        default=BENCHMARK_RESETS,
+        help="The number of resets per env.",
+    )
+    parser.add_argument(
+        "--n-envs",
+        type=int,
+        default=BENCHMARK_ENVS,
+        help="The number of parallel envs.",
+    )
+    parser.add_argument(
+        "--n-workers",
+        type=int,
+        nargs="+",
+        default=BENCHMARK_MEMORY_WORKERS,
+        help="The numbers of workers to measure the memory of.",
+    )
+    parser.add_argument(
+        "--n-tasks",
+        type=int,
+        default=BENCHMARK_MEMORY_TASKS,
+        help="The number of tasks of each worker.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with an error if a dynamics novelty is over its overhead budget.",
+    )
+    return parser
+
+
+def run_benchmark(args: argparse.Namespace) -> None:
+    """Runs a benchmark and prints its results
+
+    Args:
+        args (argparse.Namespace): The args from the benchmark parser
+    """
+    env_id = args.env_id or BENCHMARK_ENV_ID
+    if args.benchmark == "dynamics":
+        results = benchmark_dynamics(
+            env_id=args.env_id, n_steps=args.n_steps, repeats=args.repeats
+        )
+        for name, r in results.items():
+            print(
+                f"{name} on {r['env_id']}: {r['novelty_step'] * 1e6:.1f}us vs {r['base_step'] * 1e6:.1f}us; "
+                f"ratio: {r['ratio']:.2f}; budget: {r['budget']:.2f}; "
+                f"{'ok' if r['within_budget'] else 'OVER BUDGET'}"
+            )
+        over = [name for name, r in results.items() if not r["within_budget"]]
+        if args.check and over:
+            raise SystemExit(f"Over their overhead budget: {', '.join(over)}")
+    elif args.benchmark == "allocations":
+        results = benchmark_allocations(
+            env_id=env_id,
+            baseline_env_id=args.baseline_env_id,
+            n_resets=args.n_resets,
+        )
+        for name, r in results.items():
+            print(
+                f"{name}: {r['reset'] * 1e6:.1f}us per reset; "
+                f"peak: {r['peak_bytes'] / 1024:.1f}KiB; grid: {r['held_bytes'] / 1024:.1f}KiB"
+            )
+    elif args.benchmark == "wrappers":
+        r = benchmark_wrappers(
+            env_id=env_id, n_steps=args.n_steps, repeats=args.repeats
+        )
+        print(
+            f"{env_id}: gym.make {r['gym_make'] * 1e6:.1f}us vs fused {r['fused'] * 1e6:.1f}us "
+            f"per step; saving: {r['saving'] * 1e6:.1f}us ({r['saving'] / r['gym_make']:.0%})"
+        )
+    elif args.benchmark == "rollout":
+        r = benchmark_rollout(env_id=env_id, n_steps=args.n_steps, n_envs=args.n_envs)
+        print(
+            f"{env_id} x {args.n_envs}: step {r['step']:.0f} vs rollout_random {r['rollout']:.0f} "
+            f"steps/s; speedup: {r['speedup']:.2f}x"
+        )
+    elif args.benchmark == "visibility":
+        r = benchmark_visibility(
+            env_id=env_id, n_steps=args.n_steps, repeats=args.repeats
+        )
+        print(
+            f"{env_id}: MiniGrid {r['minigrid'] * 1e6:.1f}us vs tables {r['tables'] * 1e6:.1f}us "
+            f"per step; speedup: {r['speedup']:.2f}x"
+        )
+    elif args.benchmark == "memory":
+        results = benchmark_memory(
+            env_id=env_id, n_workers_lst=args.n_workers, n_tasks=args.n_tasks
+        )
+        for name, r in results.items():
+            print(
+                f"{name}: {r['per_worker'] / 2**20:.2f}MiB private per worker; "
+                f"total: {r['total'] / 2**20:.0f}MiB"
+            )
+    elif args.benchmark == "start":
+        results = benchmark_start(env_id=env_id, n_envs=args.n_envs, repeats=args.repeats)
+        for name, r in results.items():
+            print(f"{name}: {r * 1e3:.1f}ms to start {args.n_envs} workers and reset them")
+
+
+def test_benchmark_dynamics_reaches_affected_cells():
+    """
+    Test case for benchmarking the lava novelties on an env whose benchmarked episodes step onto lava.
+    """
+
+    class LavaCounter(gym.Wrapper):
+        def __init__(self, env: gym.Env) -> None:
+            super().__init__(env)
+            self.lava_steps = 0
+
+        def step(self, action: Any) -> Any:
+            result = self.env.step(action)
+            cell = self.unwrapped.grid.get(*self.unwrapped.agent_pos)
+            self.lava_steps += cell is not None and cell.type == "lava"
+            return result
+
+    results = benchmark_dynamics(n_steps=200, repeats=1, novelties=["ImperviousToLava", "LavaHurts"])
+    for name, r in results.items():
+        env = LavaCounter(apply_dynamics(gym.make(r["env_id"]), name))
+        time_steps(env, 1000, seed=0)
+        assert env.lava_steps > 0, name
+
+
+if __name__ == "__main__":
+    parser = make_parser()
+    args = parser.parse_args()
+
+    run_benchmark(args=args)
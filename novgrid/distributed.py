@@ -0,0 +1,428 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import argparse
+import hmac
+import ipaddress
+import multiprocessing as mp
+import os
+import pickle
+import select
+import socket
+import struct
+
+import gymnasium as gym
+import numpy as np
+
+from novgrid.host import run_host
+from novgrid.novelty_env import NoveltyEnv
+from novgrid.workers import BatchedVecEnv
+
+Address = Union[str, Tuple[str, int]]
+
+# A frame is a command byte and the payload length, followed by the pickled payload
+HEADER = struct.Struct("!BQ")
+
+# Environment variable holding the authkey of the env host server command line
+AUTHKEY_VAR = "NOVGRID_AUTHKEY"
+CHALLENGE_SIZE = 32
+AUTH_TIMEOUT = 10.0
+
+
+class SocketTransport:
+    """
+    Sends and receives length-prefixed frames over a TCP socket.
+
+    Attributes:
+        sock (socket.socket): The connected socket.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        """
+        Initializes the SocketTransport.
+
+        Args:
+            sock (socket.socket): The connected socket.
+        """
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+
+    def send(self, cmd: int, data: Any = None) -> None:
+        """
+        Sends a frame.
+
+        Args:
+            cmd (int): The command byte.
+            data (Any): The arguments or the result of the command, pickled into the payload.
+        """
+        payload = b"" if data is None else pickle.dumps(data, protocol=5)
+        self.sock.sendall(HEADER.pack(cmd, len(payload)) + payload)
+
+    def _recv_exact(self, n: int) -> bytes:
+        buffer = bytearray(n)
+        view = memoryview(buffer)
+        while n:
+            received = self.sock.recv_into(view, n)
+            if received == 0:
+                raise EOFError("The connection was closed.")
+            view = view[received:]
+            n -= received
+        return bytes(buffer)
+
+    def recv(self) -> Tuple[int, Any]:
+        """
+        Receives a frame.
+
+        Returns:
+            Tuple[int, Any]: The command byte and the unpickled payload.
+        """
+        cmd, length = HEADER.unpack(self._recv_exact(HEADER.size))
+        return cmd, pickle.loads(self._recv_exact(length)) if length else None
+
+    def poll(self, timeout: float) -> bool:
+        """
+        Waits for a frame to be available.
+
+        Args:
+            timeout (float): Seconds to wait for.
+
+        Returns:
+            bool: Whether a frame can be received.
+        """
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        return bool(readable)
+
+    def close(self) -> None:
+        """Closes the socket."""
+        self.sock.close()
+
+
+def _digest(authkey: bytes, challenge: bytes) -> bytes:
+    return hmac.new(authkey, challenge, "sha256").digest()
+
+
+def _deliver_challenge(transport: SocketTransport, authkey: bytes) -> bool:
+    transport.sock.settimeout(AUTH_TIMEOUT)
+    try:
+        challenge = os.urandom(CHALLENGE_SIZE)
+        transport.sock.sendall(challenge)
+        expected = _digest(authkey, challenge)
+        if not hmac.compare_digest(transport._recv_exact(len(expected)), expected):
+            return False
+        transport.sock.sendall(b"\x01")
+    except (EOFError, OSError):
+        return False
+    transport.sock.settimeout(None)
+    return True
+
+
+def _answer_challenge(transport: SocketTransport, authkey: bytes, address: Tuple[str, int]) -> None:
+    transport.sock.settimeout(AUTH_TIMEOUT)
+    try:
+        transport.sock.sendall(_digest(authkey, transport._recv_exact(CHALLENGE_SIZE)))
+        transport._recv_exact(1)
+    except (EOFError, OSError) as e:
+        raise ConnectionError(f"The env host {address[0]}:{address[1]} rejected the authkey.") from e
+    transport.sock.settimeout(None)
+
+
+def _is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    ready: Optional[Any] = None,
+    authkey: Optional[bytes] = None,
+) -> None:
+    """
+    Runs an env host server, serving one coordinator after the other. A coordinator that crashes or resets its
+    connection only ends its own session.
+
+    The coordinator sends the functions building the envs as pickled code, so a server listening on another
+    interface than loopback requires an authkey: every coordinator must prove it knows the key, with an HMAC of
+    a random challenge, before the server unpickles anything it sends.
+
+    Args:
+        host (str): Interface to listen on, listening on another interface than loopback requires an authkey.
+        port (int): Port to listen on, 0 picks a free port.
+        ready (Optional[multiprocessing.connection.Connection]): Connection that the listening port is sent to once the server is ready.
+        authkey (Optional[bytes]): Key shared with the coordinators, None accepts any local coordinator.
+
+    Raises:
+        ValueError: If the server listens on another interface than loopback without an authkey.
+    """
+    if authkey is None and not _is_loopback(host):
+        raise ValueError(
+            f"Listening on {host} without an authkey lets any machine reaching it run code on this one, "
+            "pass an authkey or listen on 127.0.0.1."
+        )
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((host, port))
+    server.listen()
+    if ready is not None:
+        ready.send(server.getsockname()[1])
+        ready.close()
+    try:
+        while True:
+            sock, _ = server.accept()
+            transport = SocketTransport(sock)
+            if authkey is not None and not _deliver_challenge(transport, authkey):
+                transport.close()
+                continue
+            try:
+                run_host(transport)
+            except OSError:
+                # The coordinator crashed or reset the connection, run_host closed the envs and the transport
+                pass
+    finally:
+        server.close()
+
+
+def start_local_hosts(
+    n_hosts: int, start_method: Optional[str] = None, authkey: Optional[bytes] = None
+) -> Tuple[List[Tuple[str, int]], List[mp.Process]]:
+    """
+    Starts env host servers on localhost, standing in for remote machines.
+
+    Args:
+        n_hosts (int): Number of servers to start.
+        start_method (Optional[str]): Start method of the server processes.
+        authkey (Optional[bytes]): Key shared with the coordinators, None accepts any local coordinator.
+
+    Returns:
+        Tuple[List[Tuple[str, int]], List[multiprocessing.Process]]: The address and the process of each server.
+    """
+    ctx = mp.get_context(start_method)
+    addresses, processes = [], []
+    for _ in range(n_hosts):
+        ready, child_ready = ctx.Pipe(duplex=False)
+        process = ctx.Process(
+            target=serve,
+            kwargs={"host": "127.0.0.1", "ready": child_ready, "authkey": authkey},
+            daemon=True,
+        )
+        process.start()
+        child_ready.close()
+        addresses.append(("127.0.0.1", ready.recv()))
+        processes.append(process)
+    return addresses, processes
+
+
+def _parse_address(address: Address) -> Tuple[str, int]:
+    if isinstance(address, str):
+        name, port = address.rsplit(":", 1)
+        return name, int(port)
+    return address[0], int(address[1])
+
+
+class TCPVecEnv(BatchedVecEnv):
+    """
+    A vectorized environment whose envs run on env host servers, possibly on other machines.
+
+    The envs are split into contiguous blocks, one per host, and each vectorized step sends one frame of
+    actions to every host and receives one frame of stacked results back. The hosts are stepped concurrently.
+
+    Attributes:
+        hosts (List[Union[str, Tuple[str, int]]]): Addresses of the env host servers.
+        authkey (Optional[bytes]): Key shared with the env host servers, None for servers without one.
+    """
+
+    authkey: Optional[bytes] = None
+
+    def __init__(
+        self,
+        env_fns: List[Callable[[], gym.Env]],
+        start_method: Optional[str] = None,
+        envs_per_worker: int = 1,
+        worker_pool: None = None,
+        array_infos: bool = False,
+        hosts: Optional[Sequence[Address]] = None,
+        authkey: Optional[bytes] = None,
+    ) -> None:
+        """
+        Initializes the TCPVecEnv.
+
+        Args:
+            env_fns (List[Callable[[], gymnasium.Env]]): Functions building the envs.
+            start_method (Optional[str]): Unused, kept for compatibility with SubprocVecEnv.
+            envs_per_worker (int): Unused, the envs are split evenly across the hosts.
+            worker_pool (None): Unused, the hosts keep running across envs.
+            array_infos (bool): Whether step_wait returns the infos as one struct of arrays, see novgrid.infos.
+            hosts (Optional[Sequence[Union[str, Tuple[str, int]]]]): Addresses of the env host servers, as "name:port" or (name, port), defaults to the hosts attribute.
+            authkey (Optional[bytes]): Key shared with the env host servers, defaults to the authkey attribute.
+        """
+        if hosts is not None:
+            self.hosts = list(hosts)
+        if authkey is not None:
+            self.authkey = authkey
+        super().__init__(env_fns, start_method=start_method, array_infos=array_infos)
+
+    def _start_workers(self, n_envs: int, start_method: Optional[str]) -> List[SocketTransport]:
+        if not self.hosts:
+            raise ValueError("At least one env host is needed.")
+        transports = []
+        try:
+            for address in map(_parse_address, self.hosts[:n_envs]):
+                transports.append(SocketTransport(socket.create_connection(address)))
+                if self.authkey is not None:
+                    _answer_challenge(transports[-1], self.authkey, address)
+        except BaseException:
+            for transport in transports:
+                transport.close()
+            raise
+        return transports
+
+
+class DistributedNoveltyEnv(NoveltyEnv, TCPVecEnv):
+    """
+    A NoveltyEnv whose ListEnvs run on env host servers instead of local subprocesses.
+
+    The coordinator keeps the novelty triggers, the task index of every env, the recording and the action log,
+    and reaches the hosts through the same env_method calls as the local NoveltyEnv, so the novelty position
+    of every env stays in sync with the coordinator. In-worker schedules run on the hosts and report their
+    injections in the infos.
+
+    Attributes:
+        hosts (List[Union[str, Tuple[str, int]]]): Addresses of the env host servers.
+    """
+
+    def __init__(
+        self,
+        env_configs: Union[str, List[Dict[str, Any]]],
+        novelty_step: Optional[int],
+        hosts: Sequence[Address],
+        authkey: Optional[bytes] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Initializes the DistributedNoveltyEnv.
+
+        Args:
+            env_configs (Union[str, List[Dict[str, Any]]]): Configuration for environments.
+            novelty_step (Optional[int]): Number of time steps between novelty injections.
+            hosts (Sequence[Union[str, Tuple[str, int]]]): Addresses of the env host servers, as "name:port" or (name, port). The envs are split evenly across them.
+            authkey (Optional[bytes]): Key shared with the env host servers, None for servers without one.
+            **kwargs: The other arguments of NoveltyEnv.
+        """
+        if kwargs.get("respawn_workers", False):
+            raise ValueError("Respawning workers is only supported for local workers.")
+        if kwargs.get("worker_pool") is not None:
+            raise ValueError(
+                "The hosts keep running across envs, worker pools are only supported for local workers."
+            )
+        if kwargs.get("envs_per_worker", 1) != 1:
+            raise ValueError(
+                "The envs are split evenly across the hosts, envs_per_worker is only supported for local workers."
+            )
+        self.hosts = list(hosts)
+        self.authkey = authkey
+        super().__init__(env_configs=env_configs, novelty_step=novelty_step, **kwargs)
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """
+    Creates the parser for the env host server command line.
+
+    Returns:
+        argparse.ArgumentParser: The parser
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help=f"The interface to listen on, another interface than loopback requires the {AUTHKEY_VAR} environment variable.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=5555,
+        help="The port to listen on.",
+    )
+    return parser
+
+
+def test_distributed_matches_local():
+    """
+    Test case for stepping a NoveltyEnv over two localhost env hosts like the local NoveltyEnv.
+    """
+    addresses, processes = start_local_hosts(2)
+    kwargs = dict(env_configs="door_key_change", novelty_step=20, n_envs=3, seed=0)
+    local = NoveltyEnv(**kwargs)
+    distributed = DistributedNoveltyEnv(hosts=addresses, **kwargs)
+
+    assert [s.stop - s.start for s in distributed.host_slices] == [1, 2]
+    local_obs, distributed_obs = local.reset(), distributed.reset()
+    actions = np.random.default_rng(0).integers(0, 3, size=(30, 3))
+    for step_actions in actions:
+        assert np.array_equal(local_obs["image"], distributed_obs["image"])
+        local_obs, local_rewards, local_dones, local_infos = local.step(step_actions)
+        distributed_obs, rewards, dones, infos = distributed.step(step_actions)
+        assert np.array_equal(local_rewards, rewards) and np.array_equal(local_dones, dones)
+        assert [i.get("novelty_injected") for i in local_infos] == [
+            i.get("novelty_injected") for i in infos
+        ]
+    assert list(distributed.task_idx) == [1, 1, 1]
+    assert distributed.get_attr("env_idx", indices=[2, 0]) == [1, 1]
+
+    local.close()
+    distributed.close()
+    for process in processes:
+        process.terminate()
+
+
+def test_distributed_authkey():
+    """
+    Test case for refusing coordinators without the authkey of an env host, and hosts listening on every interface without one.
+    """
+    try:
+        serve(host="0.0.0.0")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("A server listened on every interface without an authkey")
+
+    addresses, processes = start_local_hosts(1, authkey=b"secret")
+    try:
+        DistributedNoveltyEnv("door_key_change", novelty_step=None, hosts=addresses, authkey=b"wrong")
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("A coordinator with the wrong authkey was served")
+    env = DistributedNoveltyEnv("door_key_change", novelty_step=None, hosts=addresses, authkey=b"secret")
+    assert env.reset()["image"].shape[0] == 1
+    env.close()
+    for process in processes:
+        process.terminate()
+
+
+def test_distributed_host_survives_reset_connection():
+    """
+    Test case for serving a second coordinator after the first one reset its connection mid-session.
+    """
+    addresses, processes = start_local_hosts(1)
+    env = DistributedNoveltyEnv("door_key_change", novelty_step=None, hosts=addresses)
+    env.reset()
+    # Closing with a zero linger time resets the connection, like a crashed coordinator
+    sock = env.transports[0].sock
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    sock.close()
+
+    env = DistributedNoveltyEnv("door_key_change", novelty_step=None, hosts=addresses)
+    assert env.reset()["image"].shape[0] == 1 and processes[0].is_alive()
+    env.close()
+    for process in processes:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    parser = make_parser()
+    args = parser.parse_args()
+
+    authkey = os.environ.get(AUTHKEY_VAR)
+    serve(host=args.host, port=args.port, authkey=None if authkey is None else authkey.encode())
@@ -0,0 +1,446 @@
+from typing import Any, Dict, List, Optional, Sequence, SupportsFloat, Tuple, Union
+
+import inspect
+import sys
+
+import gymnasium as gym
+import numpy as np
+from minigrid.core.actions import Actions
+
+from novgrid.wrappers import MacroStepWrapper
+
+StepReturn = Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]
+
+
+class DynamicsNovelty(MacroStepWrapper):
+    """
+    Base class for novelties that change the dynamics of a MiniGrid env in place.
+
+    Dynamics novelties wrap the MiniGrid env directly and can be selected per task with the "dynamics" key of
+    an env config, either by class name or as a dict holding the class "name" and its kwargs.
+
+    Attributes:
+        overhead_budget (float): Maximum allowed ratio between the mean step time of the wrapped env and of the
+            plain MiniGrid step, as checked by novgrid.benchmark.benchmark_dynamics.
+        benchmark_env_id (str): The env the overhead is measured on, one whose random episodes reach the
+            cells and objects that the novelty acts on.
+    """
+
+    overhead_budget: float = 1.15
+    benchmark_env_id: str = "NovGrid-ColoredDoorKeyEnv"
+
+
+class ImperviousToLava(DynamicsNovelty):
+    """
+    Lava no longer ends the episode, the agent can walk over it.
+
+    Overhead budget: 1.15x a plain step, a cell lookup is only made on terminal steps.
+    """
+
+    overhead_budget = 1.15
+    benchmark_env_id = "MiniGrid-LavaCrossingS9N1-v0"
+
+    def step(self, action: Any) -> StepReturn:
+        """
+        Takes a step, clearing the termination caused by walking onto lava.
+
+        Args:
+            action (Any): Action to take.
+
+        Returns:
+            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information.
+        """
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        if terminated:
+            unwrapped = self.env.unwrapped
+            cell = unwrapped.grid.get(*unwrapped.agent_pos)
+            if cell is not None and cell.type == "lava":
+                terminated = False
+        return obs, reward, terminated, truncated, info
+
+
+class LavaHurts(DynamicsNovelty):
+    """
+    Stepping onto lava ends the episode, for envs where lava was previously made harmless. Turning or
+    interacting while already standing on lava doesn't.
+
+    Overhead budget: 1.15x a plain step, a cell lookup is only made on forward moves.
+    """
+
+    overhead_budget = 1.15
+    benchmark_env_id = "MiniGrid-LavaCrossingS9N1-v0"
+
+    def step(self, action: Any) -> StepReturn:
+        """
+        Takes a step, terminating the episode if the agent moves onto lava.
+
+        Args:
+            action (Any): Action to take.
+
+        Returns:
+            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information.
+        """
+        if action != Actions.forward:
+            return self.env.step(action)
+        unwrapped = self.env.unwrapped
+        x, y = unwrapped.agent_pos
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        if (x, y) != tuple(unwrapped.agent_pos):
+            cell = unwrapped.grid.get(*unwrapped.agent_pos)
+            if cell is not None and cell.type == "lava":
+                terminated = True
+        return obs, reward, terminated, truncated, info
+
+
+class ForwardMovementSpeed(DynamicsNovelty):
+    """
+    The forward action moves the agent several cells at once.
+
+    Overhead budget: 1.3x a plain step, the extra moves only update the state.
+
+    Attributes:
+        speed (int): Number of cells moved per forward action.
+    """
+
+    overhead_budget = 1.3
+
+    def __init__(self, env: gym.Env, speed: int = 2) -> None:
+        """
+        Initializes the ForwardMovementSpeed novelty.
+
+        Args:
+            env (gymnasium.Env): The MiniGrid env to wrap.
+            speed (int): Number of cells moved per forward action.
+        """
+        super().__init__(env)
+        self.speed = speed
+
+    def step(self, action: Any) -> StepReturn:
+        """
+        Takes a step, moving several cells on forward actions.
+
+        Args:
+            action (Any): Action to take.
+
+        Returns:
+            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information.
+        """
+        if action == Actions.forward:
+            return self.macro_step([action] * self.speed)
+        return self.env.step(action)
+
+
+class ActionRepetition(DynamicsNovelty):
+    """
+    An action only takes effect once it has been issued several times in a row, otherwise nothing happens.
+
+    Overhead budget: 1.15x a plain step, a single comparison per step.
+
+    Attributes:
+        repetitions (int): Number of times an action has to be issued in a row.
+    """
+
+    overhead_budget = 1.15
+
+    def __init__(self, env: gym.Env, repetitions: int = 2) -> None:
+        """
+        Initializes the ActionRepetition novelty.
+
+        Args:
+            env (gymnasium.Env): The MiniGrid env to wrap.
+            repetitions (int): Number of times an action has to be issued in a row.
+        """
+        super().__init__(env)
+        self.repetitions = repetitions
+        self.prev_action = None
+        self.count = 0
+
+    def reset(self, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Resets the env and the count of repeated actions.
+
+        Returns:
+            Tuple[Any, Dict[str, Any]]: Reset information.
+        """
+        self.prev_action = None
+        self.count = 0
+        return self.env.reset(**kwargs)
+
+    def step(self, action: Any) -> StepReturn:
+        """
+        Takes a step, doing nothing until the action has been repeated enough times.
+
+        Args:
+            action (Any): Action to take.
+
+        Returns:
+            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information.
+        """
+        self.count = self.count + 1 if action == self.prev_action else 1
+        self.prev_action = action
+        if self.count < self.repetitions:
+            return self.env.step(Actions.done)
+        self.prev_action = None
+        self.count = 0
+        return self.env.step(action)
+
+
+class ActionRadius(DynamicsNovelty):
+    """
+    The pickup action reaches objects further than the cell directly in front of the agent.
+
+    An object is picked up at the first cell in the facing direction that holds one, as long as every cell before
+    it can be walked over. The pickup is resolved directly on the grid, so the observation is built once.
+
+    Overhead budget: 1.15x a plain step, cells are only scanned on pickup actions.
+
+    Attributes:
+        radius (int): Number of cells in front of the agent that the pickup reaches.
+    """
+
+    overhead_budget = 1.15
+
+    def __init__(self, env: gym.Env, radius: int = 2) -> None:
+        """
+        Initializes the ActionRadius novelty.
+
+        Args:
+            env (gymnasium.Env): The MiniGrid env to wrap.
+            radius (int): Number of cells in front of the agent that the pickup reaches.
+        """
+        super().__init__(env)
+        self.radius = radius
+
+    def step(self, action: Any) -> StepReturn:
+        """
+        Takes a step, extending the reach of pickup actions.
+
+        Args:
+            action (Any): Action to take.
+
+        Returns:
+            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information.
+        """
+        unwrapped = self.env.unwrapped
+        if action != Actions.pickup or unwrapped.carrying is not None:
+            return self.env.step(action)
+
+        grid = unwrapped.grid
+        dx, dy = unwrapped.dir_vec
+        x, y = unwrapped.agent_pos
+        for _ in range(self.radius):
+            x, y = x + dx, y + dy
+            if not (0 <= x < grid.width and 0 <= y < grid.height):
+                break
+            cell = grid.get(x, y)
+            if cell is not None and cell.can_pickup():
+                unwrapped.carrying = cell
+                cell.cur_pos = np.array([-1, -1])
+                grid.set(x, y, None)
+                return self.env.step(Actions.done)
+            if cell is not None and not cell.can_overlap():
+                break
+        return self.env.step(action)
+
+
+class Burdening(DynamicsNovelty):
+    """
+    Moving forward is faster with an empty inventory and slower while carrying an object.
+
+    Overhead budget: 1.3x a plain step, the extra moves only update the state.
+
+    Attributes:
+        unburdened_speed (int): Number of cells moved per forward action with an empty inventory.
+        burdened_cost (int): Number of steps of the episode budget a forward action uses while carrying.
+    """
+
+    overhead_budget = 1.3
+
+    def __init__(
+        self, env: gym.Env, unburdened_speed: int = 2, burdened_cost: int = 2
+    ) -> None:
+        """
+        Initializes the Burdening novelty.
+
+        Args:
+            env (gymnasium.Env): The MiniGrid env to wrap.
+            unburdened_speed (int): Number of cells moved per forward action with an empty inventory.
+            burdened_cost (int): Number of steps of the episode budget a forward action uses while carrying.
+        """
+        super().__init__(env)
+        self.unburdened_speed = unburdened_speed
+        self.burdened_cost = burdened_cost
+
+    def step(self, action: Any) -> StepReturn:
+        """
+        Takes a step, scaling forward movement by the contents of the inventory.
+
+        Args:
+            action (Any): Action to take.
+
+        Returns:
+            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information.
+        """
+        if action != Actions.forward:
+            return self.env.step(action)
+        if self.env.unwrapped.carrying is not None:
+            return self.macro_step([action], step_cost=self.burdened_cost)
+        return self.macro_step([action] * self.unburdened_speed)
+
+
+class ColorRestriction(DynamicsNovelty):
+    """
+    Objects of the restricted colors can not be interacted with, those interactions do nothing.
+
+    Overhead budget: 1.15x a plain step, a single cell lookup on interaction actions.
+
+    Attributes:
+        colors (Sequence[str]): The restricted colors.
+        actions (Sequence[int]): The restricted interaction actions.
+    """
+
+    overhead_budget = 1.15
+
+    def __init__(
+        self,
+        env: gym.Env,
+        colors: Sequence[str] = ("yellow",),
+        actions: Sequence[Union[int, str]] = ("pickup",),
+    ) -> None:
+        """
+        Initializes the ColorRestriction novelty.
+
+        Args:
+            env (gymnasium.Env): The MiniGrid env to wrap.
+            colors (Sequence[str]): The restricted colors.
+            actions (Sequence[Union[int, str]]): The restricted interaction actions, by value or name.
+        """
+        super().__init__(env)
+        self.colors = frozenset(colors)
+        self.actions = frozenset(
+            Actions[a] if isinstance(a, str) else Actions(a) for a in actions
+        )
+
+    def step(self, action: Any) -> StepReturn:
+        """
+        Takes a step, ignoring interactions with objects of the restricted colors.
+
+        Args:
+            action (Any): Action to take.
+
+        Returns:
+            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information.
+        """
+        if action in self.actions:
+            unwrapped = self.env.unwrapped
+            cell = unwrapped.grid.get(*unwrapped.front_pos)
+            if cell is not None and cell.color in self.colors:
+                return self.env.step(Actions.done)
+        return self.env.step(action)
+
+
+def get_dynamics_novelties() -> Dict[str, type]:
+    """
+    Gets the available dynamics novelties by lowercase class name.
+
+    Returns:
+        Dict[str, type]: The dynamics novelty classes.
+    """
+    return {
+        k.lower(): v
+        for k, v in inspect.getmembers(
+            sys.modules[__name__],
+            lambda obj: inspect.isclass(obj)
+            and issubclass(obj, DynamicsNovelty)
+            and obj is not DynamicsNovelty,
+        )
+    }
+
+
+def apply_dynamics(
+    env: gym.Env, dynamics: Optional[Union[str, Dict[str, Any], List[Any]]]
+) -> gym.Env:
+    """
+    Wraps an env in the dynamics novelties of an env config.
+
+    Args:
+        env (gymnasium.Env): The MiniGrid env to wrap.
+        dynamics (Optional[Union[str, Dict[str, Any], List[Any]]]): A novelty class name, a dict with the class "name" and its kwargs, or a list of those.
+
+    Returns:
+        gymnasium.Env: The wrapped env.
+    """
+    if dynamics is None:
+        return env
+    if not isinstance(dynamics, list):
+        dynamics = [dynamics]
+
+    novelties = get_dynamics_novelties()
+    for novelty in dynamics:
+        kwargs = {} if isinstance(novelty, str) else dict(novelty)
+        name = novelty if isinstance(novelty, str) else kwargs.pop("name")
+        if name.lower() not in novelties:
+            raise ValueError(
+                f"Unknown dynamics novelty {name}, expected one of {sorted(novelties)}."
+            )
+        env = novelties[name.lower()](env, **kwargs)
+    return env
+
+
+def test_impervious_to_lava_from_config():
+    """
+    Test case for selecting a dynamics novelty by name and walking onto lava without ending the episode.
+    """
+    env = apply_dynamics(
+        gym.make("MiniGrid-LavaCrossingS9N1-v0"), ["ImperviousToLava", {"name": "LavaHurts"}]
+    )
+    assert isinstance(env, LavaHurts) and isinstance(env.env, ImperviousToLava)
+
+    env = apply_dynamics(gym.make("MiniGrid-LavaCrossingS9N1-v0"), "ImperviousToLava")
+    env.reset(seed=0)
+    unwrapped = env.unwrapped
+    grid = unwrapped.grid
+    lava = next(
+        (i, j)
+        for j in range(1, grid.height - 1)
+        for i in range(2, grid.width - 1)
+        if grid.get(i, j) is not None
+        and grid.get(i, j).type == "lava"
+        and grid.get(i - 1, j) is None
+    )
+    unwrapped.agent_pos = (lava[0] - 1, lava[1])
+    unwrapped.agent_dir = 0
+
+    _, _, terminated, _, _ = env.step(Actions.forward)
+    assert not terminated
+    assert tuple(unwrapped.agent_pos) == lava
+
+
+def test_lava_hurts_only_when_stepping_onto_lava():
+    """
+    Test case for ending the episode when moving onto lava, but not when turning while standing on it.
+    """
+    env = apply_dynamics(
+        gym.make("MiniGrid-LavaCrossingS9N1-v0"), ["ImperviousToLava", "LavaHurts"]
+    )
+    env.reset(seed=0)
+    unwrapped = env.unwrapped
+    grid = unwrapped.grid
+    lava = next(
+        (i, j)
+        for j in range(1, grid.height - 1)
+        for i in range(2, grid.width - 1)
+        if grid.get(i, j) is not None
+        and grid.get(i, j).type == "lava"
+        and grid.get(i - 1, j) is None
+    )
+
+    unwrapped.agent_pos = lava
+    unwrapped.agent_dir = 0
+    for action in (Actions.left, Actions.toggle, Actions.right):
+        _, _, terminated, _, _ = env.step(action)
+        assert not terminated
+
+    unwrapped.agent_pos = (lava[0] - 1, lava[1])
+    _, _, terminated, _, _ = env.step(Actions.forward)
+    assert terminated and tuple(unwrapped.agent_pos) == lava
@@ -5,10 +5,16 @@ from minigrid.core.world_object import Door, Goal, Key
 from minigrid.core.mission import MissionSpace
 from minigrid.minigrid_env import MiniGridEnv
 
-from novgrid.envs.novgrid_objects import ColorDoor
+from novgrid.envs.novgrid_objects import (
+    ColorDoor,
+    make_key_door_table,
+    shared_wall,
+    wall_rect,
+)
+from novgrid.envs.visibility import TableVisibilityMixin
 
 
-class ColoredDoorKeyEnv(MiniGridEnv):
+class ColoredDoorKeyEnv(TableVisibilityMixin, MiniGridEnv):
 
     def __init__(
         self,
@@ -19,16 +25,39 @@ class ColoredDoorKeyEnv(MiniGridEnv):
         max_steps: Optional[int] = None,
         **kwargs: Dict[str, Any]
     ):
-        self.door_color = door_color
-        self.key_colors = key_colors if key_colors is not None else [correct_key_color]
-        self.correct_key_color = correct_key_color
-        if max_steps is None:
-            max_steps = 10 * size**2
+        self.reconfigure(door_color, key_colors, correct_key_color, size, max_steps)
         mission_space = MissionSpace(mission_func=self._gen_mission)
         super().__init__(
-            mission_space=mission_space, grid_size=size, max_steps=max_steps, **kwargs
+            mission_space=mission_space, grid_size=size, max_steps=self.max_steps, **kwargs
         )
 
+    def reconfigure(
+        self,
+        door_color: str = "yellow",
+        key_colors: Optional[List[str]] = None,
+        correct_key_color: str = "yellow",
+        size: int = 8,
+        max_steps: Optional[int] = None,
+    ) -> None:
+        """
+        Moves the env to another configuration in place, as if it was built with these kwargs. Every field that
+        is not given goes back to its default, and the other kwargs of MiniGridEnv can't be changed in place.
+
+        Args:
+            door_color (str): Color of the door.
+            key_colors (Optional[List[str]]): Colors of the keys placed in the grid, the correct key only by default.
+            correct_key_color (str): Color of the key that opens the door.
+            size (int): Width and height of the grid.
+            max_steps (Optional[int]): Number of steps per episode, 10 * size**2 by default.
+        """
+        self.door_color = door_color
+        self.key_colors = key_colors if key_colors is not None else [correct_key_color]
+        self.correct_key_color = correct_key_color
+        # The door's lock has the door color, the table decides which key opens it
+        self.key_door_table = make_key_door_table({door_color: [correct_key_color]})
+        self.width = self.height = size
+        self.max_steps = max_steps if max_steps is not None else 10 * size**2
+
     @staticmethod
     def _gen_mission():
         return "use the correct key to open the door and get to the goal"
@@ -41,14 +70,15 @@ class ColoredDoorKeyEnv(MiniGridEnv):
         self.grid = Grid(width=width, height=height)
 
         # Generate the surrounding walls
-        self.grid.wall_rect(0, 0, width, height)
+        wall_rect(self.grid, 0, 0, width, height)
 
         # Place a goal in the bottom right corner
         self.put_obj(Goal(), width - 2, height - 2)
+        goal_pos = (width - 2, height - 2)
 
         # Create a vertical splitting wall
         splitIdx = self._rand_int(2, width - 2)
-        self.grid.vert_wall(splitIdx, 0)
+        self.grid.vert_wall(splitIdx, 0, obj_type=shared_wall)
 
         # Place the agent at a random position and orientation on the left side
         self.place_agent(size=(splitIdx, height))
@@ -56,13 +86,18 @@ class ColoredDoorKeyEnv(MiniGridEnv):
         # Place a door in the wall
         doorIdx = self._rand_int(1, width - 2)
         self.put_obj(
-            ColorDoor(
-                self.door_color, is_locked=True, key_color=self.correct_key_color
-            ),
+            ColorDoor(self.door_color, is_locked=True, key_door_table=self.key_door_table),
             splitIdx,
             doorIdx,
         )
 
+        # Record where the layout patches should be applied
+        self.layout_anchors = {
+            "door": (splitIdx, doorIdx),
+            "goal": goal_pos,
+            "agent_region": ((0, 0), (splitIdx, height)),
+        }
+
         # Place a yellow key on the left side
         for color in self.key_colors:
             self.place_obj(obj=Key(color=color), top=(0, 0), size=(splitIdx, height))
@@ -1,26 +1,249 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+import functools
+
+import numpy as np
+from minigrid.core.constants import COLOR_TO_IDX, IDX_TO_COLOR
 from minigrid.core.world_object import *
 
+# Walls are stateless, so every wall that NovGrid envs place on a grid is this one shared instance
+WALL = Wall()
+
+
+def shared_wall() -> Wall:
+    """
+    Gets the shared wall instance, to be used as the obj_type of Grid.horz_wall and Grid.vert_wall.
+
+    Returns:
+        Wall: The shared wall.
+    """
+    return WALL
+
+
+def wall_rect(grid, x: int, y: int, w: int, h: int) -> None:
+    """
+    Same as Grid.wall_rect, but places the shared wall instead of allocating a wall per cell.
+
+    Args:
+        grid (Grid): The grid to place the walls on.
+        x (int): Left column of the rectangle.
+        y (int): Top row of the rectangle.
+        w (int): Width of the rectangle.
+        h (int): Height of the rectangle.
+    """
+    grid.horz_wall(x, y, w, obj_type=shared_wall)
+    grid.horz_wall(x, y + h - 1, w, obj_type=shared_wall)
+    grid.vert_wall(x, y, h, obj_type=shared_wall)
+    grid.vert_wall(x + w - 1, y, h, obj_type=shared_wall)
+
+
+N_COLORS = len(COLOR_TO_IDX)
+
+
+def make_key_door_table(locks: Optional[Dict[str, List[str]]] = None) -> np.ndarray:
+    """
+    Builds the compatibility matrix between key colors and door lock colors, where table[key, lock] is True
+    if a key of color index key opens a lock of color index lock.
+
+    Args:
+        locks (Optional[Dict[str, List[str]]]): Per lock color, the key colors that open it. Lock colors not listed are opened by the key of their own color.
+
+    Returns:
+        np.ndarray: The boolean table of shape (N_COLORS, N_COLORS).
+    """
+    table = np.eye(N_COLORS, dtype=bool)
+    for lock, keys in (locks or {}).items():
+        if lock not in COLOR_TO_IDX or any(k not in COLOR_TO_IDX for k in keys):
+            raise ValueError(
+                f"Unknown color in {lock}: {keys}, expected one of {list(COLOR_TO_IDX)}."
+            )
+        table[:, COLOR_TO_IDX[lock]] = False
+        table[[COLOR_TO_IDX[k] for k in keys], COLOR_TO_IDX[lock]] = True
+    table.flags.writeable = False
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def door_key_table(lock: str, key: str) -> np.ndarray:
+    """
+    Gets the key/door table where the lock of a color is opened by the key of another color only.
+
+    Args:
+        lock (str): Color of the lock.
+        key (str): Color of the key that opens it.
+
+    Returns:
+        np.ndarray: The boolean table of shape (N_COLORS, N_COLORS).
+    """
+    return make_key_door_table({lock: [key]})
+
+
 class ColorDoor(Door):
     """
-    A Door instance where the key color can be specified and doesn't have to match the door
+    A Door instance where the key color can be specified and doesn't have to match the door.
+    The lock of the door has the door color, and the keys that open it are given by the key/door table of the
+    door: the table of the env it was built for, or the table where only key_color opens it.
     """
-    def __init__(self, color, is_open=False, is_locked=False, key_color=None):
+
+    def __init__(
+        self, color, is_open=False, is_locked=False, key_color=None, key_door_table=None
+    ):
         super().__init__(color, is_open, is_locked)
-        self.is_open = is_open
-        self.is_locked = is_locked
-        if key_color:
-            self.key_color = key_color
-        else:
-            self.key_color = color
+        self.lock_color_idx = COLOR_TO_IDX[color]
+        if key_door_table is None:
+            key_door_table = door_key_table(color, key_color if key_color else color)
+        self.key_door_table = key_door_table
+
+    @property
+    def key_color(self) -> str:
+        """The color of the key that opens the door, the first one if several keys do."""
+        return IDX_TO_COLOR[int(np.argmax(self.key_door_table[:, self.lock_color_idx]))]
+
+    @key_color.setter
+    def key_color(self, color: str) -> None:
+        self.key_door_table = door_key_table(self.color, color)
 
     def toggle(self, env, pos):
         # If the player has the right key to open the door
         if self.is_locked:
-            if isinstance(env.carrying, Key) and env.carrying.color == self.key_color:
+            carrying = env.carrying
+            if (
+                isinstance(carrying, Key)
+                and self.key_door_table[COLOR_TO_IDX[carrying.color], self.lock_color_idx]
+            ):
                 self.is_locked = False
                 self.is_open = True
                 return True
             return False
 
         self.is_open = not self.is_open
-        return True
\ No newline at end of file
+        return True
+
+
+class MultiKeyDoor(Door):
+    """
+    A Door instance where multiple keys are required to unlock the door. Each required key is used up by
+    toggling the door while carrying it, and the door unlocks once every key has been used. The required key
+    colors are explicit, so the key/door table of the env doesn't apply to them.
+    """
+
+    def __init__(self, color, is_open=False, is_locked=False, key_colors=None):
+        super().__init__(color, is_open, is_locked)
+        self.key_color_idxs = tuple(
+            COLOR_TO_IDX[c] for c in (key_colors if key_colors else (color,))
+        )
+        # Bit i is set while the lock of color index i still needs its key
+        self.remaining_mask = sum(1 << i for i in set(self.key_color_idxs))
+
+    @property
+    def key_colors(self) -> Tuple[str, ...]:
+        return tuple(IDX_TO_COLOR[i] for i in self.key_color_idxs)
+
+    @property
+    def remaining_key_colors(self) -> Set[str]:
+        return {IDX_TO_COLOR[i] for i in self.key_color_idxs if self.remaining_mask >> i & 1}
+
+    def toggle(self, env, pos):
+        if self.is_locked:
+            carrying = env.carrying
+            if isinstance(carrying, Key):
+                key = 1 << COLOR_TO_IDX[carrying.color]
+                if self.remaining_mask & key:
+                    self.remaining_mask &= ~key
+                    if not self.remaining_mask:
+                        self.is_locked = False
+                        self.is_open = True
+                    return True
+            return False
+
+        self.is_open = not self.is_open
+        return True
+
+
+def test_multi_key_door():
+    """
+    Test case for unlocking a multi key door with each of its keys, and for sharing walls across grids.
+    """
+    import gymnasium as gym
+
+    from novgrid.layout import apply_layout_patches
+
+    env = apply_layout_patches(
+        gym.make("NovGrid-ColoredDoorKeyEnv", size=8),
+        [{"name": "RequireKeys", "key_colors": ["yellow", "blue"]}],
+    )
+    env.reset(seed=0)
+    unwrapped = env.unwrapped
+    door = unwrapped.grid.get(*unwrapped.layout_anchors["door"])
+    assert isinstance(door, MultiKeyDoor) and not hasattr(door, "key_color")
+
+    unwrapped.carrying = Key("red")
+    assert not door.toggle(unwrapped, None) and door.is_locked
+    unwrapped.carrying = Key("yellow")
+    assert door.toggle(unwrapped, None) and door.is_locked
+    unwrapped.carrying = Key("blue")
+    assert door.toggle(unwrapped, None) and door.is_open and not door.is_locked
+    assert door.key_colors == ("yellow", "blue")
+
+    env.reset(seed=0)
+    door = unwrapped.grid.get(*unwrapped.layout_anchors["door"])
+    assert door.is_locked and door.remaining_key_colors == {"yellow", "blue"}
+    assert unwrapped.grid.get(0, 0) is WALL
+
+
+def test_multi_key_door_ignores_remapped_table():
+    """
+    Test case for unlocking a multi key door with its required keys only, on an env whose key/door table
+    remaps the lock of a required key color.
+    """
+    import gymnasium as gym
+
+    from novgrid.novelty_env import read_env_configs
+
+    config = read_env_configs("door_key_change")[1]
+    env = gym.make(config.pop("env_id"), **config).unwrapped
+    env.reset(seed=0)
+    red, blue = COLOR_TO_IDX["red"], COLOR_TO_IDX["blue"]
+    assert env.key_door_table[blue, red] and not env.key_door_table[red, red]
+
+    door = MultiKeyDoor("red", is_locked=True, key_colors=["red", "yellow"])
+    env.carrying = Key("blue")
+    assert not door.toggle(env, None) and door.remaining_key_colors == {"red", "yellow"}
+    env.carrying = Key("red")
+    assert door.toggle(env, None) and door.remaining_key_colors == {"yellow"}
+    env.carrying = Key("yellow")
+    assert door.toggle(env, None) and door.is_open and not door.is_locked
+
+
+def test_key_door_table():
+    """
+    Test case for the door key change novelty being a swap of the key/door table, the key color of the door
+    being the color of the only key that opens it.
+    """
+    import gymnasium as gym
+
+    from novgrid.novelty_env import read_env_configs
+
+    tables = []
+    for config in read_env_configs("door_key_change"):
+        env = gym.make(config.pop("env_id"), **config).unwrapped
+        env.reset(seed=0)
+        door = env.grid.get(*env.layout_anchors["door"])
+        assert door.key_color == config["correct_key_color"]
+        for color in COLOR_TO_IDX:
+            env.carrying = Key(color)
+            door.is_locked, door.is_open = True, False
+            assert door.toggle(env, None) == (color == door.key_color)
+        tables.append(env.key_door_table)
+
+    red, blue = COLOR_TO_IDX["red"], COLOR_TO_IDX["blue"]
+    assert tables[0][red, red] and not tables[0][blue, red]
+    assert tables[1][blue, red] and not tables[1][red, red]
+    assert (tables[0] != tables[1]).sum() == 2
+
+    # An explicit key color overrides the table of the env
+    door = ColorDoor("red", is_locked=True, key_color="green")
+    env.carrying = Key("blue")
+    assert door.key_color == "green" and not door.toggle(env, None)
+    env.carrying = Key("green")
+    assert door.toggle(env, None) and door.is_open
@@ -0,0 +1,190 @@
+from typing import Optional, Tuple
+
+import functools
+
+import numpy as np
+from minigrid.core.grid import Grid
+
+from novgrid.envs.novgrid_objects import WALL
+
+# Wider views fall back to Grid.process_vis, since the row tables have 4**width entries
+MAX_TABLE_WIDTH = 9
+
+
+@functools.lru_cache(maxsize=None)
+def row_tables(width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Precomputes how Grid.process_vis propagates the visibility through one row of a view.
+
+    A row is encoded as a bitmask, bit i standing for column i. Grid.process_vis sweeps each row from left to
+    right and back, every visible cell that can be seen behind making its neighbours in the row and the cells
+    above it visible. The result of both sweeps only depends on the visible and see-behind bitmasks of the row.
+
+    Args:
+        width (int): Width of the view.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Indexed by the visible and see-behind bitmasks of a row, the visible bitmask of the row after the sweeps and the bitmask of the cells made visible in the row above.
+    """
+    n = 1 << width
+    visible = np.repeat(np.arange(n, dtype=np.int64)[:, None], n, axis=1)
+    see_behind = np.arange(n, dtype=np.int64)[None, :]
+    above = np.zeros((n, n), dtype=np.int64)
+    for i in range(width - 1):
+        spread = (visible >> i) & (see_behind >> i) & 1
+        visible |= spread << (i + 1)
+        above |= (spread << (i + 1)) | (spread << i)
+    for i in range(width - 1, 0, -1):
+        spread = (visible >> i) & (see_behind >> i) & 1
+        visible |= spread << (i - 1)
+        above |= (spread << (i - 1)) | (spread << i)
+    return visible.astype(np.uint16), above.astype(np.uint16)
+
+
+@functools.lru_cache(maxsize=None)
+def view_offsets(view_size: int, agent_dir: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Precomputes where each cell of the agent's view comes from, relative to the top-left corner of the view
+    extents, replacing the Grid.slice and Grid.rotate_left calls of MiniGridEnv.gen_obs_grid.
+
+    Args:
+        view_size (int): Size of the agent's view.
+        agent_dir (int): Direction of the agent.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The x and y offsets of each cell of the view, in the order of Grid.grid.
+    """
+    x, y = np.meshgrid(np.arange(view_size), np.arange(view_size), indexing="ij")
+    for _ in range(agent_dir + 1):
+        # Grid.rotate_left moves the cell (i, j) to (j, width - 1 - i)
+        x, y = x[::-1].T, y[::-1].T
+    return x.T.ravel(), y.T.ravel()
+
+
+def process_vis(grid: Grid, agent_pos: Tuple[int, int]) -> np.ndarray:
+    """
+    Same as Grid.process_vis with lookup tables, one lookup per row instead of two Python sweeps per row.
+
+    Args:
+        grid (Grid): The grid of the view, whose cells that aren't visible are emptied.
+        agent_pos (Tuple[int, int]): Position of the agent in the view.
+
+    Returns:
+        np.ndarray: The visibility mask, indexed [x, y].
+    """
+    if grid.width > MAX_TABLE_WIDTH:
+        return grid.process_vis(agent_pos)
+    visible_table, above_table = row_tables(grid.width)
+    see_behind = np.fromiter(
+        (cell is None or cell.see_behind() for cell in grid.grid),
+        dtype=np.int64,
+        count=len(grid.grid),
+    ).reshape(grid.height, grid.width) @ (1 << np.arange(grid.width))
+
+    rows = np.zeros(grid.height, dtype=np.int64)
+    incoming = 0
+    for j in range(grid.height - 1, -1, -1):
+        visible = incoming | (1 << agent_pos[0] if j == agent_pos[1] else 0)
+        rows[j] = visible_table[visible, see_behind[j]]
+        incoming = int(above_table[visible, see_behind[j]])
+
+    mask = (rows[None, :] >> np.arange(grid.width)[:, None]) & 1 == 1
+    grid.grid = [
+        cell if seen else None for cell, seen in zip(grid.grid, mask.T.ravel().tolist())
+    ]
+    return mask
+
+
+class TableVisibilityMixin:
+    """
+    Mixin for MiniGridEnv subclasses generating the agent's view from precomputed tables.
+
+    The view is gathered from the grid in one pass with the offsets of view_offsets, and the occlusions are
+    computed by process_vis. The observations are identical to those of MiniGridEnv.gen_obs_grid, except that
+    the cells outside of the grid are the shared wall instead of new walls.
+    """
+
+    def gen_obs_grid(self, agent_view_size: Optional[int] = None) -> Tuple[Grid, np.ndarray]:
+        """
+        Generates the sub-grid observed by the agent and its visibility mask.
+
+        Args:
+            agent_view_size (Optional[int]): Size of the view, defaults to the agent_view_size attribute.
+
+        Returns:
+            Tuple[Grid, np.ndarray]: The observed grid and the visibility mask.
+        """
+        agent_view_size = agent_view_size or self.agent_view_size
+        top_x, top_y, _, _ = self.get_view_exts(agent_view_size)
+        dx, dy = view_offsets(agent_view_size, self.agent_dir)
+        x, y = dx + top_x, dy + top_y
+        inside = (x >= 0) & (x < self.grid.width) & (y >= 0) & (y < self.grid.height)
+        cells = self.grid.grid
+        grid = Grid(agent_view_size, agent_view_size)
+        grid.grid = [
+            cells[k] if k >= 0 else WALL
+            for k in np.where(inside, y * self.grid.width + x, -1).tolist()
+        ]
+
+        agent_pos = (agent_view_size // 2, agent_view_size - 1)
+        if not self.see_through_walls:
+            vis_mask = process_vis(grid, agent_pos)
+        else:
+            vis_mask = np.ones((agent_view_size, agent_view_size), dtype=bool)
+
+        # The agent sees what it's carrying at its position
+        grid.set(*agent_pos, self.carrying if self.carrying else None)
+        return grid, vis_mask
+
+
+def test_process_vis_matches_minigrid():
+    """
+    Test case for computing the same visibility masks and views as MiniGrid on random grids.
+    """
+    from minigrid.core.world_object import Ball, Box, Door, Goal, Key, Lava, Wall
+    from minigrid.minigrid_env import MiniGridEnv
+
+    from novgrid.envs.colored_door_key import ColoredDoorKeyEnv
+
+    rng = np.random.default_rng(0)
+    objects = [
+        lambda: None,
+        Wall,
+        lambda: WALL,
+        lambda: Door("red", is_open=bool(rng.integers(2)), is_locked=bool(rng.integers(2))),
+        lambda: Key("blue"),
+        lambda: Ball("green"),
+        lambda: Box("purple"),
+        Goal,
+        Lava,
+    ]
+
+    def random_grid(width, height):
+        grid = Grid(width, height)
+        weights = rng.dirichlet(np.ones(len(objects)))
+        grid.grid = [objects[k]() for k in rng.choice(len(objects), width * height, p=weights)]
+        return grid
+
+    for _ in range(300):
+        width, height = rng.integers(3, MAX_TABLE_WIDTH + 1, size=2)
+        grid = random_grid(width, height)
+        agent_pos = (int(rng.integers(width)), int(rng.integers(height)))
+        expected = Grid(width, height)
+        expected.grid = list(grid.grid)
+        assert np.array_equal(process_vis(grid, agent_pos), expected.process_vis(agent_pos))
+        assert np.array_equal(grid.encode(), expected.encode())
+
+    env = ColoredDoorKeyEnv(size=10)
+    env.reset(seed=0)
+    for _ in range(300):
+        env.grid = random_grid(10, 10)
+        env.agent_pos = (int(rng.integers(10)), int(rng.integers(10)))
+        env.agent_dir = int(rng.integers(4))
+        env.carrying = Key("yellow") if rng.integers(2) else None
+        env.see_through_walls = bool(rng.integers(4) == 0)
+        view_size = int(rng.choice([3, 5, 7, 9, 11]))
+        grid, vis_mask = env.gen_obs_grid(view_size)
+        expected_grid, expected_mask = MiniGridEnv.gen_obs_grid(env, view_size)
+        assert np.array_equal(vis_mask, expected_mask)
+        assert np.array_equal(grid.encode(vis_mask), expected_grid.encode(expected_mask))
+        assert np.array_equal(grid.encode(), expected_grid.encode())
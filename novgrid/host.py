@@ -0,0 +1,385 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import copy
+import traceback
+
+import cloudpickle
+import gymnasium as gym
+import numpy as np
+
+from novgrid.infos import to_array_infos
+
+# Commands sent to a worker, a reply carries the command of its request or ERROR
+(
+    INIT,
+    STEP,
+    RESET,
+    ENV_METHOD,
+    GET_ATTR,
+    SET_ATTR,
+    HAS_ATTR,
+    IS_WRAPPED,
+    RENDER,
+    CLOSE,
+    RELEASE,
+    ERROR,
+    ROLLOUT,
+) = range(13)
+
+
+def stack_obs(observations: List[Any], space: gym.Space) -> Any:
+    """
+    Stacks the observations of several envs, like the _stack_obs helper of stable_baselines3.
+
+    Args:
+        observations (List[Any]): The observation of each env.
+        space (gymnasium.Space): The observation space of the envs.
+
+    Returns:
+        Any: The stacked observations, per key for dict spaces and per item for tuple spaces.
+    """
+    if isinstance(space, gym.spaces.Dict):
+        return {k: np.stack([obs[k] for obs in observations]) for k in space.spaces}
+    if isinstance(space, gym.spaces.Tuple):
+        return tuple(np.stack([obs[i] for obs in observations]) for i in range(len(space.spaces)))
+    return np.stack(observations)
+
+
+def is_wrapped(env: gym.Env, wrapper_class: type) -> bool:
+    """
+    Checks whether an env is wrapped by a wrapper class, like the is_wrapped helper of stable_baselines3. A
+    ListEnv is checked through the env of its current task.
+
+    Args:
+        env (gymnasium.Env): The env.
+        wrapper_class (type): The wrapper class.
+
+    Returns:
+        bool: Whether one of the wrappers of the env is an instance of the class.
+    """
+    while isinstance(env, gym.Wrapper) or hasattr(env, "cur_env"):
+        if isinstance(env, wrapper_class):
+            return True
+        env = env.env if isinstance(env, gym.Wrapper) else env.cur_env
+    return False
+
+
+class PipeTransport:
+    """
+    Sends and receives commands over a multiprocessing pipe.
+
+    Attributes:
+        conn (multiprocessing.connection.Connection): The end of the pipe.
+    """
+
+    def __init__(self, conn: Any) -> None:
+        """
+        Initializes the PipeTransport.
+
+        Args:
+            conn (multiprocessing.connection.Connection): The end of the pipe.
+        """
+        self.conn = conn
+
+    def send(self, cmd: int, data: Any = None) -> None:
+        """
+        Sends a command.
+
+        Args:
+            cmd (int): The command.
+            data (Any): The arguments or the result of the command.
+        """
+        self.conn.send((cmd, data))
+
+    def recv(self) -> Tuple[int, Any]:
+        """
+        Receives a command.
+
+        Returns:
+            Tuple[int, Any]: The command and its arguments or result.
+        """
+        return self.conn.recv()
+
+    def poll(self, timeout: float) -> bool:
+        """
+        Waits for a command to be available.
+
+        Args:
+            timeout (float): Seconds to wait for.
+
+        Returns:
+            bool: Whether a command can be received.
+        """
+        return self.conn.poll(timeout)
+
+    def close(self) -> None:
+        """Closes the end of the pipe."""
+        self.conn.close()
+
+
+class EnvHost:
+    """
+    Steps a batch of ListEnvs in one process for a coordinator.
+
+    Every command applies to the whole batch, so one message carries the actions of all the envs of the host and
+    one message carries back their stacked observations. Envs are reset automatically at the end of an episode,
+    like in the SB3 subprocess workers.
+
+    Attributes:
+        envs (List[gymnasium.Env]): The envs of the host.
+        array_infos (bool): Whether the infos of a step are sent as one struct of arrays instead of a dict per env.
+    """
+
+    def __init__(
+        self, env_fns: List[Callable[[], gym.Env]], array_infos: bool = False
+    ) -> None:
+        """
+        Initializes the EnvHost.
+
+        Args:
+            env_fns (List[Callable[[], gymnasium.Env]]): Functions building the envs of the host.
+            array_infos (bool): Whether the infos of a step are sent as one struct of arrays instead of a dict per env.
+        """
+        self.envs = [env_fn() for env_fn in env_fns]
+        self.array_infos = array_infos
+        self.observation_space = self.envs[0].observation_space
+        self.action_space = self.envs[0].action_space
+
+    def step(self, actions: np.ndarray) -> Tuple[Any, ...]:
+        """
+        Steps every env with its action, resetting the envs whose episode ended.
+
+        Args:
+            actions (np.ndarray): The action of each env.
+
+        Returns:
+            Tuple[Any, ...]: The stacked observations, the rewards, the dones, the infos and the reset infos.
+        """
+        observations, rewards, dones, infos, reset_infos = [], [], [], [], []
+        for env, action in zip(self.envs, actions):
+            observation, reward, terminated, truncated, info = env.step(action)
+            done = terminated or truncated
+            info["TimeLimit.truncated"] = truncated and not terminated
+            reset_info = {}
+            if done:
+                info["terminal_observation"] = observation
+                observation, reset_info = env.reset()
+            observations.append(observation)
+            rewards.append(reward)
+            dones.append(done)
+            infos.append(info)
+            reset_infos.append(reset_info)
+        return (
+            stack_obs(observations, self.observation_space),
+            np.array(rewards),
+            np.array(dones, dtype=bool),
+            to_array_infos(infos) if self.array_infos else infos,
+            reset_infos,
+        )
+
+    def reset(
+        self, seeds: List[Optional[int]], options: List[Dict[str, Any]]
+    ) -> Tuple[Any, List[Dict[str, Any]]]:
+        """
+        Resets every env.
+
+        Args:
+            seeds (List[Optional[int]]): The seed of each env.
+            options (List[Dict[str, Any]]): The reset options of each env.
+
+        Returns:
+            Tuple[Any, List[Dict[str, Any]]]: The stacked observations and the reset infos.
+        """
+        observations, reset_infos = [], []
+        for env, seed, option in zip(self.envs, seeds, options):
+            maybe_options = {"options": option} if option else {}
+            observation, reset_info = env.reset(seed=seed, **maybe_options)
+            observations.append(observation)
+            reset_infos.append(reset_info)
+        return stack_obs(observations, self.observation_space), reset_infos
+
+    def rollout(
+        self,
+        n_steps: int,
+        seeds: List[Optional[int]],
+        observations: Optional[Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        Steps every env with seeded random actions for a number of steps, without replying between the steps.
+
+        Args:
+            n_steps (int): Number of steps of each env.
+            seeds (List[Optional[int]]): The seed of the actions of each env.
+            observations (Optional[Any]): The stacked current observations of the envs, to record the trajectories.
+
+        Returns:
+            Dict[str, Any]: The stacked observations after the last step, the return, length and task index of each episode that ended, the number of novelties injected by the schedules in each env and, if recorded, the observations, actions, rewards, dones and task indices with shape (n_envs, n_steps, ...).
+        """
+        n = len(self.envs)
+        record = observations is not None
+        last_obs = [None] * n
+        if record:
+            last_obs = [
+                {k: v[i] for k, v in observations.items()}
+                if isinstance(observations, dict)
+                else observations[i]
+                for i in range(n)
+            ]
+            trajectory_obs = [[] for _ in range(n)]
+            actions = [[] for _ in range(n)]
+            rewards = np.zeros((n, n_steps))
+            dones = np.zeros((n, n_steps), dtype=bool)
+            task_idx = np.zeros((n, n_steps), dtype=np.int64)
+        episode_returns, episode_lengths, episode_tasks = [], [], []
+        novelties = np.zeros(n, dtype=np.int64)
+        for i, (env, seed) in enumerate(zip(self.envs, seeds)):
+            rng = np.random.default_rng(seed)
+            for t in range(n_steps):
+                action = _random_action(env.action_space, rng)
+                observation, reward, terminated, truncated, info = env.step(action)
+                novelties[i] += info.get("novelty_injected", False)
+                if "episode" in info:
+                    episode_returns.append(info["episode"]["r"])
+                    episode_lengths.append(info["episode"]["l"])
+                    episode_tasks.append(info.get("task_idx", -1))
+                if record:
+                    trajectory_obs[i].append(last_obs[i])
+                    actions[i].append(action)
+                    rewards[i, t] = reward
+                    dones[i, t] = terminated or truncated
+                    task_idx[i, t] = info.get("task_idx", -1)
+                if terminated or truncated:
+                    observation, _ = env.reset()
+                # The recorded observations are held across steps, so they must not share buffers of the env
+                last_obs[i] = copy.deepcopy(observation) if record else observation
+        result = {
+            "last_observations": stack_obs(last_obs, self.observation_space),
+            "episode_returns": np.array(episode_returns, dtype=np.float64),
+            "episode_lengths": np.array(episode_lengths, dtype=np.int64),
+            "episode_task_idx": np.array(episode_tasks, dtype=np.int64),
+            "novelties": novelties,
+        }
+        if record:
+            result["observations"] = stack_obs(
+                [stack_obs(obs, self.observation_space) for obs in trajectory_obs],
+                self.observation_space,
+            )
+            result["actions"] = np.array(actions)
+            result["rewards"] = rewards
+            result["dones"] = dones
+            result["task_idx"] = task_idx
+        return result
+
+    def handle(self, cmd: int, data: Any) -> Any:
+        """
+        Runs a command other than step on the envs.
+
+        Args:
+            cmd (int): The command.
+            data (Any): The arguments of the command, the first one being the local env indices when the command targets some envs.
+
+        Returns:
+            Any: The result of the command.
+        """
+        if cmd == RESET:
+            return self.reset(*data)
+        if cmd == ROLLOUT:
+            return self.rollout(*data)
+        if cmd == RENDER:
+            return [env.render() for env in self.envs]
+        indices, args = data
+        envs = [self.envs[i] for i in indices]
+        if cmd == ENV_METHOD:
+            name, method_args, method_kwargs = args
+            return [env.get_wrapper_attr(name)(*method_args, **method_kwargs) for env in envs]
+        if cmd == GET_ATTR:
+            return [env.get_wrapper_attr(args) for env in envs]
+        if cmd == SET_ATTR:
+            for env in envs:
+                setattr(env, args[0], args[1])
+            return None
+        if cmd == HAS_ATTR:
+            results = []
+            for env in envs:
+                try:
+                    env.get_wrapper_attr(args)
+                    results.append(True)
+                except AttributeError:
+                    results.append(False)
+            return results
+        if cmd == IS_WRAPPED:
+            return [is_wrapped(env, args) for env in envs]
+        raise ValueError(f"Unknown command {cmd}.")
+
+    def close(self) -> None:
+        """Closes the envs."""
+        for env in self.envs:
+            env.close()
+
+
+def run_host(transport: Any) -> None:
+    """
+    Serves one coordinator until it closes its envs or disconnects.
+
+    The envs are built by the INIT command, which carries the functions building them as pickled code and the
+    info format, and the errors raised by a command are sent back to the coordinator instead of ending the
+    loop. The RELEASE command closes the envs but keeps the loop running, so that the worker can be initialized
+    again.
+
+    Args:
+        transport (Any): The connection to the coordinator, a PipeTransport or a SocketTransport.
+    """
+    host = None
+    try:
+        while True:
+            cmd, data = transport.recv()
+            try:
+                if cmd == STEP:
+                    transport.send(STEP, host.step(data))
+                elif cmd == INIT:
+                    if host is not None:
+                        host.close()
+                    env_fns, array_infos = data
+                    host = EnvHost(cloudpickle.loads(env_fns), array_infos=array_infos)
+                    transport.send(INIT, (host.observation_space, host.action_space))
+                elif cmd == RELEASE:
+                    if host is not None:
+                        host.close()
+                        host = None
+                    transport.send(RELEASE)
+                elif cmd == CLOSE:
+                    transport.send(CLOSE)
+                    break
+                else:
+                    transport.send(cmd, host.handle(cmd, data))
+            except Exception:
+                transport.send(ERROR, traceback.format_exc())
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        if host is not None:
+            host.close()
+        transport.close()
+
+
+def _random_action(space: gym.Space, rng: np.random.Generator) -> Any:
+    """
+    Samples a random action from the generator of an env, so that the actions don't depend on the seed of its
+    action space.
+
+    Args:
+        space (gymnasium.Space): The action space of the env.
+        rng (np.random.Generator): The generator of the env.
+
+    Returns:
+        Any: The action.
+    """
+    if isinstance(space, gym.spaces.Discrete):
+        return int(space.start + rng.integers(space.n))
+    space.seed(int(rng.integers(2**31)))
+    return space.sample()
+
+
+def _pipe_worker(remote: Any, parent_remote: Any) -> None:
+    parent_remote.close()
+    run_host(PipeTransport(remote))
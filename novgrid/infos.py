@@ -0,0 +1,154 @@
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+
+# Keys stored as one array over the envs, with their dtype and the value of the envs that don't report them
+DENSE_KEYS = {
+    "task_idx": (np.int64, -1),
+    "episode_return": (np.float64, np.nan),
+    "episode_len": (np.int64, 0),
+    "novelty_injected": (bool, False),
+    "TimeLimit.truncated": (bool, False),
+}
+
+Infos = Union[List[Dict[str, Any]], Dict[str, Any]]
+
+
+def to_array_infos(infos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Converts the per-env infos of a batch of envs into a struct of arrays.
+
+    The keys of DENSE_KEYS are arrays over the envs, the episode statistics of the Monitor being stored as
+    episode_return (NaN if no episode ended) and episode_len (0 if no episode ended). Any other key, such as
+    terminal_observation, is rare and stored sparsely as a dict from the env index to its value.
+
+    Args:
+        infos (List[Dict[str, Any]]): The info of each env.
+
+    Returns:
+        Dict[str, Any]: The dense arrays and the sparse dicts.
+    """
+    n = len(infos)
+    arrays = {k: np.full(n, fill, dtype=dtype) for k, (dtype, fill) in DENSE_KEYS.items()}
+    for i, info in enumerate(infos):
+        for k, v in info.items():
+            if k == "episode":
+                arrays["episode_return"][i] = v["r"]
+                arrays["episode_len"][i] = v["l"]
+            elif k in DENSE_KEYS:
+                arrays[k][i] = v
+            else:
+                arrays.setdefault(k, {})[i] = v
+    return arrays
+
+
+def concat_array_infos(parts: Sequence[Dict[str, Any]], starts: Sequence[int]) -> Dict[str, Any]:
+    """
+    Concatenates the array infos of consecutive batches of envs.
+
+    Args:
+        parts (Sequence[Dict[str, Any]]): The array infos of each batch.
+        starts (Sequence[int]): The index of the first env of each batch.
+
+    Returns:
+        Dict[str, Any]: The array infos of all the envs.
+    """
+    merged = {k: np.concatenate([part[k] for part in parts]) for k in DENSE_KEYS}
+    for part, start in zip(parts, starts):
+        for k, v in part.items():
+            if k not in DENSE_KEYS:
+                merged.setdefault(k, {}).update({start + i: x for i, x in v.items()})
+    return merged
+
+
+def get_info(infos: Infos, i: int, key: str, default: Any = None) -> Any:
+    """
+    Gets a key of the info of an env, from per-env or array infos.
+
+    Args:
+        infos (Infos): The per-env infos or the array infos.
+        i (int): Index of the env.
+        key (str): The key.
+        default (Any): Value returned if the env doesn't report the key.
+
+    Returns:
+        Any: The value of the key.
+    """
+    if isinstance(infos, dict):
+        if key in DENSE_KEYS:
+            return infos[key][i]
+        return infos.get(key, {}).get(i, default)
+    return infos[i].get(key, default)
+
+
+def set_info(infos: Infos, i: int, key: str, value: Any) -> None:
+    """
+    Sets a key of the info of an env, in per-env or array infos.
+
+    Args:
+        infos (Infos): The per-env infos or the array infos, updated in place.
+        i (int): Index of the env.
+        key (str): The key.
+        value (Any): The value of the key.
+    """
+    if isinstance(infos, dict):
+        if key in DENSE_KEYS:
+            infos[key][i] = value
+        else:
+            infos.setdefault(key, {})[i] = value
+    else:
+        infos[i][key] = value
+
+
+def info_array(infos: Infos, key: str) -> np.ndarray:
+    """
+    Gets a boolean key of the infos of every env as an array.
+
+    Args:
+        infos (Infos): The per-env infos or the array infos.
+        key (str): The key, missing keys count as False.
+
+    Returns:
+        np.ndarray: The value of the key for each env.
+    """
+    if isinstance(infos, dict):
+        return np.asarray(infos[key], dtype=bool)
+    return np.array([info.get(key, False) for info in infos], dtype=bool)
+
+
+def episode_returns(infos: Infos) -> List[float]:
+    """
+    Gets the returns of the episodes that ended, from per-env or array infos.
+
+    Args:
+        infos (Infos): The per-env infos or the array infos.
+
+    Returns:
+        List[float]: The return of each episode that ended, in the order of the envs.
+    """
+    if isinstance(infos, dict):
+        returns = infos["episode_return"]
+        return returns[~np.isnan(returns)].tolist()
+    return [info["episode"]["r"] for info in infos if "episode" in info]
+
+
+def test_array_infos_round_trip():
+    """
+    Test case for converting the infos of two batches of envs into one struct of arrays.
+    """
+    parts = [
+        to_array_infos([{"task_idx": 0}, {"task_idx": 1, "episode": {"r": 0.5, "l": 3, "t": 0.1}}]),
+        to_array_infos(
+            [{"task_idx": 1, "TimeLimit.truncated": True, "terminal_observation": "obs"}]
+        ),
+    ]
+    infos = concat_array_infos(parts, [0, 2])
+    assert infos["task_idx"].tolist() == [0, 1, 1]
+    assert infos["episode_len"].tolist() == [0, 3, 0] and episode_returns(infos) == [0.5]
+    assert info_array(infos, "TimeLimit.truncated").tolist() == [False, False, True]
+    assert infos["terminal_observation"] == {2: "obs"} and "episode" not in infos
+
+    set_info(infos, 0, "novelty_injected", True)
+    set_info(infos, 0, "terminal_observation", "other")
+    assert get_info(infos, 0, "novelty_injected") and get_info(infos, 1, "terminal_observation") is None
+    assert infos["terminal_observation"] == {2: "obs", 0: "other"}
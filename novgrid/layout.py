@@ -0,0 +1,394 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import abc
+import inspect
+import sys
+
+import gymnasium as gym
+from minigrid.core.world_object import Goal, Key
+
+from novgrid.envs.novgrid_objects import ColorDoor, MultiKeyDoor
+from novgrid.utils import skip_obs
+
+Anchors = Dict[str, Any]
+
+CORNERS = {
+    "top_left": (1, 1),
+    "top_right": (-2, 1),
+    "bottom_left": (1, -2),
+    "bottom_right": (-2, -2),
+}
+
+
+def find_anchors(env: gym.Env) -> Anchors:
+    """
+    Finds the layout anchors of a generated grid by scanning it once.
+
+    NovGrid envs record their anchors in a layout_anchors attribute while generating the grid, so the scan is
+    only needed for other MiniGrid envs.
+
+    Args:
+        env (gymnasium.Env): The unwrapped MiniGrid env.
+
+    Returns:
+        Dict[str, Any]: The position of the first "door" and "goal" found.
+    """
+    anchors = {}
+    grid = env.grid
+    for idx, cell in enumerate(grid.grid):
+        if cell is None:
+            continue
+        if cell.type not in anchors and cell.type in ("door", "goal"):
+            anchors[cell.type] = (idx % grid.width, idx // grid.width)
+    return anchors
+
+
+class LayoutPatch(abc.ABC):
+    """
+    Abstract class representing a small edit applied to a freshly generated grid.
+    """
+
+    def __init__(self) -> None:
+        """Initialization method for the LayoutPatch class."""
+        pass
+
+    def compile(self, width: int, height: int) -> None:
+        """
+        Precomputes everything that only depends on the grid size, once per task.
+
+        Args:
+            width (int): Width of the grid.
+            height (int): Height of the grid.
+        """
+        pass
+
+    @abc.abstractmethod
+    def apply(self, env: gym.Env, anchors: Anchors) -> None:
+        """
+        Abstract method to apply the edit to the grid of an env.
+
+        Args:
+            env (gymnasium.Env): The unwrapped MiniGrid env.
+            anchors (Dict[str, Any]): The layout anchors of the generated grid.
+        """
+        pass
+
+
+class RecolorDoor(LayoutPatch):
+    """
+    Changes the color of the door, and optionally the color of the key that opens it.
+    """
+
+    def __init__(self, color: str, key_color: Optional[str] = None) -> None:
+        """
+        Initializes the RecolorDoor patch.
+
+        Args:
+            color (str): New color of the door.
+            key_color (Optional[str]): Color of the key that opens the door, defaults to the door color.
+        """
+        super().__init__()
+        self.color = color
+        self.key_color = key_color if key_color is not None else color
+
+    def apply(self, env: gym.Env, anchors: Anchors) -> None:
+        """
+        Replaces the door with a door of the new color in the same state.
+
+        Args:
+            env (gymnasium.Env): The unwrapped MiniGrid env.
+            anchors (Dict[str, Any]): The layout anchors of the generated grid.
+        """
+        x, y = anchors["door"]
+        door = env.grid.get(x, y)
+        env.put_obj(
+            ColorDoor(
+                self.color,
+                is_open=door.is_open,
+                is_locked=door.is_locked,
+                key_color=self.key_color,
+            ),
+            x,
+            y,
+        )
+
+
+class SetDoorLocked(LayoutPatch):
+    """
+    Locks or unlocks the door.
+    """
+
+    def __init__(self, locked: bool = False) -> None:
+        """
+        Initializes the SetDoorLocked patch.
+
+        Args:
+            locked (bool): Whether the door is locked.
+        """
+        super().__init__()
+        self.locked = locked
+
+    def apply(self, env: gym.Env, anchors: Anchors) -> None:
+        """
+        Sets the lock of the door.
+
+        Args:
+            env (gymnasium.Env): The unwrapped MiniGrid env.
+            anchors (Dict[str, Any]): The layout anchors of the generated grid.
+        """
+        door = env.grid.get(*anchors["door"])
+        door.is_locked = self.locked
+        if self.locked:
+            door.is_open = False
+
+
+class RequireKeys(LayoutPatch):
+    """
+    Replaces the door with a locked door that needs several keys to unlock.
+    """
+
+    def __init__(self, key_colors: Sequence[str]) -> None:
+        """
+        Initializes the RequireKeys patch.
+
+        Args:
+            key_colors (Sequence[str]): Colors of the keys needed to unlock the door.
+        """
+        super().__init__()
+        self.key_colors = tuple(key_colors)
+
+    def apply(self, env: gym.Env, anchors: Anchors) -> None:
+        """
+        Replaces the door with a locked multi-key door of the same color.
+
+        Args:
+            env (gymnasium.Env): The unwrapped MiniGrid env.
+            anchors (Dict[str, Any]): The layout anchors of the generated grid.
+        """
+        x, y = anchors["door"]
+        door = env.grid.get(x, y)
+        env.put_obj(
+            MultiKeyDoor(door.color, is_locked=True, key_colors=self.key_colors),
+            x,
+            y,
+        )
+
+
+class MoveGoal(LayoutPatch):
+    """
+    Moves the goal to another cell, given as a corner name or as coordinates where negative values count from
+    the far edge of the grid. If the agent or an object is already at that cell, the goal goes to the first
+    free corner instead, so that the patch never removes an object the task may need.
+    """
+
+    def __init__(self, position: Union[str, Sequence[int]] = "top_right") -> None:
+        """
+        Initializes the MoveGoal patch.
+
+        Args:
+            position (Union[str, Sequence[int]]): A corner name ("top_left", "top_right", "bottom_left", "bottom_right") or the (x, y) coordinates.
+        """
+        super().__init__()
+        self.position = CORNERS[position] if isinstance(position, str) else tuple(position)
+        self.targets = None
+
+    def compile(self, width: int, height: int) -> None:
+        """
+        Resolves the target cell and the fallback corners for the grid size.
+
+        Args:
+            width (int): Width of the grid.
+            height (int): Height of the grid.
+        """
+        self.targets = []
+        for x, y in [self.position] + list(CORNERS.values()):
+            if (x % width, y % height) not in self.targets:
+                self.targets.append((x % width, y % height))
+
+    def apply(self, env: gym.Env, anchors: Anchors) -> None:
+        """
+        Moves the goal to the target cell, or to the first free corner if the target is taken.
+
+        Args:
+            env (gymnasium.Env): The unwrapped MiniGrid env.
+            anchors (Dict[str, Any]): The layout anchors of the generated grid.
+
+        Raises:
+            RuntimeError: If the target and every corner are taken.
+        """
+        goal_pos = tuple(anchors["goal"])
+        for target in self.targets:
+            if target == goal_pos:
+                return
+            if target != tuple(env.agent_pos) and env.grid.get(*target) is None:
+                break
+        else:
+            raise RuntimeError(f"No free cell to move the goal to among {self.targets}.")
+        goal = env.grid.get(*goal_pos)
+        env.grid.set(*goal_pos, None)
+        env.put_obj(goal if goal is not None else Goal(), *target)
+
+
+class AddKey(LayoutPatch):
+    """
+    Adds a key at a random free cell of the region the agent starts in.
+    """
+
+    def __init__(self, color: str) -> None:
+        """
+        Initializes the AddKey patch.
+
+        Args:
+            color (str): Color of the key.
+        """
+        super().__init__()
+        self.color = color
+
+    def apply(self, env: gym.Env, anchors: Anchors) -> None:
+        """
+        Places the key.
+
+        Args:
+            env (gymnasium.Env): The unwrapped MiniGrid env.
+            anchors (Dict[str, Any]): The layout anchors of the generated grid.
+        """
+        top, size = anchors.get("agent_region", ((0, 0), (env.width, env.height)))
+        env.place_obj(Key(self.color), top=top, size=size)
+
+
+def get_layout_patches() -> Dict[str, type]:
+    """
+    Gets the available layout patches by lowercase class name.
+
+    Returns:
+        Dict[str, type]: The layout patch classes.
+    """
+    return {
+        k.lower(): v
+        for k, v in inspect.getmembers(
+            sys.modules[__name__],
+            lambda obj: inspect.isclass(obj)
+            and issubclass(obj, LayoutPatch)
+            and obj is not LayoutPatch,
+        )
+    }
+
+
+class LayoutPatchWrapper(gym.Wrapper):
+    """
+    Applies layout patches to the grid generated on every reset, building the observation once afterwards.
+
+    The patches are compiled once when the wrapper is built, so a layout novelty only costs its cell edits per
+    reset. The wrapper must be applied directly to the MiniGrid env, below any wrapper that transforms
+    observations.
+
+    Attributes:
+        patches (List[LayoutPatch]): The compiled patches, applied in order.
+    """
+
+    def __init__(self, env: gym.Env, patches: List[Union[LayoutPatch, str, Dict[str, Any]]]) -> None:
+        """
+        Initializes the LayoutPatchWrapper.
+
+        Args:
+            env (gymnasium.Env): The MiniGrid env to wrap.
+            patches (List[Union[LayoutPatch, str, Dict[str, Any]]]): Patches, patch class names, or dicts with the class "name" and its kwargs.
+        """
+        super().__init__(env)
+        available = get_layout_patches()
+        self.patches = []
+        for patch in patches:
+            if not isinstance(patch, LayoutPatch):
+                kwargs = {} if isinstance(patch, str) else dict(patch)
+                name = patch if isinstance(patch, str) else kwargs.pop("name")
+                if name.lower() not in available:
+                    raise ValueError(
+                        f"Unknown layout patch {name}, expected one of {sorted(available)}."
+                    )
+                patch = available[name.lower()](**kwargs)
+            patch.compile(env.unwrapped.width, env.unwrapped.height)
+            self.patches.append(patch)
+
+    def reset(self, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Resets the env and patches the generated grid.
+
+        Returns:
+            Tuple[Any, Dict[str, Any]]: Reset information.
+        """
+        with skip_obs(self.env) as unwrapped:
+            _, info = self.env.reset(**kwargs)
+            anchors = getattr(unwrapped, "layout_anchors", None)
+            if anchors is None:
+                anchors = find_anchors(unwrapped)
+            for patch in self.patches:
+                patch.apply(unwrapped, anchors)
+        return unwrapped.gen_obs(), info
+
+
+def apply_layout_patches(
+    env: gym.Env, patches: Optional[Union[str, Dict[str, Any], List[Any]]]
+) -> gym.Env:
+    """
+    Wraps an env in the layout patches of an env config.
+
+    Args:
+        env (gymnasium.Env): The MiniGrid env to wrap.
+        patches (Optional[Union[str, Dict[str, Any], List[Any]]]): A patch class name, a dict with the class "name" and its kwargs, or a list of those.
+
+    Returns:
+        gymnasium.Env: The wrapped env.
+    """
+    if patches is None:
+        return env
+    if not isinstance(patches, list):
+        patches = [patches]
+    return LayoutPatchWrapper(env, patches)
+
+
+def test_layout_patches_from_config():
+    """
+    Test case for patching the goal, door and keys of a generated grid from an env config.
+    """
+    import numpy as np
+
+    env = apply_layout_patches(
+        gym.make("NovGrid-ColoredDoorKeyEnv", size=8),
+        [
+            {"name": "MoveGoal", "position": "top_right"},
+            {"name": "AddKey", "color": "blue"},
+            {"name": "RecolorDoor", "color": "purple", "key_color": "blue"},
+        ],
+    )
+    obs, _ = env.reset(seed=0)
+    unwrapped = env.unwrapped
+    grid = unwrapped.grid
+
+    assert grid.get(6, 1).type == "goal" and grid.get(6, 6) is None
+    door = grid.get(*unwrapped.layout_anchors["door"])
+    assert (door.color, door.key_color, door.is_locked) == ("purple", "blue", True)
+    assert sorted(c.color for c in grid.grid if c is not None and c.type == "key") == [
+        "blue",
+        "yellow",
+    ]
+    assert np.array_equal(obs["image"], unwrapped.gen_obs()["image"])
+
+    # A target cell holding an object sends the goal to the first free corner instead
+    plain = gym.make("NovGrid-ColoredDoorKeyEnv", size=8).unwrapped
+    plain.reset(seed=0)
+    key = Key("red")
+    plain.grid.set(6, 1, key)
+    plain.agent_pos = (3, 4)
+    patch = MoveGoal("top_right")
+    patch.compile(plain.width, plain.height)
+    patch.apply(plain, plain.layout_anchors)
+    assert plain.grid.get(6, 1) is key and plain.grid.get(1, 1).type == "goal"
+    assert plain.grid.get(6, 6) is None
+
+    # With the other corners taken, the goal stays in its own corner instead of overwriting an object
+    plain.reset(seed=0)
+    for x, y in [(6, 1), (1, 1), (1, 6)]:
+        plain.grid.set(x, y, Key("red"))
+    plain.agent_pos = (3, 4)
+    patch.apply(plain, {"goal": (6, 6)})
+    assert plain.grid.get(6, 6).type == "goal"
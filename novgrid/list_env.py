@@ -0,0 +1,671 @@
+from typing import Any, Callable, Dict, List, Optional, SupportsFloat, Tuple, Union
+
+import copy
+import dataclasses
+import functools
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import gymnasium as gym
+from gymnasium.envs.registration import EnvSpec, load_env_creator
+from gymnasium.wrappers import OrderEnforcing, PassiveEnvChecker, TimeLimit
+import numpy as np
+
+from novgrid.dynamics import apply_dynamics
+from novgrid.layout import apply_layout_patches
+from novgrid.schedules import NoveltySchedule, make_schedule
+from novgrid.spaces import ObsPadder, union_space
+import novgrid.envs.novgrid_objects as novgrid_objects
+
+
+def config_key(config: Dict[str, Any]) -> str:
+    """
+    Hashes a task config into a key that is equal for identical tasks, whatever the order of their kwargs and
+    whether their world objects are resolved.
+
+    Args:
+        config (Dict[str, Any]): Configuration of the task.
+
+    Returns:
+        str: The hex digest of the canonical config.
+    """
+
+    def _canonical(obj):
+        if inspect.isclass(obj) and issubclass(obj, novgrid_objects.WorldObj):
+            return f"gridobj:{obj.__name__.lower()}"
+        if inspect.isclass(obj) or callable(obj):
+            return f"{obj.__module__}.{obj.__qualname__}"
+        return repr(obj)
+
+    canonical = {
+        k: (
+            f"gridobj:{v.split(':')[-1].lower()}"
+            if type(v) == str and v.startswith("gridobj:")
+            else v
+        )
+        for k, v in config.items()
+    }
+    return hashlib.sha1(
+        json.dumps(canonical, sort_keys=True, default=_canonical).encode()
+    ).hexdigest()
+
+
+def task_seed(seed: Optional[int], task_idx: int) -> Optional[int]:
+    """
+    Derives the seed used to reset a task from the seed of its worker.
+
+    Args:
+        seed (Optional[int]): The seed of the worker.
+        task_idx (int): Index of the task.
+
+    Returns:
+        Optional[int]: The seed of the task, or None if the worker is unseeded.
+    """
+    if seed is None or task_idx == 0:
+        return seed
+    return int(np.random.SeedSequence([seed, task_idx]).generate_state(1)[0])
+
+
+def make_task_env(
+    config: Dict[str, Any], render_mode: Optional[str] = None, direct: bool = False
+) -> gym.Env:
+    """
+    Builds the env of a single task, with its layout and dynamics novelties applied.
+
+    Args:
+        config (Dict[str, Any]): Configuration of the task, with world objects resolved.
+        render_mode (Optional[str]): Render mode for the environment.
+        direct (bool): Whether to build a registered env from its entry point, without the env checker, order enforcing and time limit wrappers of gym.make.
+
+    Returns:
+        gymnasium.Env: The env of the task.
+    """
+    env_id = config["env_id"]
+    env_kwargs = {
+        k: v for k, v in config.items() if k not in ("env_id", "dynamics", "layout")
+    }
+
+    # Initialize the environment
+    if isinstance(env_id, str) and direct:
+        spec = gym.spec(env_id)
+        kwargs = {**spec.kwargs, **env_kwargs}
+        creator = (
+            spec.entry_point
+            if callable(spec.entry_point)
+            else load_env_creator(spec.entry_point)
+        )
+        env = creator(**kwargs, render_mode=render_mode)
+        env.unwrapped.spec = dataclasses.replace(spec, kwargs=kwargs)
+    elif isinstance(env_id, str):
+        env = gym.make(env_id, render_mode=render_mode, **env_kwargs)
+    else:
+        env = env_id(**env_kwargs, render_mode=render_mode)
+
+    # Apply the layout and dynamics novelties of the task directly to the env
+    env = apply_layout_patches(env, config.get("layout"))
+    env = apply_dynamics(env, config.get("dynamics"))
+    return env
+
+
+def reconfigure_task_env(
+    env: gym.Env, config: Dict[str, Any], render_mode: Optional[str] = None
+) -> bool:
+    """
+    Moves a live task env to another task of the same env class through the reconfigure method of the
+    unwrapped env, keeping its wrappers. The spec of the env is updated, and the wrappers of gym.make are reset
+    as for a new env.
+
+    Args:
+        env (gymnasium.Env): The env of a task with the same env_id, layout and dynamics.
+        config (Dict[str, Any]): Configuration of the task to move to, with world objects resolved.
+        render_mode (Optional[str]): Render mode for the environment.
+
+    Returns:
+        bool: Whether the env was moved, False if the env has no reconfigure method or it doesn't take some
+        kwargs of the task, in which case the task needs its own env.
+    """
+    env_id = config["env_id"]
+    kwargs = dict(gym.spec(env_id).kwargs) if isinstance(env_id, str) else {}
+    kwargs.update(
+        {k: v for k, v in config.items() if k not in ("env_id", "dynamics", "layout")}
+    )
+    unwrapped = env.unwrapped
+    reconfigure = getattr(unwrapped, "reconfigure", None)
+    if (
+        reconfigure is None
+        or render_mode != unwrapped.render_mode
+        or not set(kwargs) <= set(inspect.signature(reconfigure).parameters)
+    ):
+        return False
+    reconfigure(**kwargs)
+    if unwrapped.spec is not None:
+        unwrapped.spec = dataclasses.replace(unwrapped.spec, kwargs=kwargs)
+
+    while isinstance(env, gym.Wrapper):
+        if isinstance(env, TimeLimit):
+            env._elapsed_steps = None
+        elif isinstance(env, OrderEnforcing):
+            env._has_reset = False
+        elif isinstance(env, PassiveEnvChecker):
+            env.checked_reset = env.checked_step = False
+        env = env.env
+    return True
+
+
+def _reconfigure_signature(env: gym.Env) -> Tuple[Any, ...]:
+    """
+    Summarizes what the wrappers of a task env may have derived from the unwrapped env when they were built.
+
+    Args:
+        env (gymnasium.Env): The env of a task.
+
+    Returns:
+        Tuple[Any, ...]: The unwrapped observation and action spaces, and the grid size of MiniGrid envs.
+    """
+    unwrapped = env.unwrapped
+    return (
+        unwrapped.observation_space,
+        unwrapped.action_space,
+        getattr(unwrapped, "width", None),
+        getattr(unwrapped, "height", None),
+    )
+
+
+def build_list_env(
+    env_configs: List[Dict[str, Any]],
+    rank: int,
+    wrappers: List[gym.Wrapper] = [],
+    wrapper_kwargs_lst: List[Dict[str, Any]] = [],
+    seed: Optional[int] = None,
+    monitor_dir: Optional[str] = None,
+    monitor_kwargs: Optional[Dict[str, Any]] = None,
+    render_mode: Optional[str] = None,
+    build_workers: Optional[int] = None,
+    schedule: Optional[Union[NoveltySchedule, str, Dict[str, Any]]] = None,
+    reconfigure_tasks: bool = False,
+    dedupe_tasks: bool = False,
+    fused_wrappers: bool = False,
+    lazy_tasks: bool = False,
+    observation_spaces: Optional[List[gym.Space]] = None,
+    copy_obs: bool = True,
+) -> "ListEnv":
+    """
+    Builds the ListEnv of a single worker, in the worker process.
+
+    Args:
+        env_configs (List[Dict[str, Any]]): Configuration for environments, with world objects resolved.
+        rank (int): Index of the worker.
+        wrappers (List[gymnasium.Wrapper]): List of wrappers to apply to each environment.
+        wrapper_kwargs_lst (List[Dict[str, Any]]): List of wrapper kwargs for each wrapper.
+        seed (Optional[int]): Random seed.
+        monitor_dir (Optional[str]): Directory for monitoring results.
+        monitor_kwargs (Optional[Dict[str, Any]]): Additional kwargs for monitoring.
+        render_mode (Optional[str]): Render mode for environments.
+        build_workers (Optional[int]): Number of threads building the task envs concurrently, the envs are built serially if None.
+        schedule (Optional[Union[NoveltySchedule, str, Dict[str, Any]]]): Novelty schedule run inside the worker, each worker gets its own copy.
+        reconfigure_tasks (bool): Whether consecutive tasks of the same env class share one env, reconfigured in place when the next task starts. The envs are then built serially.
+        dedupe_tasks (bool): Whether tasks with identical configs share one env. The envs are then built serially.
+        fused_wrappers (bool): Whether registered envs are built from their entry point and wrapped in a FusedTaskMonitor instead of the wrappers of gym.make and a Monitor.
+        lazy_tasks (bool): Whether the env of each task is only built when the task starts, and dropped when it ends.
+        observation_spaces (Optional[List[gymnasium.Space]]): The observation space of each task, needed with lazy_tasks.
+        copy_obs (bool): Whether the padded observations are copies, see ObsPadder.
+
+    Returns:
+        ListEnv: The ListEnv of the worker.
+    """
+    # The Monitor of stable_baselines3 imports torch, so it is only imported once the worker builds its envs
+    from novgrid.monitor import FusedTaskMonitor, TaskMonitor
+
+    monitor_kwargs = {} if monitor_kwargs is None else monitor_kwargs
+
+    def _make_env(config, task_idx):
+        env = make_task_env(config, render_mode=render_mode, direct=fused_wrappers)
+
+        # Optionally use the random seed provided, the env itself is seeded on reset
+        if seed is not None:
+            env.action_space.seed(seed + rank)
+
+        # Wrap the env in a Monitor wrapper
+        # to have additional training information, in one file per task env
+        monitor_path = None
+        if monitor_dir is not None:
+            # Create the monitor folder if needed
+            os.makedirs(os.path.join(monitor_dir, str(rank)), exist_ok=True)
+            monitor_path = os.path.join(monitor_dir, str(rank), str(task_idx))
+        if fused_wrappers:
+            spec = env.unwrapped.spec
+            env = FusedTaskMonitor(
+                env,
+                filename=monitor_path,
+                task_idx=task_idx,
+                max_episode_steps=spec.max_episode_steps if spec is not None else None,
+                **monitor_kwargs,
+            )
+        else:
+            env = TaskMonitor(env, filename=monitor_path, task_idx=task_idx, **monitor_kwargs)
+
+        # Wrap the environment with the provided wrappers
+        for wrapper_cls, wrapper_kwargs in zip(
+            wrappers,
+            wrapper_kwargs_lst + [{}] * max(0, len(wrappers) - len(wrapper_kwargs_lst)),
+        ):
+            env = wrapper_cls(env, **wrapper_kwargs)
+
+        return env
+
+    def _make_shared_envs():
+        keys = [config_key(config) for config in env_configs]
+        env_lst = []
+        # Key of the config that each built env is currently on
+        live_keys = {}
+        for i, config in enumerate(env_configs):
+            if dedupe_tasks and keys[i] in keys[:i]:
+                env_lst.append(env_lst[keys.index(keys[i])])
+                continue
+            if reconfigure_tasks and i > 0 and all(
+                env_configs[i - 1].get(k) == config.get(k) for k in ("env_id", "layout", "dynamics")
+            ):
+                # Probe the task on the live env, which is kept if the wrappers stay valid
+                live = env_lst[-1]
+                signature = _reconfigure_signature(live)
+                if reconfigure_task_env(live, config, render_mode=render_mode):
+                    if _reconfigure_signature(live) == signature:
+                        env_lst.append(live)
+                        live_keys[id(live)] = keys[i]
+                        continue
+                    reconfigure_task_env(
+                        live, env_configs[keys.index(live_keys[id(live)])], render_mode=render_mode
+                    )
+            env_lst.append(_make_env(config, i))
+            live_keys[id(env_lst[-1])] = keys[i]
+
+        # Envs shared by different configs are moved to the config of each task when it starts
+        reconfigure_fns = []
+        for i, env in enumerate(env_lst):
+            shared_keys = {keys[j] for j, other in enumerate(env_lst) if other is env}
+            reconfigure_fns.append(
+                functools.partial(
+                    reconfigure_task_env, config=env_configs[i], render_mode=render_mode
+                )
+                if len(shared_keys) > 1
+                else None
+            )
+        # Move each reconfigured env back to the first of its tasks
+        for i, env in enumerate(env_lst):
+            if reconfigure_fns[i] is not None and env_lst.index(env) == i:
+                reconfigure_fns[i](env)
+        return env_lst, reconfigure_fns
+
+    worker_schedule = make_schedule(copy.deepcopy(schedule))
+    if lazy_tasks:
+        env_fns = [
+            functools.partial(_make_env, config, i) for i, config in enumerate(env_configs)
+        ]
+        return ListEnv(
+            [env_fns[0]()] + [None] * (len(env_fns) - 1),
+            worker_schedule,
+            env_fns=env_fns,
+            observation_spaces=observation_spaces,
+            copy_obs=copy_obs,
+        )
+    if reconfigure_tasks or dedupe_tasks:
+        env_lst, reconfigure_fns = _make_shared_envs()
+        return ListEnv(env_lst, worker_schedule, reconfigure_fns, copy_obs=copy_obs)
+    if build_workers is None:
+        return ListEnv(
+            [_make_env(config, i) for i, config in enumerate(env_configs)],
+            worker_schedule,
+            copy_obs=copy_obs,
+        )
+    with ThreadPoolExecutor(max_workers=build_workers) as executor:
+        return ListEnv(
+            list(executor.map(_make_env, env_configs, range(len(env_configs)))),
+            worker_schedule,
+            copy_obs=copy_obs,
+        )
+
+
+def make_list_env_fn(
+    env_configs: List[Dict[str, Any]],
+    rank: int,
+    wrappers: List[gym.Wrapper] = [],
+    wrapper_kwargs_lst: List[Dict[str, Any]] = [],
+    seed: Optional[int] = None,
+    monitor_dir: Optional[str] = None,
+    monitor_kwargs: Optional[Dict[str, Any]] = None,
+    render_mode: Optional[str] = None,
+    build_workers: Optional[int] = None,
+    schedule: Optional[Union[NoveltySchedule, str, Dict[str, Any]]] = None,
+    reconfigure_tasks: bool = False,
+    dedupe_tasks: bool = False,
+    fused_wrappers: bool = False,
+    lazy_tasks: bool = False,
+    observation_spaces: Optional[List[gym.Space]] = None,
+    copy_obs: bool = True,
+) -> Callable[[], "ListEnv"]:
+    """
+    Creates a function that builds the ListEnv of a single worker.
+
+    The function is a partial of build_list_env, which is pickled by reference, so that only the arguments are
+    sent to the worker.
+
+    Args:
+        env_configs (List[Dict[str, Any]]): Configuration for environments, with world objects resolved.
+        rank (int): Index of the worker.
+        wrappers (List[gymnasium.Wrapper]): List of wrappers to apply to each environment.
+        wrapper_kwargs_lst (List[Dict[str, Any]]): List of wrapper kwargs for each wrapper.
+        seed (Optional[int]): Random seed.
+        monitor_dir (Optional[str]): Directory for monitoring results.
+        monitor_kwargs (Optional[Dict[str, Any]]): Additional kwargs for monitoring.
+        render_mode (Optional[str]): Render mode for environments.
+        build_workers (Optional[int]): Number of threads building the task envs concurrently, the envs are built serially if None.
+        schedule (Optional[Union[NoveltySchedule, str, Dict[str, Any]]]): Novelty schedule run inside the worker, each worker gets its own copy.
+        reconfigure_tasks (bool): Whether consecutive tasks of the same env class share one env, reconfigured in place when the next task starts. The envs are then built serially.
+        dedupe_tasks (bool): Whether tasks with identical configs share one env. The envs are then built serially.
+        fused_wrappers (bool): Whether registered envs are built from their entry point and wrapped in a FusedTaskMonitor instead of the wrappers of gym.make and a Monitor.
+        lazy_tasks (bool): Whether the env of each task is only built when the task starts, and dropped when it ends.
+        observation_spaces (Optional[List[gymnasium.Space]]): The observation space of each task, needed with lazy_tasks.
+        copy_obs (bool): Whether the padded observations are copies, see ObsPadder.
+
+    Returns:
+        Callable[[], ListEnv]: Function that builds the ListEnv.
+    """
+    if lazy_tasks and (reconfigure_tasks or dedupe_tasks):
+        raise ValueError("Lazy tasks can't be combined with reconfigure_tasks or dedupe_tasks.")
+    if lazy_tasks and observation_spaces is None:
+        raise ValueError("The observation spaces of the tasks are needed with lazy_tasks.")
+    return functools.partial(
+        build_list_env,
+        env_configs=env_configs,
+        rank=rank,
+        wrappers=wrappers,
+        wrapper_kwargs_lst=wrapper_kwargs_lst,
+        seed=seed,
+        monitor_dir=monitor_dir,
+        monitor_kwargs=monitor_kwargs,
+        render_mode=render_mode,
+        build_workers=build_workers,
+        schedule=schedule,
+        reconfigure_tasks=reconfigure_tasks,
+        dedupe_tasks=dedupe_tasks,
+        fused_wrappers=fused_wrappers,
+        lazy_tasks=lazy_tasks,
+        observation_spaces=observation_spaces,
+        copy_obs=copy_obs,
+    )
+
+
+class ListEnv(gym.Env):
+    """
+    A vectorized environment that chains multiple environments together.
+
+    Attributes:
+        env_lst (List[gymnasium.Env]): List of environments to chain.
+        env_idx (int): Index of the current environment.
+        seed_value (Optional[int]): Seed of the last seeded reset, used to derive the seed of each task.
+        padders (List[ObsPadder]): Per environment, pads its observations into the union observation space.
+        reconfigure_fns (List[Optional[Callable[[gymnasium.Env], None]]]): Per environment, moves the env it shares with other tasks to its task, None if it has its own env.
+        schedule (Optional[NoveltySchedule]): Schedule deciding when to move on to the next environment, inside the worker.
+        novelty_pending (bool): Whether the schedule fired, the next environment starts on the next reset.
+        env_fns (Optional[List[Callable[[], gymnasium.Env]]]): Per environment, the function building it when its task starts, if the environments are built lazily.
+    """
+
+    def __init__(
+        self,
+        env_lst: List[Optional[gym.Env]],
+        schedule: Optional[NoveltySchedule] = None,
+        reconfigure_fns: Optional[List[Optional[Callable[[gym.Env], None]]]] = None,
+        env_fns: Optional[List[Callable[[], gym.Env]]] = None,
+        observation_spaces: Optional[List[gym.Space]] = None,
+        copy_obs: bool = True,
+    ) -> None:
+        """
+        Initializes the ListEnv with a list of environments.
+
+        Args:
+            env_lst (List[gymnasium.Env]): List of environments to chain, tasks may share the same env.
+            schedule (Optional[NoveltySchedule]): Schedule deciding when to move on to the next environment, inside the worker.
+            reconfigure_fns (Optional[List[Optional[Callable[[gymnasium.Env], None]]]]): Per environment, moves a shared env to its task, None if it has its own env.
+            env_fns (Optional[List[Callable[[], gymnasium.Env]]]): Per environment, the function building it, to build the environments that are None in env_lst when their task starts and drop them when it ends.
+            observation_spaces (Optional[List[gymnasium.Space]]): The observation space of each environment, defaults to those of env_lst, which must then all be built.
+            copy_obs (bool): Whether the padded observations are copies, see ObsPadder.
+
+        Raises:
+            ValueError: If the observation spaces of the environments cannot be unioned.
+        """
+        self.env_lst = env_lst
+        self.env_fns = env_fns
+        self.env_idx = 0
+        self.seed_value = None
+        if observation_spaces is None:
+            observation_spaces = [env.observation_space for env in env_lst]
+        self._observation_space = union_space(observation_spaces)
+        self.padders = [
+            ObsPadder(space, self._observation_space, copy=copy_obs)
+            for space in observation_spaces
+        ]
+        self.reconfigure_fns = (
+            reconfigure_fns if reconfigure_fns is not None else [None] * len(env_lst)
+        )
+        self._shared = [
+            env is not None and sum(other is env for other in env_lst) > 1 for env in env_lst
+        ]
+        self.schedule = schedule
+        self.novelty_pending = False
+        if schedule is not None:
+            schedule.start_task(0)
+
+    def _switch_task(self, task_idx: int) -> None:
+        """
+        Moves on to a task, closing the current environment unless this or a later task shares it.
+
+        Args:
+            task_idx (int): Index of the task to move to.
+        """
+        prev_env, prev_idx = self.cur_env, self.env_idx
+        self.env_idx = task_idx
+        if all(env is not prev_env for env in self.env_lst[task_idx:]):
+            prev_env.close()
+            if self.env_fns is not None:
+                self.env_lst[prev_idx] = None
+        if self.env_lst[task_idx] is None:
+            self.env_lst[task_idx] = self.env_fns[task_idx]()
+        if self.reconfigure_fns[task_idx] is not None:
+            self.reconfigure_fns[task_idx](self.cur_env)
+        if self._shared[task_idx]:
+            # Tag the next episodes of the shared env with this task
+            self.cur_env.set_wrapper_attr("task_idx", task_idx)
+        self.novelty_pending = False
+        if self.schedule is not None:
+            self.schedule.start_task(task_idx)
+
+    def _next_task(self) -> None:
+        """Closes the current environment and moves on to the next one."""
+        self._switch_task(self.env_idx + 1)
+
+    def incr_env_idx(self) -> bool:
+        """
+        Increments the environment index, closing the current environment and resetting to the next one.
+
+        Returns:
+            bool: True if the environment index was successfully incremented, False otherwise.
+        """
+        return self.inject_novelty()[0]
+
+    def inject_novelty(self) -> Tuple[bool, Any]:
+        """
+        Increments the environment index like incr_env_idx, also returning the first observation of the next environment.
+
+        Returns:
+            Tuple[bool, Any]: Whether the environment index was incremented, and the reset observation of the next environment if it was.
+        """
+        if self.env_idx >= len(self.env_lst) - 1:
+            return False, None
+        self._next_task()
+        obs, _ = self.cur_env.reset(seed=task_seed(self.seed_value, self.env_idx))
+        return True, self.padders[self.env_idx](obs)
+
+    def restore_task(self, task_idx: int, seed: Optional[int] = None) -> Any:
+        """
+        Moves a freshly built ListEnv to a task, when a crashed worker is respawned.
+
+        Args:
+            task_idx (int): Index of the task to move to.
+            seed (Optional[int]): Seed of the worker, used to derive the seed of the task.
+
+        Returns:
+            Any: The reset observation of the task.
+        """
+        self._switch_task(task_idx)
+        self.seed_value = seed
+        obs, _ = self.cur_env.reset(seed=task_seed(seed, task_idx))
+        return self.padders[task_idx](obs)
+
+    def step(
+        self, action: Any
+    ) -> Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]:
+        """
+        Takes a step in the current environment.
+
+        Args:
+            action (Any): Action to take.
+
+        Returns:
+            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information, with the observation padded into the union observation space and the index of the environment as task_idx in the info.
+        """
+        obs, reward, terminated, truncated, info = self.cur_env.step(action=action)
+        if (
+            self.schedule is not None
+            and not self.novelty_pending
+            and self.env_idx < len(self.env_lst) - 1
+            and self.schedule.step(reward, terminated, truncated, info)
+        ):
+            # Cut the episode, the next environment starts on the reset that follows
+            self.novelty_pending = True
+            info["novelty_injected"] = True
+            if not terminated:
+                truncated = True
+        info["task_idx"] = self.env_idx
+        return self.padders[self.env_idx](obs), reward, terminated, truncated, info
+
+    def reset(
+        self, *, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Resets the current environment, moving on to the next one first if the schedule fired. A provided seed
+        is remembered so that the next tasks are seeded deterministically when they are reached.
+
+        Args:
+            seed (Optional[int]): Seed for environment reset.
+            options (Optional[Dict[str, Any]]): Additional options for reset.
+
+        Returns:
+            Tuple[Any, Dict[str, Any]]: Reset information, with the observation padded into the union observation space.
+        """
+        switched = self.novelty_pending
+        if switched:
+            self._next_task()
+        if seed is not None:
+            self.seed_value = seed
+            seed = task_seed(seed, self.env_idx)
+        elif switched:
+            seed = task_seed(self.seed_value, self.env_idx)
+        obs, info = self.cur_env.reset(seed=seed, options=options)
+        return self.padders[self.env_idx](obs), info
+
+    def render(self) -> Union[gym.core.RenderFrame, List[gym.core.RenderFrame], None]:
+        """
+        Renders the current environment.
+
+        Returns:
+            Union[gymnasium.core.RenderFrame, List[gymnasium.core.RenderFrame], None]: Rendered frame(s).
+        """
+        return self.cur_env.render()
+
+    def close(self) -> None:
+        """Closes all environments in the list, once each."""
+        for env in {id(env): env for env in self.env_lst if env is not None}.values():
+            env.close()
+
+    @property
+    def cur_env(self) -> gym.Env:
+        """
+        Gets the current environment.
+
+        Returns:
+            gymnasium.Env: Current environment.
+        """
+        return self.env_lst[self.env_idx]
+
+    @property
+    def unwrapped(self) -> gym.Env:
+        """
+        Gets the unwrapped version of the current environment.
+
+        Returns:
+            gymnasium.Env: Unwrapped current environment.
+        """
+        return self.cur_env
+
+    @property
+    def action_space(self) -> gym.Space:
+        """
+        Gets the action space of the current environment.
+
+        Returns:
+            gymnasium.Space: Action space.
+        """
+        return self.cur_env.action_space
+
+    @property
+    def observation_space(self) -> gym.Space:
+        """
+        Gets the union of the observation spaces of all the environments, which every observation is padded into.
+
+        Returns:
+            gymnasium.Space: Observation space.
+        """
+        return self._observation_space
+
+    @property
+    def reward_range(self) -> Tuple[SupportsFloat, SupportsFloat]:
+        """
+        Gets the reward range of the current environment.
+
+        Returns:
+            Tuple[SupportsFloat, SupportsFloat]: Reward range.
+        """
+        return self.cur_env.reward_range
+
+    @property
+    def spec(self) -> EnvSpec:
+        """
+        Gets the spec of the current environment.
+
+        Returns:
+            gymnasium.EnvSpec: Environment specification.
+        """
+        return self.cur_env.spec
+
+    @property
+    def np_random(self) -> np.random.RandomState:
+        """
+        Gets the random number generator of the current environment.
+
+        Returns:
+            np.random.RandomState: Random number generator.
+        """
+        return self.cur_env.np_random
+
+    @property
+    def render_mode(self) -> Optional[str]:
+        """
+        Gets the render mode of the current environment.
+
+        Returns:
+            Optional[str]: Render mode.
+        """
+        return self.cur_env.render_mode
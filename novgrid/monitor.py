@@ -0,0 +1,112 @@
+from typing import Any, Dict, Optional, SupportsFloat, Tuple
+
+import time
+
+import gymnasium as gym
+from stable_baselines3.common.monitor import Monitor, ResultsWriter
+
+
+class TaskMonitor(Monitor):
+    """
+    A Monitor that tags each episode with the index of the task it ran in, as the task_idx column of the
+    monitor file and in the episode info, so that the visits of tasks sharing an env keep distinct statistics.
+
+    Attributes:
+        task_idx (int): Index of the task that the env runs, set by the ListEnv when the task starts.
+    """
+
+    def __init__(
+        self,
+        env: gym.Env,
+        filename: Optional[str] = None,
+        task_idx: int = 0,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Initializes the TaskMonitor.
+
+        Args:
+            env (gymnasium.Env): The env of the task.
+            filename (Optional[str]): Path of the monitor file, without the monitor.csv extension.
+            task_idx (int): Index of the task that the env runs first.
+            **kwargs: The other arguments of Monitor.
+        """
+        super().__init__(env, filename=None, **kwargs)
+        self.task_idx = task_idx
+        if filename is not None:
+            env_id = env.spec.id if env.spec is not None else None
+            self.results_writer = ResultsWriter(
+                filename,
+                header={"t_start": self.t_start, "env_id": str(env_id)},
+                extra_keys=self.reset_keywords + self.info_keywords + ("task_idx",),
+                override_existing=kwargs.get("override_existing", True),
+            )
+
+    def reset(self, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        result = super().reset(**kwargs)
+        self.current_reset_info["task_idx"] = self.task_idx
+        return result
+
+
+class FusedTaskMonitor(TaskMonitor):
+    """
+    A TaskMonitor that also applies the time limit of the env spec, standing in for the wrappers of gym.make
+    when task envs are built from their entry point, so that each step goes through one wrapper instead of
+    four. Stepping before a reset still raises, like the order enforcing of gym.make.
+
+    Attributes:
+        max_episode_steps (Optional[int]): Number of steps after which episodes are truncated, never if None.
+        elapsed_steps (int): Number of steps of the current episode.
+    """
+
+    def __init__(
+        self,
+        env: gym.Env,
+        filename: Optional[str] = None,
+        task_idx: int = 0,
+        max_episode_steps: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Initializes the FusedTaskMonitor.
+
+        Args:
+            env (gymnasium.Env): The env of the task.
+            filename (Optional[str]): Path of the monitor file, without the monitor.csv extension.
+            task_idx (int): Index of the task that the env runs first.
+            max_episode_steps (Optional[int]): Number of steps after which episodes are truncated, never if None.
+            **kwargs: The other arguments of Monitor.
+        """
+        super().__init__(env, filename=filename, task_idx=task_idx, **kwargs)
+        self.max_episode_steps = max_episode_steps
+        self.elapsed_steps = 0
+
+    def reset(self, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        self.elapsed_steps = 0
+        return super().reset(**kwargs)
+
+    def step(self, action: Any) -> Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]:
+        if self.needs_reset:
+            raise RuntimeError("Tried to step environment that needs reset")
+        observation, reward, terminated, truncated, info = self.env.step(action)
+        self.elapsed_steps += 1
+        if self.max_episode_steps is not None and self.elapsed_steps >= self.max_episode_steps:
+            truncated = True
+        self.rewards.append(float(reward))
+        if terminated or truncated:
+            self.needs_reset = True
+            ep_rew = sum(self.rewards)
+            ep_len = len(self.rewards)
+            ep_time = time.time() - self.t_start
+            ep_info = {"r": round(ep_rew, 6), "l": ep_len, "t": round(ep_time, 6)}
+            for key in self.info_keywords:
+                ep_info[key] = info[key]
+            self.episode_returns.append(ep_rew)
+            self.episode_lengths.append(ep_len)
+            self.episode_times.append(ep_time)
+            ep_info.update(self.current_reset_info)
+            if self.results_writer:
+                self.results_writer.write_row(ep_info)
+            info["episode"] = ep_info
+        self.total_steps += 1
+        return observation, reward, terminated, truncated, info
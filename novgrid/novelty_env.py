@@ -1,184 +1,190 @@
-from typing import Any, List, Optional, SupportsFloat, Tuple, Dict, Union
+from typing import Any, List, Optional, Tuple, Dict, Union
 
 import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import gymnasium as gym
-from gymnasium.envs.registration import EnvSpec
 import json
 import numpy as np
 import inspect
 
-from stable_baselines3.common.monitor import Monitor
-from stable_baselines3.common.vec_env import SubprocVecEnv
-from stable_baselines3.common.vec_env.base_vec_env import VecEnvStepReturn
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvObs, VecEnvStepReturn
 
 from novgrid.env_configs import get_env_configs
-import novgrid.envs.novgrid_objects as novgrid_objects
+from novgrid.recording import TrajectoryWriter
+from novgrid.action_log import ActionLogWriter
+from novgrid.host import ENV_METHOD, INIT, ROLLOUT, STEP, stack_obs
+from novgrid.infos import info_array, set_info, to_array_infos
+from novgrid.list_env import (
+    config_key,
+    make_list_env_fn,
+    make_task_env,
+    reconfigure_task_env,
+)
 
+# ListEnv moved to novgrid.list_env, it is re-exported here for code importing it from novgrid.novelty_env
+from novgrid.list_env import ListEnv  # noqa: F401
+from novgrid.monitor import FusedTaskMonitor
+from novgrid.rollout import RolloutBuffer
+from novgrid.schedules import ConvergenceTrigger, NoveltySchedule
+from novgrid.spaces import union_space
+from novgrid.workers import (
+    BatchedVecEnv,
+    WorkerPool,
+    default_start_method,
+    start_workers,
+    worker_context,
+)
+import novgrid.envs.novgrid_objects as novgrid_objects
 
-class ListEnv(gym.Env):
-    """
-    A vectorized environment that chains multiple environments together.
 
-    Attributes:
-        env_lst (List[gymnasium.Env]): List of environments to chain.
-        env_idx (int): Index of the current environment.
+def read_env_configs(
+    env_configs: Union[str, List[Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
     """
+    Reads the env configs from a json file path, a global env config name, or a list of configs.
 
-    def __init__(self, env_lst: List[gym.Env]) -> None:
-        """
-        Initializes the ListEnv with a list of environments.
-
-        Args:
-            env_lst (List[gymnasium.Env]): List of environments to chain.
-        """
-        self.env_lst = env_lst
-        self.env_idx = 0
+    Args:
+        env_configs (Union[str, List[Dict[str, Any]]]): Configuration for environments.
 
-    def incr_env_idx(self) -> bool:
-        """
-        Increments the environment index, closing the current environment and resetting to the next one.
-
-        Returns:
-            bool: True if the environment index was successfully incremented, False otherwise.
-        """
-        if self.env_idx >= len(self.env_lst) - 1:
-            return False
-        self.cur_env.close()
-        self.env_idx += 1
-        self.cur_env.reset()
-        return True
-
-    def step(
-        self, action: Any
-    ) -> Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]:
-        """
-        Takes a step in the current environment.
-
-        Args:
-            action (Any): Action to take.
-
-        Returns:
-            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information.
-        """
-        return self.cur_env.step(action=action)
-
-    def reset(
-        self, *, seed: Optional[int] = None, options: Optional[Dict[str, Any]] = None
-    ) -> Tuple[Any, Dict[str, Any]]:
-        """
-        Resets the current environment.
-
-        Args:
-            seed (Optional[int]): Seed for environment reset.
-            options (Optional[Dict[str, Any]]): Additional options for reset.
-
-        Returns:
-            Tuple[Any, Dict[str, Any]]: Reset information.
-        """
-        return self.cur_env.reset(seed=seed, options=options)
-
-    def render(self) -> Union[gym.core.RenderFrame, List[gym.core.RenderFrame], None]:
-        """
-        Renders the current environment.
-
-        Returns:
-            Union[gymnasium.core.RenderFrame, List[gymnasium.core.RenderFrame], None]: Rendered frame(s).
-        """
-        return self.cur_env.render()
-
-    def close(self) -> None:
-        """Closes all environments in the list."""
-        for env in self.env_lst:
-            env.close()
-
-    @property
-    def cur_env(self) -> gym.Env:
-        """
-        Gets the current environment.
+    Returns:
+        List[Dict[str, Any]]: A copy of each env config.
+    """
+    if type(env_configs) == str:
+        if os.path.exists(env_configs):
+            with open(env_configs, "r") as f:
+                env_configs = json.load(f)
+        else:
+            env_configs = get_env_configs(env_configs)
+    return [dict(cfg) for cfg in env_configs]
 
-        Returns:
-            gymnasium.Env: Current environment.
-        """
-        return self.env_lst[self.env_idx]
 
-    @property
-    def unwrapped(self) -> gym.Env:
-        """
-        Gets the unwrapped version of the current environment.
+def resolve_world_objects(env_configs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Replaces the "gridobj:<name>" values of the env configs with the matching world object class.
 
-        Returns:
-            gymnasium.Env: Unwrapped current environment.
-        """
-        return self.cur_env
+    Args:
+        env_configs (List[Dict[str, Any]]): Configuration for environments.
 
-    @property
-    def action_space(self) -> gym.Space:
-        """
-        Gets the action space of the current environment.
+    Returns:
+        List[Dict[str, Any]]: The env configs, with their world objects resolved in place.
+    """
+    world_objects = {
+        k.lower(): v
+        for k, v in inspect.getmembers(
+            novgrid_objects,
+            lambda obj: inspect.isclass(obj)
+            and issubclass(obj, novgrid_objects.WorldObj),
+        )
+    }
 
-        Returns:
-            gymnasium.Space: Action space.
-        """
-        return self.cur_env.action_space
+    for cfg in env_configs:
+        for k, v in cfg.items():
+            if (
+                type(v) == str
+                and v.startswith("gridobj:")
+                and v.split(":")[-1].lower() in world_objects
+            ):
+                cfg[k] = world_objects[v.split(":")[-1].lower()]
+    return env_configs
 
-    @property
-    def observation_space(self) -> gym.Space:
-        """
-        Gets the observation space of the current environment.
 
-        Returns:
-            gymnasium.Space: Observation space.
-        """
-        return self.cur_env.observation_space
+def _check_task(
+    task_idx: int, config: Dict[str, Any], render_mode: Optional[str] = None
+) -> Tuple[List[str], Optional[gym.Space], Optional[gym.Space]]:
+    """
+    Builds the env of a task, resets it once and checks its first observation.
 
-    @property
-    def reward_range(self) -> Tuple[SupportsFloat, SupportsFloat]:
-        """
-        Gets the reward range of the current environment.
+    Args:
+        task_idx (int): Index of the task, used in the error messages.
+        config (Dict[str, Any]): Configuration of the task, with world objects resolved.
+        render_mode (Optional[str]): Render mode for the environment.
 
-        Returns:
-            Tuple[SupportsFloat, SupportsFloat]: Reward range.
-        """
-        return self.cur_env.reward_range
+    Returns:
+        Tuple[List[str], Optional[gymnasium.Space], Optional[gymnasium.Space]]: The errors found, the observation space and the action space.
+    """
+    name = f"env config {task_idx} ({config.get('env_id')})"
+    try:
+        env = make_task_env(config, render_mode=render_mode)
+    except Exception as e:
+        return [f"{name}: failed to build: {type(e).__name__}: {e}"], None, None
+    errors = []
+    try:
+        obs, _ = env.reset(seed=0)
+        if not env.observation_space.contains(obs):
+            errors.append(f"{name}: reset observation is outside the observation space")
+    except Exception as e:
+        errors.append(f"{name}: failed to reset: {type(e).__name__}: {e}")
+    finally:
+        env.close()
+    return errors, env.observation_space, env.action_space
 
-    @property
-    def spec(self) -> EnvSpec:
-        """
-        Gets the spec of the current environment.
 
-        Returns:
-            gymnasium.EnvSpec: Environment specification.
-        """
-        return self.cur_env.spec
+def validate_env_configs(
+    env_configs: Union[str, List[Dict[str, Any]]],
+    render_mode: Optional[str] = None,
+    executor: str = "thread",
+    max_workers: Optional[int] = None,
+) -> None:
+    """
+    Builds, resets and checks the env of every task concurrently, and reports all the errors found together.
 
-    @property
-    def np_random(self) -> np.random.RandomState:
-        """
-        Gets the random number generator of the current environment.
+    The tasks are checked independently, then their spaces are compared: the tasks of a NoveltyEnv share the
+    action space of the first task, and their observations are padded into the union of their observation
+    spaces, see novgrid.spaces.union_space.
 
-        Returns:
-            np.random.RandomState: Random number generator.
-        """
-        return self.cur_env.np_random
+    Args:
+        env_configs (Union[str, List[Dict[str, Any]]]): Configuration for environments.
+        render_mode (Optional[str]): Render mode for environments.
+        executor (str): Either "thread" or "process", the kind of pool checking the tasks.
+        max_workers (Optional[int]): Size of the pool, defaults to the executor default.
 
-    @property
-    def render_mode(self) -> Optional[str]:
-        """
-        Gets the render mode of the current environment.
+    Raises:
+        ValueError: If any of the env configs is invalid.
+    """
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Unknown executor {executor}, expected thread or process.")
+    env_configs = resolve_world_objects(read_env_configs(env_configs))
+    pool_cls = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+    with pool_cls(max_workers=max_workers) as pool:
+        results = list(
+            pool.map(
+                _check_task,
+                range(len(env_configs)),
+                env_configs,
+                [render_mode] * len(env_configs),
+            )
+        )
 
-        Returns:
-            Optional[str]: Render mode.
-        """
-        return self.cur_env.render_mode
+    errors = [e for task_errors, _, _ in results for e in task_errors]
+    built = [(i, r) for i, r in enumerate(results) if r[2] is not None]
+    if built:
+        first_idx, (_, _, first_act) = built[0]
+        for i, (_, _, action_space) in built[1:]:
+            if action_space != first_act:
+                errors.append(
+                    f"env config {i}: action space {action_space} differs from env config {first_idx} {first_act}"
+                )
+        try:
+            union_space([obs_space for _, (_, obs_space, _) in built])
+        except ValueError as e:
+            errors.append(
+                f"env configs {[i for i, _ in built]}: observation spaces can't be padded together: {e}"
+            )
+    if errors:
+        raise ValueError(
+            f"{len(errors)} invalid env config(s):\n" + "\n".join(errors)
+        )
 
 
-class NoveltyEnv(SubprocVecEnv):
+class NoveltyEnv(BatchedVecEnv):
     """
     A vectorized environment with novelty injection based on specified intervals.
 
     Attributes:
-        novelty_step (int): Number of time steps between novelty injections.
+        novelty_step (Optional[int]): Number of time steps between novelty injections.
         n_envs (int): Number of environments to run in parallel.
         print_novelty_box (bool): Whether to print a novelty injection box.
         num_transfers (int): Number of transfers between environments.
@@ -186,12 +192,23 @@ class NoveltyEnv(SubprocVecEnv):
         last_incr (int): Time step of the last environment index increment.
         start_index (int): Starting index for environment creation.
         monitor_dir (Optional[str]): Directory for monitoring results.
+        task_idx (np.ndarray): Index of the current task of each environment.
+        recorder (Optional[TrajectoryWriter]): Writer that the transitions are recorded to.
+        action_log (Optional[ActionLogWriter]): Writer that the actions are logged to for replay.
+        rollout_buffer (Optional[RolloutBuffer]): Preallocated rollout storage that the transitions are written into.
+        schedule (Optional[Union[NoveltySchedule, str, Dict[str, Any]]]): Novelty schedule run inside each worker.
+        convergence (Optional[ConvergenceTrigger]): Trigger injecting the next novelty once the agent converged on the current task.
+        novelty_workers (np.ndarray): Indices of the workers that the triggered injections apply to.
+        novelty_offsets (np.ndarray): Per novelty worker, the number of vectorized steps its injection is delayed by.
+        injection_due (np.ndarray): Per worker, the vectorized step at which its pending injection happens, -1 if none is pending.
+        respawn_workers (bool): Whether crashed workers are respawned on the tasks of their envs.
+        n_respawns (int): Number of workers respawned so far.
     """
 
     def __init__(
         self,
         env_configs: Union[str, List[Dict[str, Any]]],
-        novelty_step: int,
+        novelty_step: Optional[int],
         wrappers: List[gym.Wrapper] = [],
         wrapper_kwargs_lst: List[Dict[str, Any]] = [],
         n_envs: int = 1,
@@ -202,13 +219,34 @@ class NoveltyEnv(SubprocVecEnv):
         start_method: Optional[str] = None,
         print_novelty_box: bool = False,
         render_mode: Optional[str] = None,
+        record_dir: Optional[str] = None,
+        record_chunk_size: int = 2**16,
+        action_log_dir: Optional[str] = None,
+        validate: Optional[str] = None,
+        build_workers: Optional[int] = None,
+        rollout_steps: Optional[int] = None,
+        schedule: Optional[Union[NoveltySchedule, str, Dict[str, Any]]] = None,
+        convergence: Optional[Union[ConvergenceTrigger, Dict[str, Any]]] = None,
+        novelty_stagger: int = 0,
+        novelty_fraction: float = 1.0,
+        respawn_workers: bool = False,
+        health_check_interval: float = 1.0,
+        worker_timeout: Optional[float] = None,
+        max_respawns: Optional[int] = None,
+        envs_per_worker: int = 1,
+        worker_pool: Optional[WorkerPool] = None,
+        reconfigure_tasks: bool = False,
+        dedupe_tasks: bool = False,
+        fused_wrappers: bool = False,
+        array_infos: bool = False,
+        lazy_tasks: bool = False,
     ):
         """
         Initializes the NoveltyEnv with the provided configurations.
 
         Args:
             env_configs (Union[str, List[Dict[str, Any]]]): Configuration for environments.
-            novelty_step (int): Number of time steps between novelty injections.
+            novelty_step (Optional[int]): Number of time steps between novelty injections, summed over the environments. None disables these injections.
             wrappers (List[gymnasium.Wrapper]): List of wrappers to apply to each environment.
             wrapper_kwargs_lst (List[Dict[str, Any]]): List of wrapper kwargs for each wrapper.
             n_envs (int): Number of environments to run in parallel.
@@ -219,33 +257,41 @@ class NoveltyEnv(SubprocVecEnv):
             start_method (Optional[str]): Start method for parallel environments.
             print_novelty_box (bool): Whether to print a novelty injection box.
             render_mode (Optional[str]): Render mode for environments.
+            record_dir (Optional[str]): Directory to stream the (obs, action, reward, done, task_idx) transitions to.
+            record_chunk_size (int): Number of transitions per memory-mapped chunk when recording.
+            action_log_dir (Optional[str]): Directory to write a replayable action log to. A random seed is drawn if none is provided.
+            validate (Optional[str]): If "thread" or "process", every env config is built and checked concurrently with that kind of pool before starting the workers.
+            build_workers (Optional[int]): Number of threads each worker builds its task envs with, the envs are built serially if None.
+            rollout_steps (Optional[int]): If set, the transitions are written into a RolloutBuffer holding this many vectorized steps.
+            schedule (Optional[Union[NoveltySchedule, str, Dict[str, Any]]]): Novelty schedule run inside each worker, a schedule, a schedule class name, or a dict with the class "name" and its kwargs.
+            convergence (Optional[Union[ConvergenceTrigger, Dict[str, Any]]]): Trigger injecting the next novelty from the episode statistics of the workers, or the kwargs of one.
+            novelty_stagger (int): Number of vectorized steps that the injections triggered by novelty_step or convergence are spread over, the workers being injected one after the other.
+            novelty_fraction (float): Fraction of the workers that these injections apply to, the other workers stay on their task.
+            respawn_workers (bool): Whether to respawn the workers that crash during a step on their task, instead of failing.
+            health_check_interval (float): Seconds between the checks that a worker still runs while waiting for its step.
+            worker_timeout (Optional[float]): Seconds after which a worker that hasn't answered a step is considered hung and respawned, never if None.
+            max_respawns (Optional[int]): Maximum number of respawns over the run, unlimited if None.
+            envs_per_worker (int): Maximum number of ListEnvs stepped serially by each worker process, each ListEnv keeping the seed and monitor path of its rank.
+            worker_pool (Optional[WorkerPool]): Pool of running workers to initialize with the envs instead of starting new processes, the workers go back to the pool when the env is closed.
+            reconfigure_tasks (bool): Whether consecutive tasks with the same env_id, layout and dynamics share one env per worker, whose constructor kwargs are changed in place when the next task starts. Tasks that change the observation or action space or the grid size still get their own env.
+            dedupe_tasks (bool): Whether tasks with identical configs, such as the repeated tasks of cyclic curricula, share one env per worker. The Monitor of a shared env tags each episode with its task_idx.
+            fused_wrappers (bool): Whether registered envs are built from their entry point, skipping the env checker, order enforcing and time limit wrappers of gym.make, with one FusedTaskMonitor layer applying the time limit and recording the episode statistics and task index.
+            array_infos (bool): Whether step returns the infos as one dict of arrays over the envs (task_idx, episode_return, episode_len, novelty_injected, TimeLimit.truncated) built once per worker batch, with rare keys such as terminal_observation as sparse dicts from env index to value. See novgrid.infos, SB3 algorithms expect the default list of dicts.
+            lazy_tasks (bool): Whether each worker only holds the env of its current task, building the env of the next task when it starts, instead of building every task up front. The observation spaces of the tasks are computed once in the parent, by building each distinct task before the workers are started.
         """
-        if type(env_configs) == str:
-            if os.path.exists(env_configs):
-                with open(env_configs, "r") as f:
-                    env_configs = json.load(f)
-            else:
-                env_configs = get_env_configs(env_configs)
-
-        world_objects = {
-            k.lower(): v
-            for k, v in inspect.getmembers(
-                novgrid_objects,
-                lambda obj: inspect.isclass(obj)
-                and issubclass(obj, novgrid_objects.WorldObj),
-            )
-        }
-
-        for cfg in env_configs:
-            for k, v in cfg.items():
-                if (
-                    type(v) == str
-                    and v.startswith("gridobj:")
-                    and v.split(":")[-1].lower() in world_objects
-                ):
-                    cfg[k] = world_objects[v.split(":")[-1].lower()]
+        env_configs = read_env_configs(env_configs)
+        if validate is not None:
+            validate_env_configs(env_configs, render_mode=render_mode, executor=validate)
+        raw_env_configs = [dict(cfg) for cfg in env_configs]
+        env_configs = resolve_world_objects(env_configs)
 
         self.novelty_step = novelty_step
+        self.schedule = schedule
+        self.convergence = (
+            ConvergenceTrigger(**convergence)
+            if isinstance(convergence, dict)
+            else convergence
+        )
         self.n_envs = n_envs
         self.n_tasks = len(env_configs)
         self.print_novelty_box = print_novelty_box
@@ -253,86 +299,878 @@ class NoveltyEnv(SubprocVecEnv):
 
         self.total_time_steps = 0
         self.last_incr = 0
+        self.task_idx = np.zeros(n_envs, dtype=np.int64)
+
+        if not 0.0 < novelty_fraction <= 1.0:
+            raise ValueError(
+                f"The novelty_fraction must be in (0, 1], got {novelty_fraction}."
+            )
+        if novelty_step is not None and novelty_stagger > novelty_step // n_envs:
+            raise ValueError(
+                f"The novelty_stagger ({novelty_stagger}) must not exceed the {novelty_step // n_envs} vectorized steps between novelty injections."
+            )
+        n_novelty_workers = max(1, int(np.ceil(novelty_fraction * n_envs)))
+        self.novelty_workers = np.arange(n_novelty_workers)
+        self.novelty_offsets = (
+            self.novelty_workers * novelty_stagger
+        ) // n_novelty_workers
+        self.injection_due = np.full(n_envs, -1, dtype=np.int64)
+
+        self.rollout_buffer = None
+        self.recorder = (
+            TrajectoryWriter(record_dir, n_envs=n_envs, chunk_size=record_chunk_size)
+            if record_dir is not None
+            else None
+        )
+        self._last_obs = None
+        self._actions = None
+
+        self.action_log = None
+        if action_log_dir is not None:
+            if seed is None:
+                seed = int(np.random.SeedSequence().generate_state(1)[0])
+            try:
+                logged_configs = json.loads(json.dumps(raw_env_configs))
+            except TypeError:
+                logged_configs = None
+            self.action_log = ActionLogWriter(
+                action_log_dir,
+                n_envs=n_envs,
+                seeds=[seed + start_index + i for i in range(n_envs)],
+                env_configs=logged_configs,
+                start_index=start_index,
+            )
 
         self.start_index = start_index
         self.monitor_dir = monitor_dir
-        monitor_kwargs = {} if monitor_kwargs is None else monitor_kwargs
-
-        def make_env_fn(rank):
-            def _make_env(config):
-                env_id = config["env_id"]
-                env_kwargs = {k: v for k, v in config.items() if k != "env_id"}
-
-                # Initialize the environment
-                if isinstance(env_id, str):
-                    env = gym.make(env_id, render_mode=render_mode, **env_kwargs)
-                else:
-                    env = env_id(**env_kwargs, render_mode=render_mode)
-
-                # Optionally use the random seed provided
-                if seed is not None:
-                    env.seed(seed + rank)
-                    env.action_space.seed(seed + rank)
-
-                # Wrap the env in a Monitor wrapper
-                # to have additional training information
-                monitor_path = (
-                    os.path.join(monitor_dir, str(rank))
-                    if monitor_dir is not None
-                    else None
-                )
-                # Create the monitor folder if needed
-                if monitor_path is not None:
-                    os.makedirs(monitor_path, exist_ok=True)
-                env = Monitor(env, filename=monitor_path, **monitor_kwargs)
-
-                # Wrap the environment with the provided wrappers
-                for wrapper_cls, wrapper_kwargs in zip(
-                    wrappers,
-                    wrapper_kwargs_lst
-                    + [{}] * max(0, len(wrappers) - len(wrapper_kwargs_lst)),
-                ):
-                    env = wrapper_cls(env, **wrapper_kwargs)
 
-                return env
+        observation_spaces = None
+        if lazy_tasks:
+            probe = make_list_env_fn(
+                env_configs=env_configs,
+                rank=start_index,
+                wrappers=wrappers,
+                wrapper_kwargs_lst=wrapper_kwargs_lst,
+                render_mode=render_mode,
+                dedupe_tasks=True,
+                fused_wrappers=fused_wrappers,
+            )()
+            observation_spaces = [env.observation_space for env in probe.env_lst]
+            probe.close()
 
-            def _init():
-                # Returns a list env with each env constructed from the config in env_configs
-                return ListEnv([_make_env(config) for config in env_configs])
+        env_fns = [
+            make_list_env_fn(
+                env_configs=env_configs,
+                rank=i + start_index,
+                wrappers=wrappers,
+                wrapper_kwargs_lst=wrapper_kwargs_lst,
+                seed=seed,
+                monitor_dir=monitor_dir,
+                monitor_kwargs=monitor_kwargs,
+                render_mode=render_mode,
+                build_workers=build_workers,
+                schedule=schedule,
+                reconfigure_tasks=reconfigure_tasks,
+                dedupe_tasks=dedupe_tasks,
+                fused_wrappers=fused_wrappers,
+                lazy_tasks=lazy_tasks,
+                observation_spaces=observation_spaces,
+                # The workers stack the observations into their replies
+                copy_obs=False,
+            )
+            for i in range(n_envs)
+        ]
 
-            return _init
+        if start_method is None:
+            start_method = default_start_method()
 
-        env_fns = [make_env_fn(rank=i + start_index) for i in range(n_envs)]
+        self.respawn_workers = respawn_workers
+        self.health_check_interval = health_check_interval
+        self.worker_timeout = worker_timeout
+        self.max_respawns = max_respawns
+        self.n_respawns = 0
+        self._env_fns = env_fns
+        self._start_method = start_method
+        self._worker_seeds = [
+            None if seed is None else seed + start_index + i for i in range(n_envs)
+        ]
+        self._failed_workers = set()
 
-        if start_method is None:
-            import multiprocessing as mp
-            start_method = "fork" if "fork" in mp.get_all_start_methods() else None
+        super().__init__(
+            env_fns=env_fns,
+            start_method=start_method,
+            envs_per_worker=envs_per_worker,
+            worker_pool=worker_pool,
+            array_infos=array_infos,
+        )
 
-        super().__init__(env_fns=env_fns, start_method=start_method)
+        try:
+            if seed is not None:
+                self.seed(seed + start_index)
 
-    def step(self, actions: np.ndarray) -> VecEnvStepReturn:
+            if rollout_steps is not None:
+                self.rollout_buffer = RolloutBuffer(
+                    rollout_steps, n_envs, self.observation_space, self.action_space
+                )
+        except BaseException:
+            # Leased workers go back to their pool
+            self.close()
+            raise
+
+    def reset(self) -> VecEnvObs:
         """
-        Takes a step in the parallel environments.
+        Resets all the parallel environments.
+
+        Returns:
+            VecEnvObs: The initial observations of each environment
+        """
+        observations = super().reset()
+        self._last_obs = observations
+        return observations
+
+    def step_async(self, actions: np.ndarray) -> None:
+        """
+        Sends the actions to the parallel environments, keeping them for the recording and logging of the step.
 
         Args:
             actions (np.ndarray): Actions for each environment.
+        """
+        self._actions = actions
+        if not self.respawn_workers:
+            super().step_async(actions)
+            return
+        self._failed_workers = set()
+        actions = np.asarray(actions)
+        for w, (transport, host_slice) in enumerate(zip(self.transports, self.host_slices)):
+            try:
+                transport.send(STEP, actions[host_slice])
+            except (BrokenPipeError, ConnectionResetError, EOFError):
+                self._failed_workers.add(w)
+        self.waiting = True
+
+    def step_wait(self) -> VecEnvStepReturn:
+        """
+        Waits for the step of the parallel environments and injects novelties. This runs for step calls on
+        the NoveltyEnv itself and through VecEnv wrappers.
 
         Returns:
             VecEnvStepReturn: The observations, rewards, dones, and infos from each environment
         """
-        observations, rewards, dones, infos = super().step(actions)
+        if self.respawn_workers:
+            observations, rewards, dones, infos = self._step_wait_respawning()
+        else:
+            observations, rewards, dones, infos = super().step_wait()
+        actions = self._actions
         # Increment total time steps
         self.total_time_steps += self.n_envs
-        if self.total_time_steps - self.last_incr > self.novelty_step:
-            self.last_incr = self.total_time_steps
-            # Trigger the novelty if enough steps have passed
-            novelty_injected = self.env_method("incr_env_idx")
-            dones[:] = True
+        novelty_injected = None
+        due = self._due_injections(infos)
+        if due.any():
+            novelty_injected = self._inject_novelty(
+                observations, dones, infos, np.flatnonzero(due)
+            )
+        if self.schedule is not None:
+            # The schedules of the workers report their injections in the infos
+            scheduled = info_array(infos, "novelty_injected")
+            novelty_injected = (
+                scheduled if novelty_injected is None else novelty_injected | scheduled
+            )
+
+        if self.recorder is not None:
+            self.recorder.add(self._last_obs, actions, rewards, dones, self.task_idx)
+        if self.action_log is not None:
+            self.action_log.add(actions)
+        if self.rollout_buffer is not None:
+            self.rollout_buffer.add_step(
+                self._last_obs, actions, rewards, dones, infos, self.task_idx, novelty_injected
+            )
+        self._last_obs = observations
+
+        if novelty_injected is not None:
+            self.task_idx[novelty_injected] += 1
+            if np.any(novelty_injected) and self.recorder is not None:
+                self.recorder.mark_novelty()
+            if self.action_log is not None:
+                self.action_log.mark_novelty(novelty_injected)
 
             if np.any(novelty_injected) and self.print_novelty_box:
-                s = f"| Novelty Injected (on env {self.get_attr('env_idx')}) |"
+                s = f"| Novelty Injected (on env {self.task_idx.tolist()}) |"
                 print("-" * len(s))
                 print(s)
                 print("-" * len(s))
 
         return observations, rewards, dones, infos
+
+    def _due_injections(
+        self, infos: Union[List[Dict[str, Any]], Dict[str, Any]]
+    ) -> np.ndarray:
+        """
+        Updates the novelty triggers after total_time_steps was incremented, and pops the injections that are due.
+
+        Args:
+            infos (Union[List[Dict[str, Any]], Dict[str, Any]]): The per-env or array infos since the last update.
+
+        Returns:
+            np.ndarray: Whether a triggered injection is due in each env.
+        """
+        converged = self.convergence is not None and self.convergence.update(infos)
+        if converged or (
+            self.novelty_step is not None
+            and self.total_time_steps - self.last_incr > self.novelty_step
+        ):
+            self.last_incr = self.total_time_steps
+            # Trigger the novelty if enough steps have passed or the agent converged
+            # Workers whose previous staggered injection is still pending skip this one
+            idle = self.injection_due[self.novelty_workers] < 0
+            self.injection_due[self.novelty_workers[idle]] = (
+                self.total_time_steps // self.n_envs + self.novelty_offsets[idle]
+            )
+            if self.convergence is not None:
+                self.convergence.reset()
+        due = (self.injection_due >= 0) & (
+            self.injection_due <= self.total_time_steps // self.n_envs
+        )
+        self.injection_due[due] = -1
+        return due
+
+    def rollout_random(
+        self,
+        n_steps: int,
+        chunk_steps: Optional[int] = None,
+        record: bool = False,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Steps every env with uniformly random actions generated inside the workers, which reply once per chunk of
+        steps instead of once per step. This gives an upper bound on the throughput of the envs and collects
+        exploration data without an agent.
+
+        The in-worker schedules run on every step, while the novelty_step and convergence triggers are checked
+        between the chunks, so chunk_steps defaults to the number of vectorized steps between novelty_step
+        injections. The recorder, action log and rollout buffer don't see these steps, and crashed workers are
+        not respawned.
+
+        Args:
+            n_steps (int): Number of steps of each env.
+            chunk_steps (Optional[int]): Number of steps of each env between two replies of the workers.
+            record (bool): Whether to return the trajectories of the chunks in addition to the statistics.
+            seed (Optional[int]): Seed of the actions, the actions of each env being seeded from it, its rank and the chunk. Random if None.
+
+        Returns:
+            Dict[str, Any]: The number of steps and seconds taken, the return, length and task index of each episode that ended, and with record a list of chunks holding the observations, actions, rewards, dones and task indices with shape (n_envs, chunk_steps, ...).
+        """
+        if n_steps < 1:
+            raise ValueError(f"The n_steps must be positive, got {n_steps}.")
+        if chunk_steps is None:
+            chunk_steps = (
+                max(1, self.novelty_step // self.n_envs)
+                if self.novelty_step is not None
+                else n_steps
+            )
+        if self._last_obs is None:
+            self.reset()
+        seed_seq = np.random.SeedSequence(seed)
+        episode_returns, episode_lengths, episode_tasks, chunks = [], [], [], []
+        start_time = time.perf_counter()
+        done_steps = 0
+        while done_steps < n_steps:
+            steps = min(chunk_steps, n_steps - done_steps)
+            seeds = seed_seq.spawn(1)[0].generate_state(self.n_envs).tolist()
+            for transport, host_slice in zip(self.transports, self.host_slices):
+                observations = None
+                if record:
+                    observations = (
+                        {k: v[host_slice] for k, v in self._last_obs.items()}
+                        if isinstance(self._last_obs, dict)
+                        else self._last_obs[host_slice]
+                    )
+                transport.send(ROLLOUT, (steps, seeds[host_slice], observations))
+            results = [self._recv(transport, ROLLOUT) for transport in self.transports]
+            done_steps += steps
+
+            self._last_obs = self._concat_obs([r["last_observations"] for r in results])
+            returns = np.concatenate([r["episode_returns"] for r in results])
+            episode_returns.append(returns)
+            episode_lengths.extend(r["episode_lengths"] for r in results)
+            episode_tasks.extend(r["episode_task_idx"] for r in results)
+            self.task_idx += np.concatenate([r["novelties"] for r in results])
+            if record:
+                chunks.append(
+                    {
+                        "observations": self._concat_obs([r["observations"] for r in results]),
+                        **{
+                            k: np.concatenate([r[k] for r in results])
+                            for k in ("actions", "rewards", "dones", "task_idx")
+                        },
+                    }
+                )
+
+            self.total_time_steps += steps * self.n_envs
+            due = self._due_injections({"episode_return": returns})
+            if due.any():
+                indices = np.flatnonzero(due)
+                results = self.env_method("inject_novelty", indices=indices.tolist())
+                for i, (injected, reset_obs) in zip(indices, results):
+                    if not injected:
+                        continue
+                    self.task_idx[i] += 1
+                    if record:
+                        chunks[-1]["dones"][i, -1] = True
+                    if isinstance(self._last_obs, dict):
+                        for k, v in self._last_obs.items():
+                            v[i] = reset_obs[k]
+                    else:
+                        self._last_obs[i] = reset_obs
+
+        rollout = {
+            "steps": n_steps * self.n_envs,
+            "seconds": time.perf_counter() - start_time,
+            "episode_returns": np.concatenate(episode_returns),
+            "episode_lengths": np.concatenate(episode_lengths),
+            "episode_task_idx": np.concatenate(episode_tasks),
+        }
+        if record:
+            rollout["chunks"] = chunks
+        return rollout
+
+    def _step_wait_respawning(self) -> VecEnvStepReturn:
+        """
+        Waits for the step of the parallel environments, respawning the workers that crashed or hung.
+
+        Returns:
+            VecEnvStepReturn: The observations, rewards, dones, and infos from each environment
+        """
+        results = []
+        for w in range(len(self.transports)):
+            result = None if w in self._failed_workers else self._poll_worker(w)
+            results.append(result if result is not None else self._respawn_worker(w))
+        self.waiting = False
+        return self._merge_steps(results)
+
+    def _poll_worker(self, w: int) -> Optional[Tuple[Any, ...]]:
+        """
+        Waits for the step result of a worker, checking every health_check_interval seconds that it still runs.
+
+        Args:
+            w (int): Index of the worker.
+
+        Returns:
+            Optional[Tuple[Any, ...]]: The step result, or None if the worker died, timed out or failed to step.
+        """
+        transport, process = self.transports[w], self.processes[w]
+        waited = 0.0
+        try:
+            while not transport.poll(self.health_check_interval):
+                waited += self.health_check_interval
+                if not process.is_alive() or (
+                    self.worker_timeout is not None and waited >= self.worker_timeout
+                ):
+                    return None
+            cmd, result = transport.recv()
+        except (EOFError, ConnectionResetError, BrokenPipeError):
+            return None
+        return result if cmd == STEP else None
+
+    def _respawn_worker(self, w: int) -> Tuple[Any, ...]:
+        """
+        Replaces a failed worker with a new one, its envs staying on the same tasks.
+
+        The episodes that the worker was running are lost, so they are reported as truncated with the last known
+        observations as their terminal observations, and the first observations of new episodes are returned.
+
+        Args:
+            w (int): Index of the worker.
+
+        Returns:
+            Tuple[Any, ...]: A step result of the worker ending the interrupted episodes.
+        """
+        if self.max_respawns is not None and self.n_respawns >= self.max_respawns:
+            raise RuntimeError(
+                f"Worker {w} failed and the {self.max_respawns} allowed respawns are used up."
+            )
+        self.n_respawns += 1
+        host_slice = self.host_slices[w]
+        task_idxs = self.task_idx[host_slice].tolist()
+        warnings.warn(f"Worker {w} failed, respawning it on tasks {task_idxs}.")
+
+        if self.processes[w].is_alive():
+            self.processes[w].terminate()
+        self.processes[w].join(timeout=self.health_check_interval)
+        self.transports[w].close()
+
+        ctx = (
+            worker_context(self._start_method)
+            if self.worker_pool is None
+            else self.worker_pool.ctx
+        )
+        # Respawns fork like the first workers, with the garbage collector frozen
+        [(transport, process)] = start_workers(ctx, 1)
+        self.transports[w], self.processes[w] = transport, process
+        transport.send(INIT, self._init_data(self._env_fns[host_slice]))
+        self._recv(transport, INIT)
+
+        observations, infos = [], []
+        for local, i in enumerate(range(host_slice.start, host_slice.stop)):
+            transport.send(
+                ENV_METHOD,
+                ([local], ("restore_task", (task_idxs[local], self._worker_seeds[i]), {})),
+            )
+            observations.append(self._recv(transport, ENV_METHOD)[0])
+            info = {
+                "TimeLimit.truncated": True,
+                "worker_respawned": True,
+                "task_idx": task_idxs[local],
+            }
+            if self._last_obs is not None:
+                info["terminal_observation"] = (
+                    {k: v[i].copy() for k, v in self._last_obs.items()}
+                    if isinstance(self._last_obs, dict)
+                    else self._last_obs[i].copy()
+                )
+            infos.append(info)
+        n = len(observations)
+        return (
+            stack_obs(observations, self.observation_space),
+            np.zeros(n),
+            np.ones(n, dtype=bool),
+            to_array_infos(infos) if self.array_infos else infos,
+            [{} for _ in range(n)],
+        )
+
+    def _inject_novelty(
+        self,
+        observations: VecEnvObs,
+        dones: np.ndarray,
+        infos: Union[List[Dict[str, Any]], Dict[str, Any]],
+        indices: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Moves envs to their next task, ending their current episode as a truncation.
+
+        The interrupted episode gets its last observation as terminal_observation and is marked as
+        TimeLimit.truncated so that its return is bootstrapped, and the observation of the env is replaced in
+        place by the first observation of the next task. Envs already on their last task are left untouched.
+
+        Args:
+            observations (VecEnvObs): The observations of the step, updated in place.
+            dones (np.ndarray): The dones of the step, updated in place.
+            infos (Union[List[Dict[str, Any]], Dict[str, Any]]): The per-env or array infos of the step, updated in place.
+            indices (Optional[np.ndarray]): Indices of the envs to move, defaults to all of them.
+
+        Returns:
+            np.ndarray: Whether a novelty was injected in each env.
+        """
+        indices = np.arange(self.n_envs) if indices is None else indices
+        results = self.env_method("inject_novelty", indices=indices.tolist())
+        novelty_injected = np.zeros(self.n_envs, dtype=bool)
+        for i, (injected, reset_obs) in zip(indices, results):
+            if not injected:
+                continue
+            novelty_injected[i] = True
+            if isinstance(observations, dict):
+                if not dones[i]:
+                    set_info(
+                        infos,
+                        i,
+                        "terminal_observation",
+                        {k: v[i].copy() for k, v in observations.items()},
+                    )
+                for k, v in observations.items():
+                    v[i] = reset_obs[k]
+            else:
+                if not dones[i]:
+                    set_info(infos, i, "terminal_observation", observations[i].copy())
+                observations[i] = reset_obs
+            if not dones[i]:
+                set_info(infos, i, "TimeLimit.truncated", True)
+                dones[i] = True
+            set_info(infos, i, "novelty_injected", True)
+        return novelty_injected
+
+    def close(self) -> None:
+        """Closes the parallel environments and flushes any recorded transitions or actions."""
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.action_log is not None:
+            self.action_log.close()
+        super().close()
+
+
+def test_validate_env_configs_reports_all_errors():
+    """
+    Test case for validating every env config concurrently and reporting all of their errors together.
+    """
+    validate_env_configs("door_key_change", executor="process")
+
+    try:
+        validate_env_configs(
+            [
+                {"env_id": "NovGrid-ColoredDoorKeyEnv", "unknown_kwarg": 1},
+                {"env_id": "NovGrid-ColoredDoorKeyEnv"},
+                {"env_id": "NovGrid-ColoredDoorKeyEnv", "layout": "unknown_patch"},
+            ]
+        )
+    except ValueError as e:
+        message = str(e)
+    else:
+        raise AssertionError("The invalid env configs were not reported")
+    assert message.startswith("2 invalid env config(s)")
+    assert "env config 0" in message and "env config 2" in message
+    assert "env config 1" not in message
+
+    # Tasks with different grid observations are padded together, unlike different observation types
+    validate_env_configs(
+        [
+            {"env_id": "NovGrid-ColoredDoorKeyEnv"},
+            {"env_id": "NovGrid-ColoredDoorKeyEnv", "agent_view_size": 5},
+        ]
+    )
+    try:
+        validate_env_configs(read_env_configs("door_key_change") + [{"env_id": "CartPole-v1"}])
+    except ValueError as e:
+        assert "can't be padded together" in str(e)
+    else:
+        raise AssertionError("Observation spaces of different types were not reported")
+
+
+def test_reconfigure_tasks_in_place():
+    """
+    Test case for sharing one env between tasks of the same class, like separate envs per task.
+    """
+    configs = resolve_world_objects(
+        read_env_configs("door_key_change")
+        + [{"env_id": "NovGrid-ColoredDoorKeyEnv", "size": 6}]
+    )
+    shared = make_list_env_fn(configs, rank=0, reconfigure_tasks=True)()
+    separate = make_list_env_fn(configs, rank=0)()
+    assert shared.env_lst[0] is shared.env_lst[1] and shared.env_lst[2] is not shared.env_lst[1]
+
+    actions = np.random.default_rng(0).integers(0, 6, size=20)
+    for task_idx in range(3):
+        if task_idx == 0:
+            shared_obs, separate_obs = shared.reset(seed=0)[0], separate.reset(seed=0)[0]
+        else:
+            shared_obs, separate_obs = shared.inject_novelty()[1], separate.inject_novelty()[1]
+        assert np.array_equal(
+            shared.unwrapped.unwrapped.key_door_table,
+            separate.unwrapped.unwrapped.key_door_table,
+        )
+        for action in actions:
+            assert np.array_equal(shared_obs["image"], separate_obs["image"])
+            shared_obs, shared_reward, *_ = shared.step(action)
+            separate_obs, separate_reward, *_ = separate.step(action)
+            assert shared_reward == separate_reward
+    shared.close()
+    separate.close()
+
+    # Fields left out by the next task go back to their defaults, and the wrappers of gym.make start over
+    env = make_task_env({"env_id": "NovGrid-ColoredDoorKeyEnv", "key_colors": ["red", "blue"]})
+    env.reset(seed=0)
+    env.step(0)
+    assert reconfigure_task_env(env, {"env_id": "NovGrid-ColoredDoorKeyEnv", "size": 6})
+    unwrapped = env.unwrapped
+    assert unwrapped.key_colors == ["yellow"] and unwrapped.width == 6
+    assert unwrapped.spec.kwargs["size"] == 6 and "key_colors" not in unwrapped.spec.kwargs
+    assert not env.get_wrapper_attr("_has_reset")
+    env.close()
+
+    # Envs without a reconfigure method get one env per task
+    configs = [
+        {"env_id": "MiniGrid-DoorKey-5x5-v0"},
+        {"env_id": "MiniGrid-DoorKey-5x5-v0", "max_steps": 10},
+    ]
+    shared = make_list_env_fn(configs, rank=0, reconfigure_tasks=True)()
+    assert shared.env_lst[0] is not shared.env_lst[1]
+    shared.close()
+
+
+def test_dedupe_tasks_with_per_visit_monitor():
+    """
+    Test case for sharing one env between identical tasks, each visit keeping its own episode statistics.
+    """
+    import csv
+    import tempfile
+
+    configs = [
+        dict(cfg, max_steps=3)
+        for cfg in read_env_configs("simple_to_lava_to_simple_crossing")
+    ]
+    assert config_key(configs[0]) == config_key(resolve_world_objects([dict(configs[2])])[0])
+
+    with tempfile.TemporaryDirectory() as monitor_dir:
+        list_env = make_list_env_fn(
+            resolve_world_objects(configs), rank=0, monitor_dir=monitor_dir, dedupe_tasks=True
+        )()
+        assert list_env.env_lst[0] is list_env.env_lst[2] is not list_env.env_lst[1]
+        list_env.reset(seed=0)
+        for task_idx in range(3):
+            for _ in range(3):
+                *_, info = list_env.step(0)
+            assert info["episode"]["task_idx"] == task_idx
+            list_env.reset()
+            list_env.incr_env_idx()
+        list_env.close()
+
+        assert sorted(os.listdir(os.path.join(monitor_dir, "0"))) == [
+            "0.monitor.csv",
+            "1.monitor.csv",
+        ]
+        with open(os.path.join(monitor_dir, "0", "0.monitor.csv")) as f:
+            f.readline()
+            assert [row["task_idx"] for row in csv.DictReader(f)] == ["0", "2"]
+
+
+def test_fused_wrappers_match_gym_make():
+    """
+    Test case for stepping task envs built from their entry point with one fused wrapper like gym.make envs.
+    """
+    configs = resolve_world_objects(
+        [dict(cfg, max_steps=7) for cfg in read_env_configs("door_key_change")]
+    )
+    fused = make_list_env_fn(configs, rank=0, fused_wrappers=True)()
+    made = make_list_env_fn(configs, rank=0)()
+    assert isinstance(fused.cur_env, FusedTaskMonitor)
+    assert fused.cur_env.env is fused.cur_env.unwrapped
+    assert fused.spec.id == "NovGrid-ColoredDoorKeyEnv" and fused.spec.kwargs["max_steps"] == 7
+
+    fused_obs, made_obs = fused.reset(seed=0)[0], made.reset(seed=0)[0]
+    for action in np.random.default_rng(0).integers(0, 6, size=30):
+        assert np.array_equal(fused_obs["image"], made_obs["image"])
+        fused_obs, *fused_step, fused_info = fused.step(action)
+        made_obs, *made_step, made_info = made.step(action)
+        assert fused_step == made_step and fused_info.keys() == made_info.keys()
+        if fused_step[1] or fused_step[2]:
+            assert fused_info["episode"]["l"] == made_info["episode"]["l"]
+            fused_obs, made_obs = fused.reset()[0], made.reset()[0]
+
+    limited = FusedTaskMonitor(fused.cur_env.unwrapped, max_episode_steps=2)
+    limited.reset(seed=0)
+    assert not limited.step(0)[3] and limited.step(0)[3]
+
+
+def test_staggered_partial_injection():
+    """
+    Test case for injecting a novelty in a fraction of the workers, one after the other.
+    """
+    env = NoveltyEnv(
+        "door_key_change",
+        novelty_step=19,
+        n_envs=4,
+        seed=0,
+        novelty_stagger=4,
+        novelty_fraction=0.5,
+    )
+    env.reset()
+    injected_steps = []
+    for step in range(8):
+        task_idx = env.task_idx.tolist()
+        _, _, _, infos = env.step(np.zeros(4, dtype=np.int64))
+        assert [info["task_idx"] for info in infos] == task_idx
+        injected_steps += [
+            (step, i) for i, info in enumerate(infos) if info.get("novelty_injected")
+        ]
+    assert injected_steps == [(4, 0), (6, 1)]
+    assert list(env.task_idx) == [1, 1, 0, 0] and env.get_attr("env_idx") == [1, 1, 0, 0]
+    env.close()
+
+
+def test_respawn_crashed_worker():
+    """
+    Test case for respawning a killed worker on its task, ending its episode as a truncation.
+    """
+    import gc
+    import signal
+
+    env = NoveltyEnv(
+        "door_key_change",
+        novelty_step=5,
+        n_envs=2,
+        seed=0,
+        start_method="fork",
+        respawn_workers=True,
+        health_check_interval=0.05,
+    )
+    env.reset()
+    for _ in range(3):
+        env.step(np.zeros(2, dtype=np.int64))
+    assert list(env.task_idx) == [1, 1]
+
+    os.kill(env.processes[1].pid, signal.SIGKILL)
+    freezes, freeze = [], gc.freeze
+    gc.freeze = lambda: freezes.append(freeze())
+    try:
+        with warnings.catch_warnings(record=True):
+            obs, _, dones, infos = env.step(np.zeros(2, dtype=np.int64))
+    finally:
+        gc.freeze = freeze
+    assert env.n_respawns == 1 and infos[1]["worker_respawned"] and len(freezes) == 1
+    assert gc.get_freeze_count() == 0
+    assert dones[1] and infos[1]["TimeLimit.truncated"] and not dones[0]
+    assert "terminal_observation" in infos[1] and obs["image"].shape == (2, 7, 7, 3)
+    assert env.get_attr("env_idx") == [1, 1]
+    env.step(np.zeros(2, dtype=np.int64))
+    env.close()
+
+
+def test_envs_per_worker_matches_one_env_per_worker():
+    """
+    Test case for stepping several ListEnvs per worker like one ListEnv per worker, with one monitor per rank.
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as monitor_dir:
+        kwargs = dict(
+            env_configs="door_key_change", novelty_step=40, n_envs=5, seed=0, start_index=3
+        )
+        single = NoveltyEnv(**kwargs)
+        batched = NoveltyEnv(envs_per_worker=2, monitor_dir=monitor_dir, **kwargs)
+        assert len(batched.processes) == 3
+        assert [s.stop - s.start for s in batched.host_slices] == [1, 2, 2]
+
+        single_obs, batched_obs = single.reset(), batched.reset()
+        actions = np.random.default_rng(0).integers(0, 3, size=(30, 5))
+        for step_actions in actions:
+            assert np.array_equal(single_obs["image"], batched_obs["image"])
+            single_obs, single_rewards, single_dones, single_infos = single.step(step_actions)
+            batched_obs, rewards, dones, infos = batched.step(step_actions)
+            assert np.array_equal(single_rewards, rewards) and np.array_equal(single_dones, dones)
+            assert [i["task_idx"] for i in single_infos] == [i["task_idx"] for i in infos]
+        assert list(batched.task_idx) == [1] * 5
+        assert batched.get_attr("env_idx", indices=[4, 0]) == [1, 1]
+        single.close()
+        batched.close()
+        assert sorted(os.listdir(monitor_dir)) == ["3", "4", "5", "6", "7"]
+
+
+def test_array_infos_match_list_infos():
+    """
+    Test case for returning the infos of a NoveltyEnv as one struct of arrays, matching the per-env infos.
+    """
+    kwargs = dict(
+        env_configs=[{"env_id": "NovGrid-ColoredDoorKeyEnv", "max_steps": 5}] * 2,
+        novelty_step=12,
+        n_envs=3,
+        seed=0,
+        envs_per_worker=2,
+    )
+    lists = NoveltyEnv(**kwargs)
+    arrays = NoveltyEnv(array_infos=True, **kwargs)
+    lists.reset(), arrays.reset()
+    actions = np.random.default_rng(0).integers(0, 3, size=(15, 3))
+    for step_actions in actions:
+        _, list_rewards, list_dones, list_infos = lists.step(step_actions)
+        _, rewards, dones, infos = arrays.step(step_actions)
+        assert np.array_equal(list_rewards, rewards) and np.array_equal(list_dones, dones)
+        assert infos["task_idx"].tolist() == [i["task_idx"] for i in list_infos]
+        assert infos["episode_len"].tolist() == [
+            i["episode"]["l"] if "episode" in i else 0 for i in list_infos
+        ]
+        for key in ("novelty_injected", "TimeLimit.truncated"):
+            assert infos[key].tolist() == [i.get(key, False) for i in list_infos]
+        assert sorted(infos.get("terminal_observation", {})) == [
+            i for i, info in enumerate(list_infos) if "terminal_observation" in info
+        ]
+    assert list(arrays.task_idx) == list(lists.task_idx) == [1, 1, 1]
+    lists.close()
+    arrays.close()
+
+
+def test_rollout_random_in_workers():
+    """
+    Test case for stepping the workers with seeded random actions, injecting the novelties between chunks.
+    """
+    kwargs = dict(
+        env_configs=[{"env_id": "NovGrid-ColoredDoorKeyEnv", "max_steps": 5}] * 3,
+        novelty_step=40,
+        n_envs=3,
+        seed=0,
+        envs_per_worker=2,
+    )
+    env = NoveltyEnv(**kwargs)
+    rollout = env.rollout_random(50, record=True, seed=1)
+    assert rollout["steps"] == 150 and env.total_time_steps == 150
+    assert [chunk["actions"].shape for chunk in rollout["chunks"]] == [(3, 13)] * 3 + [(3, 11)]
+    assert rollout["chunks"][0]["observations"]["image"].shape == (3, 13, 7, 7, 3)
+    assert len(rollout["episode_lengths"]) == sum(chunk["dones"].sum() for chunk in rollout["chunks"]) - 6
+    assert list(env.task_idx) == [2, 2, 2] and env.get_attr("env_idx") == [2, 2, 2]
+    obs, _, _, _ = env.step(np.zeros(3, dtype=np.int64))
+    assert obs["image"].shape == (3, 7, 7, 3)
+
+    other = NoveltyEnv(**kwargs)
+    other_rollout = other.rollout_random(50, seed=1)
+    assert np.array_equal(rollout["episode_returns"], other_rollout["episode_returns"])
+    assert np.array_equal(rollout["episode_task_idx"], other_rollout["episode_task_idx"])
+    assert "chunks" not in other_rollout
+    env.close()
+    other.close()
+
+
+def test_lazy_tasks_match_eager_tasks():
+    """
+    Test case for building the env of each task when it starts, with the same trajectories as building them all.
+    """
+    kwargs = dict(
+        env_configs=[{"env_id": "NovGrid-ColoredDoorKeyEnv", "size": size} for size in (6, 8, 6)],
+        novelty_step=30,
+        n_envs=2,
+        seed=0,
+    )
+    eager = NoveltyEnv(**kwargs)
+    lazy = NoveltyEnv(lazy_tasks=True, **kwargs)
+    assert lazy.get_attr("env_lst", indices=[0])[0][1:] == [None, None]
+    eager_obs, lazy_obs = eager.reset(), lazy.reset()
+    actions = np.random.default_rng(0).integers(0, 3, size=(40, 2))
+    for step_actions in actions:
+        assert np.array_equal(eager_obs["image"], lazy_obs["image"])
+        eager_obs, eager_rewards, eager_dones, _ = eager.step(step_actions)
+        lazy_obs, rewards, dones, _ = lazy.step(step_actions)
+        assert np.array_equal(eager_rewards, rewards) and np.array_equal(eager_dones, dones)
+    assert list(lazy.task_idx) == [2, 2]
+    env_lst = lazy.get_attr("env_lst", indices=[1])[0]
+    assert env_lst[:2] == [None, None] and env_lst[2] is not None
+    eager.close()
+    lazy.close()
+
+
+def test_forkserver_matches_fork():
+    """
+    Test case for running the same trajectories in forkserver workers, from env functions that unpickle without
+    importing torch.
+    """
+    import subprocess
+    import sys
+
+    import cloudpickle
+    from stable_baselines3.common.monitor import Monitor
+
+    kwargs = dict(env_configs="door_key_change", novelty_step=20, n_envs=2, seed=0)
+    fork = NoveltyEnv(start_method="fork", **kwargs)
+    forkserver = NoveltyEnv(start_method="forkserver", **kwargs)
+    assert forkserver.env_is_wrapped(Monitor) == [True, True]
+    fork_obs, forkserver_obs = fork.reset(), forkserver.reset()
+    actions = np.random.default_rng(0).integers(0, 3, size=(30, 2))
+    for step_actions in actions:
+        assert np.array_equal(fork_obs["image"], forkserver_obs["image"])
+        fork_obs, fork_rewards, fork_dones, _ = fork.step(step_actions)
+        forkserver_obs, rewards, dones, _ = forkserver.step(step_actions)
+        assert np.array_equal(fork_rewards, rewards) and np.array_equal(fork_dones, dones)
+    assert list(forkserver.task_idx) == [1, 1]
+    env_fn = cloudpickle.dumps(forkserver._env_fns[0])
+    fork.close()
+    forkserver.close()
+
+    # A process forked by the forkserver starts with its modules, the builtin exec target imports nothing more
+    process = worker_context("forkserver").Process(
+        target=exec, args=("import sys\nsys.exit('torch' in sys.modules)",)
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    script = (
+        "import sys, cloudpickle\n"
+        "import novgrid.host, novgrid.list_env\n"
+        "cloudpickle.loads(sys.stdin.buffer.read())\n"
+        "assert 'torch' not in sys.modules and 'stable_baselines3' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", script], input=env_fn, check=True)
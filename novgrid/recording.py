@@ -0,0 +1,359 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import os
+
+import json
+import numpy as np
+
+INDEX_FILE = "index.json"
+
+
+def _obs_fields(obs: Union[np.ndarray, Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Splits a batch of vectorized observations into named numeric fields.
+
+    Dict observations are stored as one field per key ("obs_<key>"), non-numeric entries such as the
+    MiniGrid mission string are skipped.
+
+    Args:
+        obs (Union[np.ndarray, Dict[str, Any]]): A batch of observations with the env index as its first axis.
+
+    Returns:
+        Dict[str, np.ndarray]: The numeric observation fields.
+    """
+    if isinstance(obs, dict):
+        fields = {}
+        for k, v in obs.items():
+            v = np.asarray(v)
+            if v.dtype.kind in "biuf":
+                fields[f"obs_{k}"] = v
+        return fields
+    return {"obs": np.asarray(obs)}
+
+
+class TrajectoryWriter:
+    """
+    Streams vectorized transitions into chunked, memory-mapped .npy files.
+
+    Each chunk is a directory holding one .npy file per field (observations, action, reward, done, task_idx
+    and env). Rows are ordered by vectorized step and then by env. An index file records the length of every
+    chunk, the contiguous row runs belonging to each task and the rows at which novelties were injected.
+
+    Attributes:
+        directory (str): Directory that the dataset is written to.
+        n_envs (int): Number of envs per vectorized step.
+        chunk_size (int): Maximum number of rows per chunk.
+        n_rows (int): Number of rows written so far.
+    """
+
+    def __init__(self, directory: str, n_envs: int, chunk_size: int = 2**16) -> None:
+        """
+        Initializes the TrajectoryWriter.
+
+        Args:
+            directory (str): Directory that the dataset is written to.
+            n_envs (int): Number of envs per vectorized step.
+            chunk_size (int): Maximum number of rows per chunk.
+        """
+        if chunk_size < n_envs:
+            raise ValueError(
+                f"The chunk_size ({chunk_size}) must hold at least one step of every env ({n_envs})."
+            )
+        self.directory = directory
+        self.n_envs = n_envs
+        self.chunk_size = chunk_size - chunk_size % n_envs
+        self.n_rows = 0
+
+        self._chunks: List[int] = []
+        self._arrays: Dict[str, np.memmap] = {}
+        self._chunk_rows = 0
+        self._task_runs: Dict[int, List[List[int]]] = {}
+        self._novelty_rows: List[int] = []
+        self._env_range = np.arange(n_envs, dtype=np.int32)
+        self.closed = False
+
+        os.makedirs(directory, exist_ok=True)
+
+    def add(
+        self,
+        obs: Union[np.ndarray, Dict[str, Any]],
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        dones: np.ndarray,
+        task_idx: np.ndarray,
+    ) -> None:
+        """
+        Writes one vectorized step worth of transitions.
+
+        Args:
+            obs (Union[np.ndarray, Dict[str, Any]]): The observations the actions were taken from.
+            actions (np.ndarray): The actions taken in each env.
+            rewards (np.ndarray): The rewards received in each env.
+            dones (np.ndarray): The done flags of each env.
+            task_idx (np.ndarray): The task index of each env.
+        """
+        fields = _obs_fields(obs)
+        fields["action"] = np.asarray(actions)
+        fields["reward"] = np.asarray(rewards, dtype=np.float32)
+        fields["done"] = np.asarray(dones, dtype=bool)
+        fields["task_idx"] = np.asarray(task_idx, dtype=np.int32)
+        fields["env"] = self._env_range
+
+        if not self._arrays or self._chunk_rows >= self.chunk_size:
+            self._open_chunk(fields)
+
+        start = self._chunk_rows
+        stop = start + self.n_envs
+        for k, v in fields.items():
+            self._arrays[k][start:stop] = v
+        self._chunk_rows = stop
+
+        for i, t in enumerate(fields["task_idx"].tolist()):
+            runs = self._task_runs.setdefault(t, [])
+            row = self.n_rows + i
+            if runs and runs[-1][1] == row:
+                runs[-1][1] = row + 1
+            else:
+                runs.append([row, row + 1])
+        self.n_rows += self.n_envs
+
+    def mark_novelty(self) -> None:
+        """Records that a novelty was injected before the next row to be written."""
+        self._novelty_rows.append(self.n_rows)
+
+    def _open_chunk(self, fields: Dict[str, np.ndarray]) -> None:
+        """
+        Flushes the current chunk and memory-maps the files of a new one.
+
+        Args:
+            fields (Dict[str, np.ndarray]): A step worth of fields used to infer the shapes and dtypes.
+        """
+        self._flush_chunk()
+        chunk_dir = os.path.join(self.directory, f"chunk_{len(self._chunks):05d}")
+        os.makedirs(chunk_dir, exist_ok=True)
+        self._arrays = {
+            k: np.lib.format.open_memmap(
+                os.path.join(chunk_dir, f"{k}.npy"),
+                mode="w+",
+                dtype=v.dtype,
+                shape=(self.chunk_size,) + v.shape[1:],
+            )
+            for k, v in fields.items()
+        }
+        self._chunks.append(0)
+        self._chunk_rows = 0
+
+    def _flush_chunk(self) -> None:
+        """Flushes the current chunk to disk and records its length."""
+        if not self._arrays:
+            return
+        for arr in self._arrays.values():
+            arr.flush()
+        self._chunks[-1] = self._chunk_rows
+
+    def flush(self) -> None:
+        """Flushes all pending data and writes the index file."""
+        self._flush_chunk()
+        index = {
+            "n_envs": self.n_envs,
+            "chunk_size": self.chunk_size,
+            "chunk_lengths": self._chunks,
+            "fields": sorted(self._arrays.keys()),
+            "task_runs": {str(k): v for k, v in self._task_runs.items()},
+            "novelty_rows": self._novelty_rows,
+        }
+        with open(os.path.join(self.directory, INDEX_FILE), "w") as f:
+            json.dump(index, f)
+
+    def close(self) -> None:
+        """Flushes the dataset and releases the memory-mapped files."""
+        if self.closed:
+            return
+        self.flush()
+        self._arrays = {}
+        self.closed = True
+
+
+class TrajectoryDataset:
+    """
+    Read-only view of a dataset written by a TrajectoryWriter.
+
+    Chunks are memory-mapped, so only the rows that are sampled are ever read into memory.
+
+    Attributes:
+        directory (str): Directory the dataset was written to.
+        n_envs (int): Number of envs per vectorized step.
+        fields (List[str]): Names of the stored fields.
+        novelty_rows (List[int]): Rows at which each novelty was injected.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initializes the TrajectoryDataset.
+
+        Args:
+            directory (str): Directory the dataset was written to.
+        """
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE), "r") as f:
+            index = json.load(f)
+        self.n_envs = index["n_envs"]
+        self.fields = index["fields"]
+        self.novelty_rows = index["novelty_rows"]
+        self._task_runs = {
+            int(k): np.array(v, dtype=np.int64).reshape(-1, 2)
+            for k, v in index["task_runs"].items()
+        }
+        lengths = np.array(index["chunk_lengths"], dtype=np.int64)
+        self._chunk_starts = np.concatenate([[0], np.cumsum(lengths)])
+        self._chunks = [
+            {
+                k: np.load(
+                    os.path.join(directory, f"chunk_{i:05d}", f"{k}.npy"), mmap_mode="r"
+                )[:length]
+                for k in self.fields
+            }
+            for i, length in enumerate(lengths.tolist())
+        ]
+
+    def __len__(self) -> int:
+        """
+        Gets the number of rows in the dataset.
+
+        Returns:
+            int: Number of rows.
+        """
+        return int(self._chunk_starts[-1])
+
+    @property
+    def tasks(self) -> List[int]:
+        """
+        Gets the task indices present in the dataset.
+
+        Returns:
+            List[int]: Sorted task indices.
+        """
+        return sorted(self._task_runs.keys())
+
+    def task_size(self, task_idx: int) -> int:
+        """
+        Gets the number of rows recorded for a task.
+
+        Args:
+            task_idx (int): Index of the task.
+
+        Returns:
+            int: Number of rows.
+        """
+        runs = self._task_runs.get(task_idx)
+        return 0 if runs is None else int(np.sum(runs[:, 1] - runs[:, 0]))
+
+    def get(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Gathers a set of rows from the memory-mapped chunks.
+
+        Args:
+            rows (np.ndarray): Global row indices to gather.
+
+        Returns:
+            Dict[str, np.ndarray]: The gathered fields, in the order of rows.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if rows.size and (rows.min() < 0 or rows.max() >= len(self)):
+            raise IndexError(f"Rows must be in [0, {len(self)}).")
+        if not self._chunks:
+            return {}
+        chunk_ids = np.searchsorted(self._chunk_starts, rows, side="right") - 1
+        batch = {
+            k: np.empty((len(rows),) + v.shape[1:], dtype=v.dtype)
+            for k, v in self._chunks[0].items()
+        }
+        for c in np.unique(chunk_ids).tolist():
+            mask = chunk_ids == c
+            local = rows[mask] - self._chunk_starts[c]
+            for k, v in self._chunks[c].items():
+                batch[k][mask] = v[local]
+        return batch
+
+    def sample(
+        self,
+        batch_size: int,
+        task_idx: Optional[int] = None,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Samples a batch of rows uniformly, optionally restricted to a single task.
+
+        Args:
+            batch_size (int): Number of rows to sample.
+            task_idx (Optional[int]): Only sample rows recorded on this task if provided.
+            rng (Optional[np.random.Generator]): Random number generator to sample with.
+
+        Returns:
+            Dict[str, np.ndarray]: The sampled fields.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        if task_idx is None:
+            return self.get(rng.integers(0, len(self), size=batch_size))
+
+        if self.task_size(task_idx) == 0:
+            raise ValueError(f"No rows were recorded for task {task_idx}.")
+        runs = self._task_runs[task_idx]
+        offsets = np.concatenate([[0], np.cumsum(runs[:, 1] - runs[:, 0])])
+        flat = rng.integers(0, offsets[-1], size=batch_size)
+        run_ids = np.searchsorted(offsets, flat, side="right") - 1
+        return self.get(runs[run_ids, 0] + flat - offsets[run_ids])
+
+    def novelty_slice(
+        self, novelty_idx: int, before: int, after: int
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """
+        Gets the rows directly before and after a novelty injection.
+
+        Args:
+            novelty_idx (int): Which injected novelty to slice around.
+            before (int): Number of rows to take before the injection.
+            after (int): Number of rows to take after the injection.
+
+        Returns:
+            Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]: The pre-novelty and post-novelty rows.
+        """
+        row = self.novelty_rows[novelty_idx]
+        pre = np.arange(max(0, row - before), row)
+        post = np.arange(row, min(len(self), row + after))
+        return self.get(pre), self.get(post)
+
+
+def test_trajectory_roundtrip(tmp_path):
+    """
+    Test case for writing and reading back a small trajectory dataset across chunks and tasks.
+    """
+    writer = TrajectoryWriter(str(tmp_path), n_envs=2, chunk_size=4)
+    for step in range(5):
+        if step == 3:
+            writer.mark_novelty()
+        writer.add(
+            obs={
+                "image": np.full((2, 3, 3, 3), step, dtype=np.uint8),
+                "mission": np.array(["a", "b"]),
+            },
+            actions=np.array([step, step + 1]),
+            rewards=np.zeros(2),
+            dones=np.array([False, step == 4]),
+            task_idx=np.full(2, int(step >= 3)),
+        )
+    writer.close()
+
+    dataset = TrajectoryDataset(str(tmp_path))
+    assert len(dataset) == 10
+    assert dataset.tasks == [0, 1]
+    assert dataset.task_size(1) == 4
+    assert "obs_mission" not in dataset.fields
+
+    batch = dataset.sample(16, task_idx=1, rng=np.random.default_rng(0))
+    assert np.all(batch["task_idx"] == 1)
+    assert np.all(batch["obs_image"][:, 0, 0, 0] >= 3)
+
+    pre, post = dataset.novelty_slice(0, before=3, after=100)
+    assert pre["action"].tolist() == [2, 2, 3]
+    assert np.all(post["task_idx"] == 1) and len(post["task_idx"]) == 4
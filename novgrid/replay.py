@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import gymnasium as gym
+from stable_baselines3.common.monitor import Monitor
+
+from novgrid.action_log import ActionLog
+from novgrid.list_env import ListEnv, make_list_env_fn
+from novgrid.novelty_env import read_env_configs, resolve_world_objects
+from novgrid.utils import skip_obs
+
+
+def _below_monitor(env: gym.Env) -> gym.Env:
+    """
+    Gets the env directly wrapped by the Monitor of a task env.
+
+    Args:
+        env (gymnasium.Env): The fully wrapped task env.
+
+    Returns:
+        gymnasium.Env: The env below the Monitor.
+    """
+    while not isinstance(env, Monitor):
+        env = env.env
+    return env.env
+
+
+class ReplayEngine:
+    """
+    Deterministically re-simulates the workers of a NoveltyEnv from an action log, without a policy.
+
+    Steps up to the target are taken on the task env below its Monitor, so dynamics novelties still apply,
+    with observation generation skipped. The observation is built once at the target step. State held by the
+    Monitor and the user wrappers is not advanced while fast forwarding.
+
+    Attributes:
+        log (ActionLog): The action log being replayed.
+        env_configs (List[Dict[str, Any]]): Configuration for environments.
+    """
+
+    def __init__(
+        self,
+        log: Union[str, ActionLog],
+        env_configs: Optional[Union[str, List[Dict[str, Any]]]] = None,
+        wrappers: List[gym.Wrapper] = [],
+        wrapper_kwargs_lst: List[Dict[str, Any]] = [],
+    ) -> None:
+        """
+        Initializes the ReplayEngine.
+
+        Args:
+            log (Union[str, ActionLog]): The action log, or the directory it was written to.
+            env_configs (Optional[Union[str, List[Dict[str, Any]]]]): Configuration for environments, defaults to the configs stored in the log.
+            wrappers (List[gymnasium.Wrapper]): List of wrappers that the run applied to each environment.
+            wrapper_kwargs_lst (List[Dict[str, Any]]): List of wrapper kwargs for each wrapper.
+        """
+        self.log = ActionLog(log) if isinstance(log, str) else log
+        if env_configs is None:
+            if self.log.env_configs is None:
+                raise ValueError(
+                    "The action log does not store its env configs, pass them as env_configs."
+                )
+            env_configs = self.log.env_configs
+        self.env_configs = resolve_world_objects(read_env_configs(env_configs))
+        self.wrappers = wrappers
+        self.wrapper_kwargs_lst = wrapper_kwargs_lst
+
+    def fast_forward(
+        self, env_idx: int, target_step: int, batch_size: int = 4096
+    ) -> Tuple[ListEnv, Any]:
+        """
+        Re-simulates one worker up to a vectorized step.
+
+        Args:
+            env_idx (int): Index of the worker within the logged NoveltyEnv.
+            target_step (int): Number of logged steps to apply.
+            batch_size (int): Number of actions read from the log at a time.
+
+        Returns:
+            Tuple[ListEnv, Any]: The ListEnv in the state reached after target_step steps, and the unwrapped observation of that state.
+        """
+        if not 0 <= target_step <= self.log.n_steps:
+            raise ValueError(
+                f"The target_step must be in [0, {self.log.n_steps}], got {target_step}."
+            )
+        rank = self.log.start_index + env_idx
+        env = make_list_env_fn(
+            env_configs=self.env_configs,
+            rank=rank,
+            wrappers=self.wrappers,
+            wrapper_kwargs_lst=self.wrapper_kwargs_lst,
+        )()
+        env.reset(seed=self.log.seeds[env_idx])
+
+        novelty_steps = [s for s in self.log.novelty_steps[env_idx] if s <= target_step]
+        step = 0
+        for boundary in novelty_steps + [target_step]:
+            while step < boundary:
+                actions = self.log.actions[step : min(boundary, step + batch_size), env_idx]
+                task_env = _below_monitor(env.cur_env)
+                with skip_obs(task_env):
+                    for action in actions.tolist():
+                        _, _, terminated, truncated, _ = task_env.step(action)
+                        if terminated or truncated:
+                            task_env.reset()
+                step += len(actions)
+            if boundary in novelty_steps:
+                env.incr_env_idx()
+
+        return env, env.cur_env.unwrapped.gen_obs()
+
+
+def test_replay_matches_rollout(tmp_path):
+    """
+    Test case for fast forwarding a worker through a novelty injection from its action log.
+    """
+    import numpy as np
+
+    from novgrid.action_log import ActionLogWriter
+
+    env_configs = read_env_configs("door_key_change")
+    env = make_list_env_fn(resolve_world_objects(read_env_configs(env_configs)), rank=0)()
+    env.reset(seed=7)
+    writer = ActionLogWriter(str(tmp_path), n_envs=1, seeds=[7], env_configs=env_configs)
+    rng = np.random.default_rng(0)
+    for step in range(200):
+        action = int(rng.integers(0, 6))
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+        writer.add([action])
+        if step == 120:
+            env.incr_env_idx()
+            writer.mark_novelty([True])
+    writer.close()
+
+    replayed, obs = ReplayEngine(str(tmp_path)).fast_forward(0, 200, batch_size=32)
+    assert replayed.env_idx == 1
+    assert replayed.cur_env.unwrapped.hash() == env.cur_env.unwrapped.hash()
+    assert np.array_equal(obs["image"], env.cur_env.unwrapped.gen_obs()["image"])
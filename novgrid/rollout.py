@@ -0,0 +1,297 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import gymnasium as gym
+import numpy as np
+
+from novgrid.infos import get_info
+
+
+def _obs_storage(space: gym.Space, n_steps: int, n_envs: int) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Preallocates the observation storage of a rollout.
+
+    Dict spaces are stored as one array per box subspace, other subspaces such as the MiniGrid mission are
+    not stored.
+
+    Args:
+        space (gymnasium.Space): The observation space.
+        n_steps (int): Number of vectorized steps in the rollout.
+        n_envs (int): Number of envs per vectorized step.
+
+    Returns:
+        Union[np.ndarray, Dict[str, np.ndarray]]: The zeroed observation arrays.
+    """
+    if isinstance(space, gym.spaces.Dict):
+        return {
+            k: np.zeros((n_steps, n_envs, *s.shape), dtype=s.dtype)
+            for k, s in space.spaces.items()
+            if isinstance(s, gym.spaces.Box)
+        }
+    return np.zeros((n_steps, n_envs, *space.shape), dtype=space.dtype)
+
+
+class RolloutBuffer:
+    """
+    Preallocated rollout storage that a NoveltyEnv writes its transitions into, indexed by (step, env).
+
+    The buffer is a ring: once n_steps vectorized steps are stored the oldest step is overwritten. Alongside
+    the transitions it stores the task of every step and a mask of the steps after which a novelty was
+    injected. An injection ends the episode as a truncation, so the return of the interrupted episode is
+    bootstrapped from the value of its last observation instead of running into the next task.
+
+    Attributes:
+        n_steps (int): Number of vectorized steps held by the buffer.
+        n_envs (int): Number of envs per vectorized step.
+        pos (int): Index of the next step to write.
+        full (bool): Whether the buffer has wrapped around.
+        observations (Union[np.ndarray, Dict[str, np.ndarray]]): Observation the action was taken from.
+        actions (np.ndarray): Actions taken.
+        rewards (np.ndarray): Rewards received.
+        dones (np.ndarray): Whether the episode ended after the step, by termination, truncation or injection.
+        truncated (np.ndarray): Whether the episode was cut after the step, by a time limit or a novelty injection.
+        novelty (np.ndarray): Whether a novelty was injected after the step.
+        task_idx (np.ndarray): Index of the task the step was taken in.
+        values (np.ndarray): Value estimates of the observations.
+        log_probs (np.ndarray): Log probabilities of the actions.
+        terminal_values (np.ndarray): Value estimates of the last observation of truncated episodes.
+        advantages (np.ndarray): GAE advantages, filled by compute_returns_and_advantage.
+        returns (np.ndarray): Returns, filled by compute_returns_and_advantage.
+    """
+
+    def __init__(
+        self,
+        n_steps: int,
+        n_envs: int,
+        observation_space: gym.Space,
+        action_space: gym.Space,
+    ) -> None:
+        """
+        Initializes the RolloutBuffer.
+
+        Args:
+            n_steps (int): Number of vectorized steps held by the buffer.
+            n_envs (int): Number of envs per vectorized step.
+            observation_space (gymnasium.Space): Observation space of the envs.
+            action_space (gymnasium.Space): Action space of the envs.
+        """
+        self.n_steps = n_steps
+        self.n_envs = n_envs
+        self.pos = 0
+        self.full = False
+
+        shape = (n_steps, n_envs)
+        self.observations = _obs_storage(observation_space, n_steps, n_envs)
+        self.actions = np.zeros(
+            (*shape, *action_space.shape),
+            dtype=action_space.dtype if action_space.dtype is not None else np.int64,
+        )
+        self.rewards = np.zeros(shape, dtype=np.float32)
+        self.dones = np.zeros(shape, dtype=bool)
+        self.truncated = np.zeros(shape, dtype=bool)
+        self.novelty = np.zeros(shape, dtype=bool)
+        self.task_idx = np.zeros(shape, dtype=np.int64)
+        self.values = np.zeros(shape, dtype=np.float32)
+        self.log_probs = np.zeros(shape, dtype=np.float32)
+        self.terminal_values = np.zeros(shape, dtype=np.float32)
+        self.advantages = np.zeros(shape, dtype=np.float32)
+        self.returns = np.zeros(shape, dtype=np.float32)
+
+        # Last observation of the truncated episodes, by (step, env), until their values are computed
+        self._terminal_obs: Dict[Tuple[int, int], Any] = {}
+
+    def __len__(self) -> int:
+        """
+        Gets the number of vectorized steps stored.
+
+        Returns:
+            int: Number of steps.
+        """
+        return self.n_steps if self.full else self.pos
+
+    def reset(self) -> None:
+        """Empties the buffer, the arrays are kept and overwritten by the next steps."""
+        self.pos = 0
+        self.full = False
+        self._terminal_obs.clear()
+
+    def add_policy_outputs(self, values: np.ndarray, log_probs: np.ndarray) -> None:
+        """
+        Stores the policy outputs for the observations of the next step, before the step is taken.
+
+        Args:
+            values (np.ndarray): Value estimate of each env.
+            log_probs (np.ndarray): Log probability of the action of each env.
+        """
+        self.values[self.pos] = np.asarray(values).reshape(self.n_envs)
+        self.log_probs[self.pos] = np.asarray(log_probs).reshape(self.n_envs)
+
+    def add_step(
+        self,
+        obs: Union[np.ndarray, Dict[str, Any]],
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        dones: np.ndarray,
+        infos: Union[List[Dict[str, Any]], Dict[str, Any]],
+        task_idx: np.ndarray,
+        novelty: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Stores one vectorized step, this is called by NoveltyEnv.step.
+
+        Args:
+            obs (Union[np.ndarray, Dict[str, Any]]): Observations the actions were taken from.
+            actions (np.ndarray): Actions taken.
+            rewards (np.ndarray): Rewards received.
+            dones (np.ndarray): Whether each episode ended.
+            infos (Union[List[Dict[str, Any]], Dict[str, Any]]): Per-env or array infos, holding the terminal observation of ended episodes.
+            task_idx (np.ndarray): Index of the task of each env during the step.
+            novelty (Optional[np.ndarray]): Whether a novelty was injected in each env after the step.
+        """
+        pos = self.pos
+        if isinstance(self.observations, dict):
+            for k, v in self.observations.items():
+                v[pos] = obs[k]
+        else:
+            self.observations[pos] = obs
+        self.actions[pos] = np.asarray(actions).reshape(self.actions.shape[1:])
+        self.rewards[pos] = rewards
+        self.dones[pos] = dones
+        self.task_idx[pos] = task_idx
+        self.novelty[pos] = False if novelty is None else novelty
+        self.terminal_values[pos] = 0.0
+
+        self.truncated[pos] = False
+        for i in np.flatnonzero(dones):
+            self._terminal_obs.pop((pos, i), None)
+            if get_info(infos, i, "TimeLimit.truncated", False):
+                self.truncated[pos, i] = True
+                self._terminal_obs[(pos, i)] = get_info(infos, i, "terminal_observation")
+
+        self.pos = (pos + 1) % self.n_steps
+        self.full = self.full or self.pos == 0
+
+    def steps(self) -> np.ndarray:
+        """
+        Gets the indices of the stored steps, from the oldest to the newest.
+
+        Returns:
+            np.ndarray: The step indices.
+        """
+        if not self.full:
+            return np.arange(self.pos)
+        return (np.arange(self.n_steps) + self.pos) % self.n_steps
+
+    def compute_returns_and_advantage(
+        self,
+        last_values: np.ndarray,
+        gamma: float = 0.99,
+        gae_lambda: float = 0.95,
+        value_fn: Optional[Callable[[Any], np.ndarray]] = None,
+    ) -> None:
+        """
+        Computes the GAE advantages and the returns of the stored steps.
+
+        Episodes ended by a time limit or a novelty injection are bootstrapped from the value of their last
+        observation, which value_fn computes in one batch. Without value_fn truncated episodes are treated
+        as terminated.
+
+        Args:
+            last_values (np.ndarray): Value estimate of the observation following the newest step.
+            gamma (float): Discount factor.
+            gae_lambda (float): GAE smoothing factor.
+            value_fn (Optional[Callable[[Any], np.ndarray]]): Maps a batch of observations to their value estimates.
+        """
+        if value_fn is not None and self._terminal_obs:
+            keys = list(self._terminal_obs)
+            terminal_obs = [self._terminal_obs[k] for k in keys]
+            if isinstance(terminal_obs[0], dict):
+                batch = {
+                    k: np.stack([o[k] for o in terminal_obs])
+                    for k in terminal_obs[0]
+                    if np.asarray(terminal_obs[0][k]).dtype.kind in "biuf"
+                }
+            else:
+                batch = np.stack(terminal_obs)
+            values = np.asarray(value_fn(batch)).reshape(len(keys))
+            steps, envs = zip(*keys)
+            self.terminal_values[list(steps), list(envs)] = values
+            self._terminal_obs.clear()
+
+        last_values = np.asarray(last_values, dtype=np.float32).reshape(self.n_envs)
+        next_values = last_values
+        last_gae = np.zeros(self.n_envs, dtype=np.float32)
+        for step in self.steps()[::-1]:
+            not_done = 1.0 - self.dones[step]
+            bootstrap = next_values * not_done + self.terminal_values[step] * self.truncated[step]
+            delta = self.rewards[step] + gamma * bootstrap - self.values[step]
+            last_gae = delta + gamma * gae_lambda * not_done * last_gae
+            self.advantages[step] = last_gae
+            next_values = self.values[step]
+        self.returns[:] = self.advantages + self.values
+
+    def get(
+        self, batch_size: Optional[int] = None, rng: Optional[np.random.Generator] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterates over shuffled minibatches of the stored transitions.
+
+        Args:
+            batch_size (Optional[int]): Number of transitions per minibatch, defaults to all the stored ones.
+            rng (Optional[np.random.Generator]): Random generator used to shuffle the transitions.
+
+        Yields:
+            Dict[str, Any]: The observations, actions, values, log_probs, advantages, returns and task_idx of a minibatch.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        steps = self.steps()
+        n = len(steps) * self.n_envs
+        batch_size = n if batch_size is None else batch_size
+        order = rng.permutation(n)
+        step_idx = steps[order // self.n_envs]
+        env_idx = order % self.n_envs
+        for start in range(0, n, batch_size):
+            s = step_idx[start : start + batch_size]
+            e = env_idx[start : start + batch_size]
+            if isinstance(self.observations, dict):
+                observations = {k: v[s, e] for k, v in self.observations.items()}
+            else:
+                observations = self.observations[s, e]
+            yield {
+                "observations": observations,
+                "actions": self.actions[s, e],
+                "values": self.values[s, e],
+                "log_probs": self.log_probs[s, e],
+                "advantages": self.advantages[s, e],
+                "returns": self.returns[s, e],
+                "task_idx": self.task_idx[s, e],
+            }
+
+
+def test_gae_bootstraps_across_novelty():
+    """
+    Test case for cutting the advantage at a novelty injection and bootstrapping from the last observation.
+    """
+    from novgrid.novelty_env import NoveltyEnv
+
+    env = NoveltyEnv("door_key_change", novelty_step=20, n_envs=2, seed=0, rollout_steps=16)
+    buffer = env.rollout_buffer
+    env.reset()
+    for _ in range(16):
+        buffer.add_policy_outputs(np.ones(2), np.zeros(2))
+        env.step(np.array([2, 2]))
+    env.close()
+
+    novelty_step = int(np.flatnonzero(buffer.novelty[:, 0])[0])
+    assert buffer.novelty[novelty_step].all() and buffer.truncated[novelty_step].all()
+    assert (buffer.task_idx[: novelty_step + 1] == 0).all()
+    assert (buffer.task_idx[novelty_step + 1 :] == 1).all()
+
+    buffer.compute_returns_and_advantage(
+        np.ones(2), gamma=0.5, gae_lambda=1.0, value_fn=lambda obs: np.full(len(obs["image"]), 4.0)
+    )
+    # The rewards are zero and the values one, so the injected step only sees the terminal value
+    assert np.allclose(buffer.advantages[novelty_step], 0.5 * 4.0 - 1.0)
+    assert np.allclose(buffer.advantages[novelty_step - 1], 0.5 * 1.0 - 1.0 + 0.5 * 1.0)
+
+    batches = list(buffer.get(batch_size=8, rng=np.random.default_rng(0)))
+    assert len(batches) == 4 and batches[0]["observations"]["image"].shape == (8, 7, 7, 3)
@@ -0,0 +1,350 @@
+from typing import Any, Dict, List, Optional, SupportsFloat, Union
+
+import abc
+import collections
+import inspect
+import sys
+import time
+
+from novgrid.infos import episode_returns
+
+
+class NoveltySchedule(abc.ABC):
+    """
+    Abstract class deciding when a worker moves on to its next task.
+
+    A schedule runs inside the worker's ListEnv and sees every step of the current task, so checking it costs
+    no communication with the parent. When it fires mid-episode the episode is truncated, and the next task
+    starts on the reset that follows.
+    """
+
+    def __init__(self) -> None:
+        """Initialization method for the NoveltySchedule class."""
+        pass
+
+    def start_task(self, task_idx: int) -> None:
+        """
+        Resets the schedule when a task starts.
+
+        Args:
+            task_idx (int): Index of the task that starts.
+        """
+        pass
+
+    @abc.abstractmethod
+    def step(
+        self,
+        reward: SupportsFloat,
+        terminated: bool,
+        truncated: bool,
+        info: Dict[str, Any],
+    ) -> bool:
+        """
+        Abstract method to update the schedule with a step of the current task.
+
+        Args:
+            reward (SupportsFloat): Reward of the step.
+            terminated (bool): Whether the episode terminated.
+            truncated (bool): Whether the episode was truncated.
+            info (Dict[str, Any]): Info of the step.
+
+        Returns:
+            bool: Whether to move on to the next task.
+        """
+        pass
+
+
+class StepSchedule(NoveltySchedule):
+    """
+    Moves on to the next task after a number of steps of the worker in the current task.
+    """
+
+    def __init__(self, steps: int) -> None:
+        """
+        Initializes the StepSchedule.
+
+        Args:
+            steps (int): Number of steps per task.
+        """
+        super().__init__()
+        self.steps = steps
+        self.remaining = steps
+
+    def start_task(self, task_idx: int) -> None:
+        self.remaining = self.steps
+
+    def step(self, reward, terminated, truncated, info) -> bool:
+        self.remaining -= 1
+        return self.remaining <= 0
+
+
+class TaskStepSchedule(NoveltySchedule):
+    """
+    Moves on to the next task after an explicit number of steps for each task.
+    """
+
+    def __init__(self, task_steps: List[int]) -> None:
+        """
+        Initializes the TaskStepSchedule.
+
+        Args:
+            task_steps (List[int]): Number of steps of each task, the last task runs until the end if not listed.
+        """
+        super().__init__()
+        self.task_steps = list(task_steps)
+        self.remaining = self.task_steps[0] if self.task_steps else None
+
+    def start_task(self, task_idx: int) -> None:
+        self.remaining = (
+            self.task_steps[task_idx] if task_idx < len(self.task_steps) else None
+        )
+
+    def step(self, reward, terminated, truncated, info) -> bool:
+        if self.remaining is None:
+            return False
+        self.remaining -= 1
+        return self.remaining <= 0
+
+
+class EpisodeSchedule(NoveltySchedule):
+    """
+    Moves on to the next task after a number of episodes of the worker in the current task.
+    """
+
+    def __init__(self, episodes: int) -> None:
+        """
+        Initializes the EpisodeSchedule.
+
+        Args:
+            episodes (int): Number of episodes per task.
+        """
+        super().__init__()
+        self.episodes = episodes
+        self.remaining = episodes
+
+    def start_task(self, task_idx: int) -> None:
+        self.remaining = self.episodes
+
+    def step(self, reward, terminated, truncated, info) -> bool:
+        if terminated or truncated:
+            self.remaining -= 1
+        return self.remaining <= 0
+
+
+class WallClockSchedule(NoveltySchedule):
+    """
+    Moves on to the next task after a wall-clock duration in the current task.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        """
+        Initializes the WallClockSchedule.
+
+        Args:
+            seconds (float): Duration of each task in seconds.
+        """
+        super().__init__()
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def start_task(self, task_idx: int) -> None:
+        self.deadline = time.monotonic() + self.seconds
+
+    def step(self, reward, terminated, truncated, info) -> bool:
+        return time.monotonic() >= self.deadline
+
+
+class SuccessRateSchedule(NoveltySchedule):
+    """
+    Moves on to the next task once the success rate of the worker over its last episodes reaches a threshold,
+    an episode being successful if it terminated with a positive reward.
+    """
+
+    def __init__(self, threshold: float = 0.9, window: int = 100) -> None:
+        """
+        Initializes the SuccessRateSchedule.
+
+        Args:
+            threshold (float): Success rate to reach.
+            window (int): Number of last episodes the success rate is computed over.
+        """
+        super().__init__()
+        self.threshold = threshold
+        self.window = window
+        self.successes = collections.deque(maxlen=window)
+
+    def start_task(self, task_idx: int) -> None:
+        self.successes.clear()
+
+    def step(self, reward, terminated, truncated, info) -> bool:
+        if not (terminated or truncated):
+            return False
+        self.successes.append(terminated and float(reward) > 0)
+        return (
+            len(self.successes) == self.window
+            and sum(self.successes) >= self.threshold * self.window
+        )
+
+
+class ConvergenceTrigger:
+    """
+    Parent-side trigger that injects the next novelty once the agent has converged on the current task.
+
+    The trigger reads the episode statistics that the Monitor of every worker puts in the step infos, and keeps
+    a running sum over a window of the last episodes of all the workers, so each step costs one dict lookup per
+    env. The window is emptied at each novelty injection.
+
+    Attributes:
+        window (int): Number of last episodes the metric is averaged over.
+        threshold (float): Value of the averaged metric at which the trigger fires.
+        metric (str): Either "success" (the episode return is positive) or "return".
+    """
+
+    def __init__(
+        self, window: int = 100, threshold: float = 0.9, metric: str = "success"
+    ) -> None:
+        """
+        Initializes the ConvergenceTrigger.
+
+        Args:
+            window (int): Number of last episodes the metric is averaged over.
+            threshold (float): Value of the averaged metric at which the trigger fires.
+            metric (str): Either "success" (the episode return is positive) or "return".
+        """
+        if metric not in ("success", "return"):
+            raise ValueError(f"Unknown metric {metric}, expected success or return.")
+        self.window = window
+        self.threshold = threshold
+        self.metric = metric
+        self.values = collections.deque(maxlen=window)
+        self.total = 0.0
+
+    def reset(self) -> None:
+        """Empties the window, when a novelty is injected."""
+        self.values.clear()
+        self.total = 0.0
+
+    def update(self, infos: Union[List[Dict[str, Any]], Dict[str, Any]]) -> bool:
+        """
+        Adds the episodes that ended in a vectorized step to the window.
+
+        Args:
+            infos (Union[List[Dict[str, Any]], Dict[str, Any]]): The per-env or array infos of the step.
+
+        Returns:
+            bool: Whether the averaged metric over a full window reached the threshold.
+        """
+        for episode_return in episode_returns(infos):
+            value = episode_return if self.metric == "return" else float(episode_return > 0)
+            if len(self.values) == self.window:
+                self.total -= self.values[0]
+            self.values.append(value)
+            self.total += value
+        return (
+            len(self.values) == self.window
+            and self.total >= self.threshold * self.window
+        )
+
+    @property
+    def value(self) -> Optional[float]:
+        """
+        Gets the averaged metric over the current window.
+
+        Returns:
+            Optional[float]: The averaged metric, None if no episode ended since the last injection.
+        """
+        return self.total / len(self.values) if self.values else None
+
+
+def get_novelty_schedules() -> Dict[str, type]:
+    """
+    Gets the available novelty schedules by lowercase class name.
+
+    Returns:
+        Dict[str, type]: The novelty schedule classes.
+    """
+    return {
+        k.lower(): v
+        for k, v in inspect.getmembers(
+            sys.modules[__name__],
+            lambda obj: inspect.isclass(obj)
+            and issubclass(obj, NoveltySchedule)
+            and obj is not NoveltySchedule,
+        )
+    }
+
+
+def make_schedule(
+    schedule: Optional[Union[NoveltySchedule, str, Dict[str, Any]]]
+) -> Optional[NoveltySchedule]:
+    """
+    Builds a novelty schedule from a config.
+
+    Args:
+        schedule (Optional[Union[NoveltySchedule, str, Dict[str, Any]]]): A schedule, a schedule class name, or a dict with the class "name" and its kwargs.
+
+    Returns:
+        Optional[NoveltySchedule]: The schedule, or None if no schedule is given.
+    """
+    if schedule is None or isinstance(schedule, NoveltySchedule):
+        return schedule
+    available = get_novelty_schedules()
+    kwargs = {} if isinstance(schedule, str) else dict(schedule)
+    name = schedule if isinstance(schedule, str) else kwargs.pop("name")
+    if name.lower() not in available:
+        raise ValueError(
+            f"Unknown novelty schedule {name}, expected one of {sorted(available)}."
+        )
+    return available[name.lower()](**kwargs)
+
+
+def test_task_step_schedule_in_workers():
+    """
+    Test case for moving each worker to its next task from an in-worker schedule.
+    """
+    import numpy as np
+
+    from novgrid.novelty_env import NoveltyEnv
+
+    env = NoveltyEnv(
+        "door_key_layout_change",
+        novelty_step=None,
+        n_envs=2,
+        seed=0,
+        schedule={"name": "TaskStepSchedule", "task_steps": [5, 3]},
+    )
+    env.reset()
+    injected_steps = []
+    for step in range(12):
+        _, _, dones, infos = env.step(np.array([0, 0]))
+        if any(info.get("novelty_injected", False) for info in infos):
+            assert dones.all()
+            assert all(info["TimeLimit.truncated"] for info in infos)
+            injected_steps.append(step)
+    assert injected_steps == [4, 7]
+    assert list(env.task_idx) == [2, 2] and env.get_attr("env_idx") == [2, 2]
+    env.close()
+
+
+def test_convergence_trigger_from_episode_infos():
+    """
+    Test case for injecting the next novelty once a window of episodes reaches a return threshold.
+    """
+    import numpy as np
+
+    from novgrid.novelty_env import NoveltyEnv
+
+    env = NoveltyEnv(
+        [{"env_id": "NovGrid-ColoredDoorKeyEnv", "max_steps": 5}] * 2,
+        novelty_step=None,
+        n_envs=2,
+        seed=0,
+        convergence={"window": 4, "threshold": 0.0, "metric": "return"},
+    )
+    env.reset()
+    for step in range(10):
+        _, _, _, infos = env.step(np.array([0, 0]))
+        injected = [info.get("novelty_injected", False) for info in infos]
+        assert all(injected) == (step == 9)
+    assert list(env.task_idx) == [1, 1] and env.convergence.value is None
+    env.close()
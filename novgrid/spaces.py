@@ -0,0 +1,195 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import gymnasium as gym
+import numpy as np
+
+
+def _padded_bounds(space: gym.spaces.Box, shape: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pads the bounds of a box space to a larger shape, the padded cells being bounded to 0.
+
+    Args:
+        space (gymnasium.spaces.Box): The box space.
+        shape (Tuple[int, ...]): The padded shape.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The padded low and high bounds.
+    """
+    slices = tuple(slice(0, s) for s in space.shape)
+    low = np.zeros(shape, dtype=space.dtype)
+    high = np.zeros(shape, dtype=space.dtype)
+    low[slices] = space.low
+    high[slices] = space.high
+    return low, high
+
+
+def union_space(spaces: List[gym.Space]) -> gym.Space:
+    """
+    Computes the smallest observation space that the observations of every task can be padded into.
+
+    Box spaces are unioned into the elementwise maximum of their shapes, the observations being padded with
+    zeros at the end of each axis. Discrete spaces are unioned into the largest one, dict spaces are unioned
+    per key, and other spaces are taken from the first task since they aren't stored as arrays.
+
+    Args:
+        spaces (List[gymnasium.Space]): The observation space of each task.
+
+    Returns:
+        gymnasium.Space: The union of the spaces.
+
+    Raises:
+        ValueError: If the spaces have different types, keys, ranks or dtypes.
+    """
+    first = spaces[0]
+    if any(type(s) != type(first) for s in spaces):
+        raise ValueError(
+            f"Cannot union observation spaces of different types: {[type(s).__name__ for s in spaces]}"
+        )
+
+    if isinstance(first, gym.spaces.Dict):
+        if any(list(s.spaces) != list(first.spaces) for s in spaces):
+            raise ValueError(
+                f"Cannot union dict observation spaces with different keys: {[list(s.spaces) for s in spaces]}"
+            )
+        return gym.spaces.Dict(
+            {k: union_space([s[k] for s in spaces]) for k in first.spaces}
+        )
+
+    if isinstance(first, gym.spaces.Box):
+        if any(s.dtype != first.dtype or len(s.shape) != len(first.shape) for s in spaces):
+            raise ValueError(
+                f"Cannot union box observation spaces with different dtypes or ranks: {spaces}"
+            )
+        if all(s == first for s in spaces):
+            return first
+        shape = tuple(int(d) for d in np.max([s.shape for s in spaces], axis=0))
+        bounds = [_padded_bounds(s, shape) for s in spaces]
+        low = np.min([b[0] for b in bounds], axis=0)
+        high = np.max([b[1] for b in bounds], axis=0)
+        return gym.spaces.Box(low=low, high=high, dtype=first.dtype)
+
+    if isinstance(first, gym.spaces.Discrete):
+        if any(s.start != first.start for s in spaces):
+            raise ValueError(
+                f"Cannot union discrete observation spaces with different starts: {spaces}"
+            )
+        return gym.spaces.Discrete(max(int(s.n) for s in spaces), start=first.start)
+
+    return first
+
+
+class ObsPadder:
+    """
+    Pads the observations of a task into the union observation space of all the tasks.
+
+    The padded observations are written into preallocated buffers, which are zeroed once so that the padding
+    is never rewritten, and copies of the buffers are returned. Without copies, the buffers themselves are
+    returned and used in turn, so an observation is overwritten once n_buffers more observations are padded,
+    which covers the terminal observation returned alongside the reset observation. Only callers consuming each
+    observation before the next steps, like the workers stacking them into their replies, should skip the copies.
+    Observations that already have the union shape are returned as is.
+
+    Attributes:
+        copy (bool): Whether copies of the buffers are returned.
+        slices (Dict[Optional[str], Tuple[slice, ...]]): Per padded dict key (None for a box space), where the task observation goes in the buffer.
+        buffers (Dict[Optional[str], List[np.ndarray]]): Per padded dict key (None for a box space), the preallocated buffers.
+    """
+
+    def __init__(
+        self, space: gym.Space, union: gym.Space, n_buffers: int = 2, copy: bool = True
+    ) -> None:
+        """
+        Initializes the ObsPadder.
+
+        Args:
+            space (gymnasium.Space): The observation space of the task.
+            union (gymnasium.Space): The union observation space of all the tasks.
+            n_buffers (int): Number of buffers used in turn.
+            copy (bool): Whether copies of the buffers are returned, the buffers themselves are returned otherwise.
+        """
+        self.n_buffers = n_buffers
+        self.copy = copy
+        self.slices: Dict[Optional[str], Tuple[slice, ...]] = {}
+        self.buffers: Dict[Optional[str], List[np.ndarray]] = {}
+        self._next = 0
+
+        if isinstance(space, gym.spaces.Dict):
+            leaves = [(k, space[k], union[k]) for k in space.spaces]
+        else:
+            leaves = [(None, space, union)]
+        for key, leaf, union_leaf in leaves:
+            if isinstance(leaf, gym.spaces.Box) and leaf.shape != union_leaf.shape:
+                self.slices[key] = tuple(slice(0, s) for s in leaf.shape)
+                self.buffers[key] = [
+                    np.zeros(union_leaf.shape, dtype=union_leaf.dtype)
+                    for _ in range(n_buffers)
+                ]
+
+    def __call__(self, obs: Any) -> Any:
+        """
+        Pads an observation of the task.
+
+        Args:
+            obs (Any): The observation of the task.
+
+        Returns:
+            Any: The observation in the union observation space.
+        """
+        if not self.buffers:
+            return obs
+        idx = self._next
+        self._next = (idx + 1) % self.n_buffers
+        if None in self.buffers:
+            buffer = self.buffers[None][idx]
+            buffer[self.slices[None]] = obs
+            return buffer.copy() if self.copy else buffer
+        obs = dict(obs)
+        for key, buffers in self.buffers.items():
+            buffers[idx][self.slices[key]] = obs[key]
+            obs[key] = buffers[idx].copy() if self.copy else buffers[idx]
+        return obs
+
+
+def test_union_space_pads_sample_configs():
+    """
+    Test case for padding the full grid observations of tasks of different sizes into one space.
+    """
+    from minigrid.wrappers import FullyObsWrapper
+
+    from novgrid.novelty_env import make_list_env_fn, read_env_configs
+
+    list_env = make_list_env_fn(
+        read_env_configs("sample"), rank=0, wrappers=[FullyObsWrapper]
+    )()
+    space = list_env.observation_space
+    assert space["image"].shape == (16, 16, 3)
+
+    obs, _ = list_env.reset(seed=0)
+    assert space.contains(obs)
+    task_obs = list_env.cur_env.observation(list_env.cur_env.unwrapped.gen_obs())
+    assert np.array_equal(obs["image"][:10, :10], task_obs["image"])
+    assert not obs["image"][10:].any() and not obs["image"][:, 10:].any()
+
+    next_obs, *_ = list_env.step(0)
+    assert next_obs["image"] is not obs["image"] and space.contains(next_obs)
+
+    assert list_env.incr_env_idx() and list_env.incr_env_idx()
+    obs, *_ = list_env.step(0)
+    assert space.contains(obs) and obs["image"].shape == (16, 16, 3)
+
+
+def test_obs_padder_copies_unless_told_otherwise():
+    """
+    Test case for holding padded observations across steps, and for reusing the buffers without copies.
+    """
+    space = gym.spaces.Box(0, 255, (2, 2), dtype=np.uint8)
+    union = gym.spaces.Box(0, 255, (3, 3), dtype=np.uint8)
+    steps = [np.full((2, 2), i, dtype=np.uint8) for i in range(1, 4)]
+
+    padder = ObsPadder(space, union)
+    held = [padder(obs) for obs in steps]
+    assert [int(obs[0, 0]) for obs in held] == [1, 2, 3] and not held[0][2].any()
+
+    padder = ObsPadder(space, union, copy=False)
+    held = [padder(obs) for obs in steps]
+    assert held[0] is held[2] and int(held[0][0, 0]) == 3 and int(held[1][0, 0]) == 2
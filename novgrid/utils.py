@@ -0,0 +1,46 @@
+from typing import Any, Iterator
+
+import contextlib
+
+import gymnasium as gym
+from gymnasium.wrappers import PassiveEnvChecker
+
+
+def _no_obs() -> None:
+    """Stand-in for gen_obs that skips building the observation."""
+    return None
+
+
+@contextlib.contextmanager
+def skip_obs(env: gym.Env) -> Iterator[Any]:
+    """
+    Context manager that stops a MiniGrid env from generating observations.
+
+    Inside the context the unwrapped env only updates its state, and step and reset return None in place
+    of the observation. Call gen_obs on the unwrapped env after the context to build the observation once.
+    Env checkers in the wrapper stack are marked as done, since they would reject the missing observation.
+
+    Args:
+        env (gymnasium.Env): The (possibly wrapped) MiniGrid env.
+
+    Yields:
+        MiniGridEnv: The unwrapped env.
+    """
+    wrapper = env
+    while isinstance(wrapper, gym.Wrapper):
+        if isinstance(wrapper, PassiveEnvChecker):
+            for attr in ("checked_reset", "checked_step", "checked_data_reuse"):
+                if hasattr(wrapper, attr):
+                    setattr(wrapper, attr, True)
+        wrapper = wrapper.env
+
+    unwrapped = env.unwrapped
+    shadowed = unwrapped.__dict__.get("gen_obs")
+    unwrapped.gen_obs = _no_obs
+    try:
+        yield unwrapped
+    finally:
+        if shadowed is None:
+            del unwrapped.gen_obs
+        else:
+            unwrapped.gen_obs = shadowed
@@ -0,0 +1,582 @@
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import gc
+import multiprocessing as mp
+
+import cloudpickle
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.vec_env import SubprocVecEnv
+from stable_baselines3.common.vec_env.base_vec_env import (
+    VecEnv,
+    VecEnvIndices,
+    VecEnvObs,
+    VecEnvStepReturn,
+)
+
+from novgrid.host import (
+    CLOSE,
+    ENV_METHOD,
+    ERROR,
+    GET_ATTR,
+    HAS_ATTR,
+    INIT,
+    IS_WRAPPED,
+    RELEASE,
+    RENDER,
+    RESET,
+    SET_ATTR,
+    STEP,
+    PipeTransport,
+    _pipe_worker,
+)
+from novgrid.infos import concat_array_infos
+
+# Modules imported once by the forkserver, so that the workers it forks start with them. The Monitor of
+# stable_baselines3 imports torch, so it is left to the workers, which only import it when building monitored envs.
+# Seconds a worker is given to reply to a closing command, and then to exit, before it is terminated
+STOP_TIMEOUT = 5.0
+
+FORKSERVER_PRELOAD = [
+    "gymnasium",
+    "minigrid",
+    "novgrid.envs",
+    "novgrid.host",
+    "novgrid.list_env",
+]
+
+
+def default_start_method() -> Optional[str]:
+    """
+    Gets the default start method of the worker processes.
+
+    Returns:
+        Optional[str]: fork if available, else forkserver if available, else None for the default of the platform.
+    """
+    for start_method in ("fork", "forkserver"):
+        if start_method in mp.get_all_start_methods():
+            return start_method
+    return None
+
+
+def worker_context(start_method: Optional[str]) -> Any:
+    """
+    Gets the multiprocessing context of the worker processes. With the forkserver start method, the server
+    preloads FORKSERVER_PRELOAD, so that starting a worker forks a process that already imported its modules.
+
+    Args:
+        start_method (Optional[str]): Start method of the worker processes, see default_start_method if None.
+
+    Returns:
+        multiprocessing.context.BaseContext: The multiprocessing context.
+    """
+    ctx = mp.get_context(start_method or default_start_method())
+    if ctx.get_start_method() == "forkserver":
+        ctx.set_forkserver_preload(FORKSERVER_PRELOAD)
+    return ctx
+
+
+def _start_worker(ctx: Any) -> Tuple[PipeTransport, mp.Process]:
+    """
+    Starts a worker process, waiting for the INIT command that builds its envs.
+
+    Args:
+        ctx (multiprocessing.context.BaseContext): The multiprocessing context to start the process with.
+
+    Returns:
+        Tuple[PipeTransport, multiprocessing.Process]: The connection to the worker and its process.
+    """
+    remote, work_remote = ctx.Pipe()
+    process = ctx.Process(target=_pipe_worker, args=(work_remote, remote), daemon=True)
+    process.start()
+    work_remote.close()
+    return PipeTransport(remote), process
+
+
+def start_workers(ctx: Any, n_workers: int) -> List[Tuple[PipeTransport, mp.Process]]:
+    """
+    Starts worker processes. With the fork start method, the objects of the parent are moved to the permanent
+    generation of the garbage collector while forking, so that the collections in the workers don't write to
+    them and the pages holding them stay shared.
+
+    Args:
+        ctx (multiprocessing.context.BaseContext): The multiprocessing context to start the processes with.
+        n_workers (int): Number of workers.
+
+    Returns:
+        List[Tuple[PipeTransport, multiprocessing.Process]]: The connection to and the process of each worker.
+    """
+    fork = ctx.get_start_method() == "fork"
+    if fork:
+        gc.freeze()
+    try:
+        return [_start_worker(ctx) for _ in range(n_workers)]
+    finally:
+        if fork:
+            gc.unfreeze()
+
+
+def split_envs(n_envs: int, n_workers: int) -> List[slice]:
+    """
+    Splits envs into contiguous blocks of balanced sizes, one per worker.
+
+    Args:
+        n_envs (int): Number of envs.
+        n_workers (int): Number of workers.
+
+    Returns:
+        List[slice]: The envs of each worker.
+    """
+    bounds = np.linspace(0, n_envs, n_workers + 1).astype(int)
+    return [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+class WorkerPool:
+    """
+    Worker processes kept alive across vectorized envs, so that creating an env doesn't start processes.
+
+    A BatchedVecEnv attached to the pool leases idle workers and initializes them with its own env functions
+    over the pipe. Closing the env releases the workers, which close their envs and return to the pool. The
+    workers are started when the pool is created, so they inherit the modules already imported by the parent
+    with the fork start method.
+
+    Attributes:
+        ctx (multiprocessing.context.BaseContext): The multiprocessing context the workers are started with.
+        idle (List[Tuple[PipeTransport, multiprocessing.Process]]): The connection to and the process of each idle worker.
+        closed (bool): Whether the pool was closed.
+    """
+
+    def __init__(self, n_workers: int, start_method: Optional[str] = None) -> None:
+        """
+        Initializes the WorkerPool, starting its workers.
+
+        Args:
+            n_workers (int): Number of workers.
+            start_method (Optional[str]): Start method of the worker processes, see default_start_method if None.
+        """
+        self.ctx = worker_context(start_method)
+        self.idle = start_workers(self.ctx, n_workers)
+        self.closed = False
+
+    def __len__(self) -> int:
+        """
+        Gets the number of idle workers.
+
+        Returns:
+            int: Number of idle workers.
+        """
+        return len(self.idle)
+
+    def acquire(self, n_workers: int) -> List[Tuple[PipeTransport, mp.Process]]:
+        """
+        Leases idle workers.
+
+        Args:
+            n_workers (int): Number of workers to lease.
+
+        Returns:
+            List[Tuple[PipeTransport, multiprocessing.Process]]: The connection to and the process of each leased worker.
+
+        Raises:
+            ValueError: If the pool doesn't have enough idle workers.
+        """
+        if self.closed:
+            raise ValueError("The worker pool is closed.")
+        if n_workers > len(self.idle):
+            raise ValueError(
+                f"{n_workers} workers are needed but the pool has {len(self.idle)} idle workers."
+            )
+        workers, self.idle = self.idle[:n_workers], self.idle[n_workers:]
+        return workers
+
+    def release(self, workers: List[Tuple[PipeTransport, mp.Process]]) -> None:
+        """
+        Returns leased workers to the pool, once their envs are closed. Workers that died are dropped.
+
+        Args:
+            workers (List[Tuple[PipeTransport, multiprocessing.Process]]): The connection to and the process of each worker.
+        """
+        for transport, process in workers:
+            if self.closed or not process.is_alive():
+                _stop_worker(transport, process)
+            else:
+                self.idle.append((transport, process))
+
+    def close(self) -> None:
+        """Stops the idle workers, the leased ones are stopped when they are released."""
+        for transport, process in self.idle:
+            _stop_worker(transport, process)
+        self.idle = []
+        self.closed = True
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def _recv_reply(transport: Any) -> bool:
+    """
+    Receives the reply to a command sent to a worker, waiting for at most STOP_TIMEOUT seconds.
+
+    Args:
+        transport (Any): The connection to the worker.
+
+    Returns:
+        bool: Whether the worker replied.
+    """
+    try:
+        if transport.poll(STOP_TIMEOUT):
+            transport.recv()
+            return True
+    except (EOFError, OSError):
+        pass
+    return False
+
+
+def _join_worker(process: mp.Process) -> None:
+    """
+    Waits for a worker process to exit, terminating it and then killing it if it doesn't within STOP_TIMEOUT
+    seconds, so that a hung worker doesn't block closing its env.
+
+    Args:
+        process (multiprocessing.Process): The process of the worker.
+    """
+    process.join(timeout=STOP_TIMEOUT)
+    if process.is_alive():
+        process.terminate()
+        process.join(timeout=STOP_TIMEOUT)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def _stop_worker(transport: PipeTransport, process: mp.Process) -> None:
+    try:
+        transport.send(CLOSE)
+    except OSError:
+        pass
+    else:
+        _recv_reply(transport)
+    transport.close()
+    _join_worker(process)
+
+
+class BatchedVecEnv(SubprocVecEnv):
+    """
+    A vectorized environment whose workers each step a batch of envs serially.
+
+    The envs are split into contiguous blocks, one per worker, and each vectorized step sends one message of
+    actions to every worker and receives one message of stacked results back. The workers are stepped
+    concurrently. With one env per worker this behaves like SubprocVecEnv. The workers are local processes,
+    subclasses can start them elsewhere by overriding _start_workers.
+
+    Attributes:
+        envs_per_worker (int): Maximum number of envs stepped by each worker.
+        worker_pool (Optional[WorkerPool]): The pool that the workers are leased from, if any.
+        array_infos (bool): Whether step_wait returns the infos as one struct of arrays, see novgrid.infos.
+        transports (List[Any]): The connection to each worker.
+        host_slices (List[slice]): The envs of each worker.
+        processes (List[multiprocessing.Process]): The process of each local worker.
+    """
+
+    def __init__(
+        self,
+        env_fns: List[Callable[[], gym.Env]],
+        start_method: Optional[str] = None,
+        envs_per_worker: int = 1,
+        worker_pool: Optional[WorkerPool] = None,
+        array_infos: bool = False,
+    ) -> None:
+        """
+        Initializes the BatchedVecEnv.
+
+        Args:
+            env_fns (List[Callable[[], gymnasium.Env]]): Functions building the envs.
+            start_method (Optional[str]): Start method of the worker processes, unused with a worker pool.
+            envs_per_worker (int): Maximum number of envs stepped by each worker.
+            worker_pool (Optional[WorkerPool]): Pool to lease the workers from instead of starting new processes.
+            array_infos (bool): Whether step_wait returns the infos as one struct of arrays, see novgrid.infos.
+        """
+        if envs_per_worker < 1:
+            raise ValueError(f"The envs_per_worker must be positive, got {envs_per_worker}.")
+        self.envs_per_worker = envs_per_worker
+        self.worker_pool = worker_pool
+        self.array_infos = array_infos
+        self.waiting = False
+        self.closed = False
+        self.processes = []
+
+        self.transports = self._start_workers(len(env_fns), start_method)
+        drained = False
+        try:
+            self.host_slices = split_envs(len(env_fns), len(self.transports))
+            for transport, host_slice in zip(self.transports, self.host_slices):
+                transport.send(INIT, self._init_data(env_fns[host_slice]))
+            # Every reply is received before raising the error of a worker, so that no reply is left in the pipes
+            replies = [transport.recv() for transport in self.transports]
+            drained = True
+            spaces = [self._check_reply(reply, INIT) for reply in replies]
+            observation_space, action_space = spaces[0]
+
+            VecEnv.__init__(self, len(env_fns), observation_space, action_space)
+        except BaseException:
+            self._abort_start(drained)
+            raise
+
+    def _abort_start(self, drained: bool) -> None:
+        """
+        Gives back the workers of an env that failed to start: leased workers return to their pool if their
+        pipes hold no pending reply. Otherwise the connections are closed, which stops the workers.
+
+        Args:
+            drained (bool): Whether every worker replied to its INIT command.
+        """
+        if drained:
+            self.close()
+            return
+        for transport in self.transports:
+            transport.close()
+        for process in self.processes:
+            _join_worker(process)
+        self.closed = True
+
+    def _start_workers(self, n_envs: int, start_method: Optional[str]) -> List[Any]:
+        """
+        Starts the worker processes, or leases them from the worker pool.
+
+        Args:
+            n_envs (int): Number of envs.
+            start_method (Optional[str]): Start method of the worker processes.
+
+        Returns:
+            List[Any]: The connection to each worker.
+        """
+        n_workers = -(-n_envs // self.envs_per_worker)
+        if self.worker_pool is not None:
+            workers = self.worker_pool.acquire(n_workers)
+        else:
+            workers = start_workers(worker_context(start_method), n_workers)
+        self.processes = [process for _, process in workers]
+        return [transport for transport, _ in workers]
+
+    def _init_data(self, env_fns: List[Callable[[], gym.Env]]) -> Tuple[bytes, bool]:
+        """
+        Builds the arguments of the INIT command of a worker.
+
+        Args:
+            env_fns (List[Callable[[], gymnasium.Env]]): Functions building the envs of the worker.
+
+        Returns:
+            Tuple[bytes, bool]: The pickled functions and the info format.
+        """
+        return cloudpickle.dumps(env_fns), self.array_infos
+
+    def _recv(self, transport: Any, expected: int) -> Any:
+        return self._check_reply(transport.recv(), expected)
+
+    def _check_reply(self, reply: Tuple[int, Any], expected: int) -> Any:
+        cmd, data = reply
+        if cmd == ERROR:
+            raise RuntimeError(f"A worker failed:\n{data}")
+        if cmd != expected:
+            raise RuntimeError(f"Expected a reply to command {expected}, got {cmd}.")
+        return data
+
+    def _concat_obs(self, obs_list: Sequence[VecEnvObs]) -> VecEnvObs:
+        if isinstance(self.observation_space, gym.spaces.Dict):
+            return {k: np.concatenate([o[k] for o in obs_list]) for k in self.observation_space.spaces}
+        if isinstance(self.observation_space, gym.spaces.Tuple):
+            return tuple(
+                np.concatenate([o[i] for o in obs_list])
+                for i in range(len(self.observation_space.spaces))
+            )
+        return np.concatenate(obs_list)
+
+    def _merge_steps(self, results: Sequence[Tuple[Any, ...]]) -> VecEnvStepReturn:
+        """
+        Merges the step results of the workers into the step result of the vectorized env.
+
+        Args:
+            results (Sequence[Tuple[Any, ...]]): The step result of each worker.
+
+        Returns:
+            VecEnvStepReturn: The observations, rewards, dones, and infos from each environment
+        """
+        obs, rewards, dones, infos, reset_infos = zip(*results)
+        self.reset_infos = [info for host_infos in reset_infos for info in host_infos]
+        return (
+            self._concat_obs(obs),
+            np.concatenate(rewards),
+            np.concatenate(dones),
+            concat_array_infos(infos, [s.start for s in self.host_slices])
+            if self.array_infos
+            else [info for host_infos in infos for info in host_infos],
+        )
+
+    def step_async(self, actions: np.ndarray) -> None:
+        actions = np.asarray(actions)
+        for transport, host_slice in zip(self.transports, self.host_slices):
+            transport.send(STEP, actions[host_slice])
+        self.waiting = True
+
+    def step_wait(self) -> VecEnvStepReturn:
+        results = [self._recv(transport, STEP) for transport in self.transports]
+        self.waiting = False
+        return self._merge_steps(results)
+
+    def reset(self) -> VecEnvObs:
+        for transport, host_slice in zip(self.transports, self.host_slices):
+            transport.send(RESET, (self._seeds[host_slice], self._options[host_slice]))
+        results = [self._recv(transport, RESET) for transport in self.transports]
+        obs, reset_infos = zip(*results)
+        self.reset_infos = [info for host_infos in reset_infos for info in host_infos]
+        self._reset_seeds()
+        self._reset_options()
+        return self._concat_obs(obs)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        replied = [True] * len(self.transports)
+        if self.waiting:
+            replied = [_recv_reply(transport) for transport in self.transports]
+        # Workers leased from a pool only close their envs and go back to the pool
+        cmd = CLOSE if self.worker_pool is None else RELEASE
+        for w, transport in enumerate(self.transports):
+            try:
+                transport.send(cmd)
+            except OSError:
+                replied[w] = False
+        replied = [ok and _recv_reply(transport) for ok, transport in zip(replied, self.transports)]
+        if self.worker_pool is not None:
+            workers = list(zip(self.transports, self.processes))
+            self.worker_pool.release([worker for worker, ok in zip(workers, replied) if ok])
+            # Workers that hung or died are not returned to the pool
+            for (transport, process), ok in zip(workers, replied):
+                if not ok:
+                    _stop_worker(transport, process)
+        else:
+            for transport in self.transports:
+                transport.close()
+            for process in self.processes:
+                _join_worker(process)
+        self.closed = True
+
+    def get_images(self) -> Sequence[Optional[np.ndarray]]:
+        for transport in self.transports:
+            transport.send(RENDER)
+        return [img for t in self.transports for img in self._recv(t, RENDER)]
+
+    def _call(self, cmd: int, args: Any, indices: VecEnvIndices) -> List[Any]:
+        """
+        Runs a command on some of the envs, sending one message to each worker holding one of them.
+
+        Args:
+            cmd (int): The command.
+            args (Any): The arguments of the command.
+            indices (VecEnvIndices): The envs to run the command on.
+
+        Returns:
+            List[Any]: The result for each env, in the order of the indices.
+        """
+        indices = list(self._get_indices(indices))
+        targets = []
+        for transport, host_slice in zip(self.transports, self.host_slices):
+            local = [i - host_slice.start for i in indices if host_slice.start <= i < host_slice.stop]
+            if local:
+                transport.send(cmd, (local, args))
+                targets.append((transport, host_slice.start, local))
+        results = {}
+        for transport, start, local in targets:
+            for i, result in zip(local, self._recv(transport, cmd) or [None] * len(local)):
+                results[start + i] = result
+        return [results[i] for i in indices]
+
+    def has_attr(self, attr_name: str) -> bool:
+        return all(self._call(HAS_ATTR, attr_name, None))
+
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        return self._call(GET_ATTR, attr_name, indices)
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        self._call(SET_ATTR, (attr_name, value), indices)
+
+    def env_method(
+        self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs
+    ) -> List[Any]:
+        return self._call(ENV_METHOD, (method_name, method_args, method_kwargs), indices)
+
+    def env_is_wrapped(
+        self, wrapper_class: type, indices: VecEnvIndices = None
+    ) -> List[bool]:
+        return self._call(IS_WRAPPED, wrapper_class, indices)
+
+
+def test_worker_pool_reused_across_envs():
+    """
+    Test case for initializing the same worker processes with the envs of successive NoveltyEnvs.
+    """
+    from novgrid.novelty_env import NoveltyEnv
+
+    with WorkerPool(3) as pool:
+        pids = sorted(process.pid for _, process in pool.idle)
+        env = NoveltyEnv("door_key_change", novelty_step=10, n_envs=4, envs_per_worker=2, worker_pool=pool)
+        assert len(pool) == 1 and {p.pid for p in env.processes} < set(pids)
+        env.reset()
+        for _ in range(4):
+            env.step(np.zeros(4, dtype=np.int64))
+        assert env.get_attr("env_idx") == [1] * 4
+        env.close()
+        assert len(pool) == 3
+
+        env = NoveltyEnv("door_key_layout_change", novelty_step=None, n_envs=3, worker_pool=pool)
+        assert sorted(p.pid for p in env.processes) == pids and len(pool) == 0
+        env.reset()
+        env.step(np.zeros(3, dtype=np.int64))
+        assert env.get_attr("env_idx") == [0] * 3 and len(env.get_attr("padders")[0]) == 3
+        try:
+            NoveltyEnv("door_key_change", novelty_step=None, n_envs=1, worker_pool=pool)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("A fourth worker was leased from a pool of three")
+        env.close()
+
+        bad_config = [{"env_id": "NovGrid-ColoredDoorKeyEnv", "unknown_kwarg": 1}]
+        try:
+            NoveltyEnv(bad_config, novelty_step=None, n_envs=2, worker_pool=pool)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("An env with an invalid config was created")
+        assert sorted(process.pid for _, process in pool.idle) == pids
+    assert pool.closed and all(not p.is_alive() for p in env.processes)
+
+
+def test_close_stops_hung_workers():
+    """
+    Test case for closing envs whose workers hang, without returning the hung workers to their pool.
+    """
+    import os
+    import signal
+
+    from novgrid.novelty_env import NoveltyEnv
+
+    global STOP_TIMEOUT
+    stop_timeout, STOP_TIMEOUT = STOP_TIMEOUT, 0.2
+    try:
+        with WorkerPool(2) as pool:
+            env = NoveltyEnv("door_key_change", novelty_step=None, n_envs=2, worker_pool=pool)
+            os.kill(env.processes[0].pid, signal.SIGSTOP)
+            env.close()
+            assert [process for _, process in pool.idle] == env.processes[1:]
+            assert not env.processes[0].is_alive()
+
+        env = NoveltyEnv("door_key_change", novelty_step=None, n_envs=2)
+        os.kill(env.processes[1].pid, signal.SIGSTOP)
+        env.close()
+        assert all(not process.is_alive() for process in env.processes)
+    finally:
+        STOP_TIMEOUT = stop_timeout
@@ -0,0 +1,137 @@
+from typing import Any, Dict, Optional, Sequence, SupportsFloat, Tuple, Union
+
+import gymnasium as gym
+
+from novgrid.utils import skip_obs
+
+
+class MacroStepWrapper(gym.Wrapper):
+    """
+    Base wrapper for dynamics that run several MiniGrid sub-steps per agent step.
+
+    Only the state is updated on the intermediate sub-steps, the egocentric observation is built once at the
+    end of the macro step. The wrapper must be applied directly to the MiniGrid env, below any wrapper that
+    transforms observations.
+    """
+
+    def macro_step(
+        self, actions: Sequence[Any], step_cost: int = 1
+    ) -> Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]:
+        """
+        Takes a sequence of sub-steps as a single agent step.
+
+        The semantics match the legacy novelty wrappers: the sub-steps stop after the first one that terminates
+        or truncates the episode, the reward, termination and info are those of the last sub-step taken, and the
+        macro step uses up step_cost steps of the episode budget, which every sub-step is checked against.
+
+        Args:
+            actions (Sequence[Any]): The sub-step actions, in order.
+            step_cost (int): Number of steps of the episode budget the macro step uses.
+
+        Returns:
+            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information.
+        """
+        if len(actions) == 0:
+            raise ValueError("A macro step needs at least one action.")
+        unwrapped = self.env.unwrapped
+        step_count = unwrapped.step_count + step_cost - 1
+
+        with skip_obs(self.env):
+            for action in actions[:-1]:
+                unwrapped.step_count = step_count
+                _, reward, terminated, truncated, info = self.env.step(action)
+                if terminated or truncated:
+                    break
+        if len(actions) > 1 and (terminated or truncated):
+            return unwrapped.gen_obs(), reward, terminated, truncated, info
+
+        unwrapped.step_count = step_count
+        return self.env.step(actions[-1])
+
+
+class ActionRepeat(MacroStepWrapper):
+    """
+    Repeats actions several times per agent step, for example to make the agent move faster.
+
+    Attributes:
+        repeats (Dict[int, int]): Number of times each repeated action is taken per agent step.
+        default_repeat (int): Number of times the other actions are taken per agent step.
+        step_cost (int): Number of steps of the episode budget each agent step uses.
+    """
+
+    def __init__(
+        self,
+        env: gym.Env,
+        repeat: Union[int, Dict[int, int]] = 2,
+        actions: Optional[Sequence[int]] = None,
+        step_cost: int = 1,
+    ) -> None:
+        """
+        Initializes the ActionRepeat wrapper.
+
+        Args:
+            env (gymnasium.Env): The MiniGrid env to wrap.
+            repeat (Union[int, Dict[int, int]]): Number of times to take the repeated actions, or a mapping from action to repeat count.
+            actions (Optional[Sequence[int]]): The actions to repeat when repeat is an int, defaults to all actions.
+            step_cost (int): Number of steps of the episode budget each agent step uses.
+        """
+        super().__init__(env)
+        if isinstance(repeat, dict):
+            self.repeats = {int(k): v for k, v in repeat.items()}
+            self.default_repeat = 1
+        elif actions is not None:
+            self.repeats = {int(a): repeat for a in actions}
+            self.default_repeat = 1
+        else:
+            self.repeats = {}
+            self.default_repeat = repeat
+        self.step_cost = step_cost
+
+    def step(self, action: Any) -> Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]:
+        """
+        Takes the action the configured number of times as a single agent step.
+
+        Args:
+            action (Any): Action to take.
+
+        Returns:
+            Tuple[Any, SupportsFloat, bool, bool, Dict[str, Any]]: Step information.
+        """
+        n = self.repeats.get(int(action), self.default_repeat)
+        if n == 1 and self.step_cost == 1:
+            return self.env.step(action)
+        return self.macro_step([action] * n, step_cost=self.step_cost)
+
+
+def test_action_repeat_matches_substeps():
+    """
+    Test case for ActionRepeat against stepping the sub-steps one at a time like the legacy wrappers.
+    """
+    import numpy as np
+
+    forward = 2
+    repeated = ActionRepeat(
+        gym.make("MiniGrid-SimpleCrossingS9N1-v0").unwrapped, repeat=2, actions=[forward]
+    )
+    reference = gym.make("MiniGrid-SimpleCrossingS9N1-v0").unwrapped
+    repeated.reset(seed=3)
+    reference.reset(seed=3)
+
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        action = int(rng.integers(0, 3))
+        obs, reward, terminated, truncated, _ = repeated.step(action)
+        if action == forward:
+            expected = reference.step(action)
+            if not (expected[2] or expected[3]):
+                reference.step_count -= 1
+                expected = reference.step(action)
+        else:
+            expected = reference.step(action)
+
+        assert np.array_equal(obs["image"], expected[0]["image"])
+        assert (reward, terminated, truncated) == expected[1:4]
+        assert repeated.unwrapped.step_count == reference.step_count
+        if terminated or truncated:
+            repeated.reset()
+            reference.reset()